@@ -6,7 +6,7 @@ from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QLabel, 
-    QPushButton, QComboBox, QTabWidget, QFileDialog, QMessageBox
+    QPushButton, QComboBox, QTabWidget, QFileDialog, QMessageBox, QCheckBox
 )
 
 from ui.widgets.terminal_tab import TerminalTab
@@ -14,6 +14,10 @@ from ui.widgets.recent_widget import RecentWidget
 from ui.widgets.favorites_widget import FavoritesWidget
 from ui.themes import THEMES as themes
 from core.theme_manager import ThemeManager
+from core.watcher import WATCH_MODES
+from core.supervisor import ProcessSupervisor
+from core.watch_hub import WatchHub
+from core.stream import PTY_SUPPORTED
 from services.settings_service import SettingsService
 
 
@@ -82,6 +86,46 @@ class AutoRunnerApp(QWidget):
             self.theme_combo.setCurrentText(self.settings["theme"])
         theme_row.addWidget(self.theme_combo)
         
+        # Watcher mode selector
+        watch_row = QHBoxLayout()
+        watch_row.addWidget(QLabel("Watcher:"))
+        
+        self.watch_combo = QComboBox()
+        self.watch_combo.addItems(WATCH_MODES)
+        self.watch_combo.setCurrentText(self.settings.get("watch_mode", "auto"))
+        self.watch_combo.setToolTip(
+            "auto: OS file events with polling fallback\n"
+            "events: OS file events only\n"
+            "poll: scan the project every 2 seconds"
+        )
+        watch_row.addWidget(self.watch_combo)
+        
+        self.verify_check = QCheckBox("Ignore saves without edits")
+        self.verify_check.setChecked(self.settings.get("watch_verify_content", False))
+        self.verify_check.setToolTip(
+            "Compare file contents before reporting a change, so touch/format\n"
+            "runs that leave files identical do not trigger auto-run"
+        )
+        
+        self.pty_check = QCheckBox("Run scripts in a terminal (PTY)")
+        self.pty_check.setChecked(self.settings.get("runner_pty", False))
+        self.pty_check.setEnabled(PTY_SUPPORTED)
+        self.pty_check.setToolTip(
+            "Give scripts a pseudo-terminal instead of a pipe so tools keep\n"
+            "colors and progress output and print without buffering.\n"
+            "Window size: pty_columns x pty_rows in settings.json"
+            if PTY_SUPPORTED else "Not available on Windows"
+        )
+        
+        self.direct_check = QCheckBox("Run scripts directly (skip npm run)")
+        self.direct_check.setChecked(self.settings.get("direct_exec", False))
+        self.direct_check.setToolTip(
+            "Run package.json scripts and their pre/post hooks without starting\n"
+            "the package manager: node_modules/.bin goes first on PATH and the\n"
+            "npm_* variables are set. Saves the package manager startup on\n"
+            "every run and auto-run restart."
+        )
+        
         # Open project button
         open_btn = QPushButton("📁 Open New Project")
         open_btn.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -100,6 +144,10 @@ class AutoRunnerApp(QWidget):
         layout.addWidget(title)
         layout.addWidget(subtitle)
         layout.addLayout(theme_row)
+        layout.addLayout(watch_row)
+        layout.addWidget(self.verify_check)
+        layout.addWidget(self.pty_check)
+        layout.addWidget(self.direct_check)
         layout.addWidget(open_btn)
         layout.addWidget(self.project_tabs)
         
@@ -130,6 +178,10 @@ class AutoRunnerApp(QWidget):
     def _setup_connections(self):
         """Setup signal-slot connections"""
         self.theme_combo.currentTextChanged.connect(self.change_theme)
+        self.watch_combo.currentTextChanged.connect(self.change_watch_mode)
+        self.verify_check.toggled.connect(self.change_verify_content)
+        self.pty_check.toggled.connect(self.change_runner_pty)
+        self.direct_check.toggled.connect(self.change_direct_exec)
     
     def _load_initial_data(self):
         """Load initial data"""
@@ -142,6 +194,26 @@ class AutoRunnerApp(QWidget):
         self.settings_service.save(self.settings)
         ThemeManager.apply_theme(theme_name)
     
+    def change_watch_mode(self, mode):
+        """Change file watcher mode (applies to newly loaded projects)"""
+        self.settings["watch_mode"] = mode
+        self.settings_service.save(self.settings)
+    
+    def change_verify_content(self, enabled):
+        """Toggle content verification (applies to newly loaded projects)"""
+        self.settings["watch_verify_content"] = enabled
+        self.settings_service.save(self.settings)
+    
+    def change_runner_pty(self, enabled):
+        """Toggle PTY mode (applies to scripts started afterwards)"""
+        self.settings["runner_pty"] = enabled
+        self.settings_service.save(self.settings)
+    
+    def change_direct_exec(self, enabled):
+        """Toggle direct script execution (applies to scripts started afterwards)"""
+        self.settings["direct_exec"] = enabled
+        self.settings_service.save(self.settings)
+    
     def add_terminal_tab(self):
         """Add new terminal tab"""
         terminal = TerminalTab(self)
@@ -152,7 +224,10 @@ class AutoRunnerApp(QWidget):
     def close_terminal_tab(self, index):
         """Close terminal tab"""
         if self.terminal_tabs.count() > 1:
+            terminal = self.terminal_tabs.widget(index)
+            terminal.shutdown()
             self.terminal_tabs.removeTab(index)
+            terminal.deleteLater()
         else:
             QMessageBox.warning(self, "Warning", "Cannot close the last terminal!")
     
@@ -160,6 +235,14 @@ class AutoRunnerApp(QWidget):
         """Get currently active terminal"""
         return self.terminal_tabs.currentWidget()
     
+    def closeEvent(self, event):
+        """Stop all runners and watchers before exit"""
+        for index in range(self.terminal_tabs.count()):
+            self.terminal_tabs.widget(index).shutdown()
+        ProcessSupervisor.instance().shutdown()
+        WatchHub.instance().shutdown()
+        event.accept()
+    
     def dragEnterEvent(self, event):
         """Handle drag enter event"""
         if event.mimeData().hasUrls():
@@ -0,0 +1,126 @@
+"""
+Benchmark: streaming ANSI renderer vs strip_ansi_codes + URL regex
+
+Renders a synthetic dev-server/compiler log (vite, tsc, eslint, jest
+style lines, mostly colored, some with URLs) through the earlier pipelines
+(strip_ansi_codes plus an uncompiled URL re.sub, per line and per batch)
+and through AnsiRenderer, which keeps the colors and links URLs while
+rendering. Time is split between the worker (the supervisor thread) and the work
+left for the GUI thread.
+
+Usage:
+    python -m benchmarks.ansi_render [--lines 200000] [--batch 2000] [--repeat 3]
+"""
+import os
+import re
+import sys
+import html
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ansi import AnsiRenderer
+from core.utils import strip_ansi_codes
+
+
+SAMPLES = (
+    "src/components/Header.tsx:12:5 - \x1b[91merror\x1b[0m\x1b[90m TS2322: \x1b[0m"
+    "Type 'string' is not assignable to type 'number'.",
+    "  \x1b[2m12:5\x1b[22m  \x1b[31merror\x1b[39m  'x' is assigned a value but never used"
+    "  \x1b[2mno-unused-vars\x1b[22m",
+    "\x1b[32m✓\x1b[39m built in \x1b[1m812ms\x1b[22m",
+    "  \x1b[32m➜\x1b[39m  \x1b[1mLocal\x1b[22m:   \x1b[36mhttp://localhost:\x1b[1m5173\x1b[22m/\x1b[39m",
+    "  \x1b[32m➜\x1b[39m  \x1b[1mNetwork\x1b[22m: use \x1b[1m--host\x1b[22m to expose",
+    "\x1b[2m10:42:17 AM\x1b[22m \x1b[36m\x1b[1m[vite]\x1b[22m\x1b[39m \x1b[32mhmr update "
+    "\x1b[39m\x1b[2m/src/App.tsx\x1b[22m",
+    " \x1b[42m\x1b[30m PASS \x1b[39m\x1b[49m src/utils/format.test.ts (\x1b[33m1.2 s\x1b[39m)",
+    "webpack compiled successfully in 1534 ms",
+    "    at Object.<anonymous> (/app/node_modules/some-lib/index.js:10:15)",
+    "Docs: https://nextjs.org/docs/messages/react-hydration-error",
+)
+
+
+def make_lines(count):
+    return [SAMPLES[i % len(SAMPLES)] for i in range(count)]
+
+
+def batches(lines, size):
+    return [lines[i:i + size] for i in range(0, len(lines), size)]
+
+
+def per_line(lines, batch):
+    """Pre-batching pipeline: strip in the runner, re.sub per line in the GUI"""
+    worker = gui = 0.0
+    for line in lines:
+        started = time.perf_counter()
+        text = strip_ansi_codes(line)
+        mid = time.perf_counter()
+        re.sub(r"((http|https)://[^\s]+)", r'<a href="\1">\1</a>', text)
+        worker += mid - started
+        gui += time.perf_counter() - mid
+    return worker, gui
+
+
+def strip_block(lines, batch):
+    """Batched pipeline: strip the block, escape + link the batch in the GUI"""
+    worker = gui = 0.0
+    for chunk in batches(lines, batch):
+        started = time.perf_counter()
+        texts = strip_ansi_codes("\n".join(chunk)).split("\n")
+        mid = time.perf_counter()
+        text = "<br>".join(html.escape(line, quote=False) for line in texts)
+        re.sub(r"((http|https)://[^\s<]+)", r'<a href="\1">\1</a>', text)
+        worker += mid - started
+        gui += time.perf_counter() - mid
+    return worker, gui
+
+
+def streaming(lines, batch):
+    """AnsiRenderer in the runner, the GUI only joins ready-made HTML"""
+    renderer = AnsiRenderer()
+    worker = gui = 0.0
+    for chunk in batches(lines, batch):
+        started = time.perf_counter()
+        rendered = renderer.render_lines(chunk)
+        mid = time.perf_counter()
+        "<br>".join(markup for _, markup in rendered)
+        worker += mid - started
+        gui += time.perf_counter() - mid
+    return worker, gui
+
+
+def measure(name, func, lines, args, total_bytes):
+    best = None
+    for _ in range(args.repeat):
+        worker, gui = func(lines, args.batch)
+        if best is None or worker + gui < sum(best):
+            best = (worker, gui)
+    total = sum(best)
+    print(f"{name:<30} {best[0] * 1000:>10.1f} {best[1] * 1000:>8.1f} "
+          f"{len(lines) / total:>12,.0f} {total_bytes / total / 1e6:>7.1f}")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=2000,
+                        help="Lines per rendered batch")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    total_bytes = sum(len(line.encode()) for line in lines)
+    print(f"Input: {len(lines)} lines, {total_bytes / 1e6:.1f} MB\n")
+    print(f"{'pipeline':<30} {'worker ms':>10} {'GUI ms':>8} {'lines/s':>12} {'MB/s':>7}")
+
+    measure("per-line strip + re.sub", per_line, lines, args, total_bytes)
+    _, old_gui = measure("block strip + escape + re.sub", strip_block, lines, args, total_bytes)
+    _, new_gui = measure("AnsiRenderer (colors kept)", streaming, lines, args, total_bytes)
+    print(f"\nGUI thread time per 1k lines: {old_gui / len(lines) * 1e6:.2f} ms -> "
+          f"{new_gui / len(lines) * 1e6:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
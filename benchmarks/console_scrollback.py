@@ -0,0 +1,100 @@
+"""
+Benchmark: append cost and memory over a long session, QTextBrowser vs ConsoleView
+
+Feeds the same rendered dev-server output, in runner-sized batches, to an
+unbounded QTextBrowser (append + move cursor to end, as the console used
+to) and to the ring-buffered, virtualized ConsoleView. Each batch is
+followed by an event loop pass so layout and paint are included. Reports
+the append time of the first and last batches and the RSS growth.
+
+Usage:
+    python -m benchmarks.console_scrollback [--lines 300000] [--batch 2000]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QApplication, QTextBrowser
+
+from core.ansi import AnsiRenderer
+from core.utils import current_rss_bytes
+from ui.widgets.console_view import ConsoleView
+
+
+def make_batches(total, size):
+    renderer = AnsiRenderer()
+    for start in range(0, total, size):
+        yield renderer.render_lines([
+            f"\x1b[2m10:42:{i % 60:02d}\x1b[22m \x1b[36m[vite]\x1b[39m hmr update "
+            f"/src/components/Widget{i}.tsx \x1b[33m({i % 97} ms)\x1b[39m"
+            for i in range(start, min(total, start + size))
+        ])
+
+
+class BrowserSink:
+    def __init__(self):
+        self.widget = QTextBrowser()
+
+    def append(self, lines):
+        text = "<br>".join(markup for _, markup in lines)
+        self.widget.append(f"<span style='white-space:pre-wrap;'>{text}</span>")
+        cursor = self.widget.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self.widget.setTextCursor(cursor)
+
+
+class ViewSink:
+    def __init__(self, max_lines):
+        self.widget = ConsoleView(max_lines=max_lines)
+
+    def append(self, lines):
+        self.widget.append_lines(lines)
+
+
+def run(app, name, sink, args):
+    sink.widget.resize(900, 600)
+    sink.widget.show()
+    app.processEvents()
+    rss_before = current_rss_bytes()
+
+    timings = []
+    for lines in make_batches(args.lines, args.batch):
+        started = time.perf_counter()
+        sink.append(lines)
+        app.processEvents()
+        timings.append(time.perf_counter() - started)
+
+    rss_growth = (current_rss_bytes() - rss_before) / 1024 / 1024
+    window = max(1, len(timings) // 10)
+    first = sum(timings[:window]) / window * 1000
+    last = sum(timings[-window:]) / window * 1000
+    print(f"{name:<14} {first:>12.2f} {last:>12.2f} {sum(timings):>9.2f} {rss_growth:>10.1f}")
+    sink.widget.close()
+    sink.widget.deleteLater()
+    app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300000)
+    parser.add_argument("--batch", type=int, default=2000)
+    parser.add_argument("--scrollback", type=int, default=100000,
+                        help="ConsoleView line cap")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{args.lines} lines in batches of {args.batch}, "
+          f"ConsoleView capped at {args.scrollback} lines\n")
+    print(f"{'console':<14} {'first ms':>12} {'last ms':>12} {'total s':>9} {'RSS +MB':>10}")
+    # ConsoleView first so the QTextBrowser's freed heap does not mask its growth
+    run(app, "ConsoleView", ViewSink(args.scrollback), args)
+    run(app, "QTextBrowser", BrowserSink(), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: console search latency, SearchIndex vs a linear scan
+
+Indexes a synthetic dev-server log (millions of lines, a few rare error
+lines) in runner-sized batches and reports the append and idle-time
+trigram build cost. Then times match counting (first and cached),
+next-match lookup, and a linear per-line regex scan of the same lines as
+the no-index baseline.
+
+Usage:
+    python -m benchmarks.console_search [--lines 2000000]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.search_index import SearchIndex, SearchQuery
+
+
+QUERIES = (
+    ("TS2322", False),
+    ("Widget1999", False),
+    ("hmr update", False),
+    (r"error|warn", True),
+    (r"Widget19\d\d\.tsx", True),
+    (r"TS\d+", True),
+)
+
+
+def make_lines(count):
+    lines = [
+        f"10:42:{i % 60:02d} [vite] hmr update /src/components/Widget{i}.tsx ({i % 97} ms)"
+        for i in range(count)
+    ]
+    for i in range(count // 7, count, count // 5):
+        lines[i] = f"src/App.tsx({i % 300},5): error TS2322: Type 'string' is not assignable"
+    return lines
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000000)
+    parser.add_argument("--batch", type=int, default=2000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    index = SearchIndex()
+    _, append_ms = timed(lambda: [
+        index.extend(lines[i:i + args.batch]) for i in range(0, len(lines), args.batch)
+    ])
+    unbuilt = SearchQuery("not assignable")
+    (matches, _), unbuilt_ms = timed(lambda: index.count(unbuilt))
+    _, build_ms = timed(index.build_pending)
+    print(f"{len(lines)} lines, {len(index.chunks)} chunks")
+    print(f"Append: {append_ms * 1000 / len(lines):.2f} us/line, "
+          f"trigram build (idle time): {build_ms * 1000 / len(lines):.2f} us/line")
+    print(f"Count before trigrams are built: {unbuilt_ms:.0f} ms ({matches} matches)\n")
+
+    print(f"{'query':<22} {'matches':>9} {'count ms':>9} {'cached':>8} "
+          f"{'next ms':>8} {'linear ms':>10}")
+    middle = len(lines) // 2
+    for text, regex in QUERIES:
+        query = SearchQuery(text, regex)
+        (matches, _), first_ms = timed(lambda: index.count(query))
+        _, cached_ms = timed(lambda: index.count(query))
+        _, next_ms = timed(lambda: index.find(query, middle))
+        _, linear_ms = timed(lambda: sum(1 for line in lines for _ in query.pattern.finditer(line)))
+        label = f"/{text}/" if regex else text
+        print(f"{label:<22} {matches:>9} {first_ms:>9.1f} {cached_ms:>8.1f} "
+              f"{next_ms:>8.2f} {linear_ms:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: restart latency, ``npm run`` vs direct exec
+
+A throwaway project gets a local tool in ``node_modules/.bin`` that prints
+one line and exits. Each script is started through the ProcessSupervisor
+like the app does, once as ``npm run <script>`` and once with
+ScriptExecService's direct command. Reported is the median time from
+start until the tool's line reaches the GUI thread (what an auto-run
+restart waits for), with what the tool printed.
+
+dev: ``"dev": "mytool --flag"`` (exec'd without a shell in direct mode)
+hooks: the same command with ``prehooks``/``posthooks`` hooks (a shell
+    ``&&`` chain in direct mode)
+
+Usage:
+    python -m benchmarks.direct_exec [--runs 10]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from core.supervisor import ProcessSupervisor
+from services.script_exec_service import ScriptExecService
+
+
+TOOL = (
+    "#!/usr/bin/env node\n"
+    "console.log(`ready ${process.env.npm_lifecycle_event} ${process.argv.slice(2).join(' ')}`);\n"
+)
+
+
+def make_project(root):
+    package = {
+        "name": "bench-app",
+        "version": "1.0.0",
+        "scripts": {
+            "dev": "mytool --flag",
+            "prehooks": "node -e \"\"",
+            "hooks": "mytool --flag",
+            "posthooks": "node -e \"\"",
+        },
+    }
+    with open(os.path.join(root, "package.json"), "w", encoding="utf-8") as f:
+        json.dump(package, f)
+    tool_dir = os.path.join(root, "node_modules", "mytool")
+    bin_dir = os.path.join(root, "node_modules", ".bin")
+    os.makedirs(tool_dir)
+    os.makedirs(bin_dir)
+    with open(os.path.join(tool_dir, "cli.js"), "w", encoding="utf-8") as f:
+        f.write(TOOL)
+    if os.name == "nt":
+        with open(os.path.join(bin_dir, "mytool.cmd"), "w", encoding="utf-8") as f:
+            f.write('@node "%~dp0\\..\\mytool\\cli.js" %*\n')
+    else:
+        target = os.path.join(bin_dir, "mytool")
+        os.symlink(os.path.join("..", "mytool", "cli.js"), target)
+        os.chmod(os.path.join(tool_dir, "cli.js"), 0o755)
+
+
+def first_ready(app, cmd, cwd, env):
+    """Seconds from start to the first "ready" line, and that line"""
+    handle = ProcessSupervisor.instance().start(cmd, cwd, env=env)
+    found = []
+    done = []
+
+    def on_lines(batch):
+        for text, _ in batch:
+            if text.startswith("ready") and not found:
+                found.append((time.monotonic(), text))
+        handle.batch_done()
+
+    handle.lines_signal.connect(on_lines)
+    handle.finished_signal.connect(lambda: done.append(True))
+    started = time.monotonic()
+    while not done:
+        app.processEvents()
+        time.sleep(0.001)
+    if not found:
+        return None, ""
+    # Taken on delivery: npm prints its "> app@1.0.0 dev" header first
+    return found[0][0] - started, found[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    if not shutil.which("npm") or not shutil.which("node"):
+        print("node and npm are required")
+        return
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="autorunner-direct-")
+    try:
+        make_project(root)
+        print(f"{'script':<7} {'mode':<8} {'median ms':>10} {'min ms':>8}  output")
+        for script in ("dev", "hooks"):
+            direct_cmd, env = ScriptExecService.get_direct_command(root, script)
+            modes = (("npm run", f"npm run {script}", None), ("direct", direct_cmd, env))
+            for label, cmd, cmd_env in modes:
+                times = []
+                line = ""
+                for _ in range(args.runs):
+                    elapsed, line = first_ready(app, cmd, root, cmd_env)
+                    if elapsed is not None:
+                        times.append(elapsed)
+                if not times:
+                    print(f"{script:<7} {label:<8} {'failed':>10}")
+                    continue
+                print(f"{script:<7} {label:<8} {statistics.median(times) * 1000:>10.1f} "
+                      f"{min(times) * 1000:>8.1f}  {line}")
+    finally:
+        ProcessSupervisor.instance().shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: directory pruning with PathMatcher vs the legacy hard-coded filter
+
+Builds a Next.js/monorepo-shaped tree (sources, node_modules, .next,
+coverage, .turbo, gitignored generated code) and scans it with
+IncrementalScanner using both filters.
+
+Usage:
+    python -m benchmarks.ignore_pruning [--scale 1.0] [--passes 3]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ignore import PathMatcher
+from core.scanner import IncrementalScanner
+
+
+LEGACY_IGNORED_DIRS = ('node_modules', '.git', 'dist', 'build')
+LEGACY_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx', '.json')
+
+GITIGNORE = """\
+# dependencies
+node_modules
+# generated
+src/generated/
+/storybook-static
+*.log
+.env*.local
+"""
+
+
+def touch_many(folder, count, ext):
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        open(os.path.join(folder, f"f{i}{ext}"), "w").close()
+
+
+def make_tree(root, scale):
+    """Create the tree, returns the total number of directories"""
+    def n(value):
+        return max(1, int(value * scale))
+
+    for pkg in range(n(20)):
+        for mod in range(10):
+            touch_many(os.path.join(root, "src", f"feature{pkg}", f"m{mod}"), 8, ".tsx")
+    touch_many(os.path.join(root, "src", "styles"), 30, ".css")
+
+    for pkg in range(n(400)):
+        base = os.path.join(root, "node_modules", f"pkg{pkg}")
+        touch_many(os.path.join(base, "lib"), 10, ".js")
+        touch_many(os.path.join(base, "types"), 5, ".d.ts")
+    for i in range(n(60)):
+        touch_many(os.path.join(root, ".next", "cache", "webpack", f"c{i}"), 10, ".js")
+        touch_many(os.path.join(root, ".next", "server", f"chunk{i}"), 5, ".js")
+    for i in range(n(40)):
+        touch_many(os.path.join(root, "coverage", "lcov-report", f"d{i}"), 10, ".html")
+    for i in range(n(30)):
+        touch_many(os.path.join(root, ".turbo", "cache", f"h{i}"), 5, ".json")
+    for i in range(n(40)):
+        touch_many(os.path.join(root, "src", "generated", f"api{i}"), 10, ".ts")
+    for i in range(n(20)):
+        touch_many(os.path.join(root, "storybook-static", f"s{i}"), 10, ".js")
+
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write(GITIGNORE)
+    open(os.path.join(root, "package.json"), "w").close()
+
+    return sum(len(dirs) for _, dirs, _ in os.walk(root)) + 1
+
+
+def run(name, root, dir_filter, file_filter, passes):
+    pruned = [0]
+
+    def counting_dir_filter(path):
+        keep = dir_filter(path)
+        if not keep:
+            pruned[0] += 1
+        return keep
+
+    scanner = IncrementalScanner(root, counting_dir_filter, file_filter)
+    started = time.perf_counter()
+    scanner.scan()
+    prime_ms = (time.perf_counter() - started) * 1000
+    prime_stats = scanner.stats
+    pruned_dirs = pruned[0]
+
+    timings = []
+    for _ in range(passes):
+        started = time.perf_counter()
+        scanner.scan()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"{name:<12} {prime_stats.dirs_total:>8} {pruned_dirs:>8} "
+          f"{prime_stats.files_total:>8} {prime_ms:>10.1f} {min(timings):>10.1f}")
+    return prime_ms, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--passes", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="autorunner-ignore-")
+    try:
+        total_dirs = make_tree(root, args.scale)
+        print(f"Tree: {total_dirs} directories\n")
+        print(f"{'filter':<12} {'dirs':>8} {'pruned':>8} {'files':>8} "
+              f"{'prime ms':>10} {'pass ms':>10}")
+
+        legacy = run(
+            "legacy", root,
+            lambda path: os.path.basename(path) not in LEGACY_IGNORED_DIRS,
+            lambda path: path.endswith(LEGACY_EXTENSIONS),
+            args.passes
+        )
+
+        started = time.perf_counter()
+        matcher = PathMatcher(root)
+        build_ms = (time.perf_counter() - started) * 1000
+        compiled = run(
+            "pathmatcher", root,
+            lambda path: not matcher.is_dir_ignored(path),
+            matcher.is_file_watched,
+            args.passes
+        )
+
+        print(f"\nMatcher build (reads .gitignore files): {build_ms:.1f} ms")
+        print(f"Scan time saved per pass: {legacy[1] - compiled[1]:.1f} ms "
+              f"({(1 - compiled[1] / legacy[1]) * 100:.0f}%)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: install freshness check vs walking node_modules
+
+A throwaway project has ``--packages`` locked packages in a v3
+package-lock.json and a matching node_modules tree (one package.json and
+``--files`` files per package). Measured:
+
+walk: stat every file under node_modules, the cost of any check that
+    compares the installed tree with the lockfile
+record: fingerprint and locked versions written after an install
+check (fresh): InstallStateService.check() with nothing changed
+check (stale): the same after one version in the lockfile changed, which
+    also parses the lockfile to report the change
+
+Usage:
+    python -m benchmarks.install_freshness [--packages 3000] [--files 5] [--runs 5]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.install_state_service import InstallStateService
+
+
+def make_project(root, packages, files):
+    locked = {"": {"name": "bench-install", "dependencies": {}}}
+    for i in range(packages):
+        name = f"pkg-{i}"
+        version = f"1.{i % 7}.{i % 13}"
+        locked[f"node_modules/{name}"] = {
+            "version": version,
+            "resolved": f"https://registry.npmjs.org/{name}/-/{name}-{version}.tgz",
+            "integrity": "sha512-" + "A" * 86 + "==",
+        }
+        directory = os.path.join(root, "node_modules", name)
+        os.makedirs(directory)
+        with open(os.path.join(directory, "package.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": name, "version": version}, f)
+        for j in range(files):
+            with open(os.path.join(directory, f"file{j}.js"), "w", encoding="utf-8") as f:
+                f.write("module.exports = 1;\n")
+    top = {f"pkg-{i}": "^1.0.0" for i in range(0, packages, 10)}
+    locked[""]["dependencies"] = top
+    with open(os.path.join(root, "package.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "bench-install", "dependencies": top}, f, indent=2)
+    with open(os.path.join(root, "package-lock.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "bench-install", "lockfileVersion": 3, "packages": locked}, f, indent=2)
+    return locked
+
+
+def walk(root):
+    count = 0
+    for dirpath, _, filenames in os.walk(os.path.join(root, "node_modules")):
+        for name in filenames:
+            os.stat(os.path.join(dirpath, name))
+            count += 1
+    return count
+
+
+def timed(fn, runs):
+    times = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--packages", type=int, default=3000)
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="autorunner-install-")
+    try:
+        locked = make_project(root, args.packages, args.files)
+        lockfile = os.path.join(root, "package-lock.json")
+        lock_size = os.path.getsize(lockfile)
+
+        walk_time, files = timed(lambda: walk(root), args.runs)
+        record_time, _ = timed(lambda: InstallStateService.record(root), args.runs)
+        fresh_time, fresh = timed(lambda: InstallStateService.check(root), args.runs)
+
+        locked["node_modules/pkg-1"]["version"] = "2.0.0"
+        with open(lockfile, "w", encoding="utf-8") as f:
+            json.dump({"name": "bench-install", "lockfileVersion": 3, "packages": locked}, f, indent=2)
+        stale_time, stale = timed(lambda: InstallStateService.check(root), args.runs)
+
+        print(f"{args.packages} packages, {files} files in node_modules, "
+              f"lockfile {lock_size / 1024:.0f} KiB")
+        print(f"{'step':<16} {'median ms':>10}")
+        for label, seconds in (
+            ("walk", walk_time), ("record", record_time),
+            ("check (fresh)", fresh_time), ("check (stale)", stale_time),
+        ):
+            print(f"{label:<16} {seconds * 1000:>10.2f}")
+        print(f"fresh: {fresh['state']}; stale: {stale['state']} "
+              f"({InstallStateService.describe_changes(stale)})")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: run log archive write cost, size, reopen and random access
+
+Writes a synthetic dev-server log through RunLogWriter in runner-sized
+batches and reports write throughput and compression ratio. Then compares
+opening the archive and showing the last screen, and showing a screen in
+the middle, against a gzip file of the same lines that has to be
+decompressed from the start to get there.
+
+Usage:
+    python -m benchmarks.log_archive [--lines 5000000]
+"""
+import os
+import sys
+import gzip
+import time
+import argparse
+import tempfile
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_archive import RunLogWriter, RunLog
+
+
+SCREEN = 50
+
+
+def make_batches(total, size):
+    for start in range(0, total, size):
+        yield [
+            f"10:42:{i % 60:02d} [vite] hmr update /src/components/Widget{i}.tsx ({i % 97} ms)"
+            for i in range(start, min(total, start + size))
+        ]
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=5000000)
+    parser.add_argument("--batch", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "run.arlog")
+        gz_path = os.path.join(root, "run.log.gz")
+
+        writer = RunLogWriter(path, {"script": "dev"})
+        write_ms = 0.0
+        gzip_ms = 0.0
+        raw = 0
+        with gzip.open(gz_path, "wt", encoding="utf-8") as gz:
+            for batch in make_batches(args.lines, args.batch):
+                raw += sum(len(line) + 1 for line in batch)
+                _, ms = timed(lambda: writer.write_lines(batch))
+                write_ms += ms
+                _, ms = timed(lambda: gz.write("\n".join(batch) + "\n"))
+                gzip_ms += ms
+        _, ms = timed(writer.close)
+        write_ms += ms
+
+        size = os.path.getsize(path)
+        print(f"{args.lines} lines, {raw / 1024 / 1024:.0f} MB of text")
+        print(f"Archive write: {raw / 1024 / 1024 / (write_ms / 1000):.0f} MB/s "
+              f"(gzip stream {raw / 1024 / 1024 / (gzip_ms / 1000):.0f} MB/s), "
+              f"{size / 1024 / 1024:.1f} MB on disk, ratio {raw / size:.1f}x "
+              f"(gzip {raw / os.path.getsize(gz_path):.1f}x)\n")
+
+        def archive_last():
+            with RunLog(path) as log:
+                return log.read(log.lines - SCREEN, SCREEN)
+
+        def archive_middle():
+            with RunLog(path) as log:
+                return log.read(log.lines // 2, SCREEN)
+
+        def gzip_at(start):
+            with gzip.open(gz_path, "rt", encoding="utf-8") as gz:
+                return list(islice(gz, start, start + SCREEN))
+
+        print(f"{'operation':<28} {'archive ms':>11} {'gzip ms':>10}")
+        last, archive_ms = timed(archive_last)
+        _, gz_ms = timed(lambda: gzip_at(args.lines - SCREEN))
+        print(f"{'open + last screen':<28} {archive_ms:>11.2f} {gz_ms:>10.0f}")
+        _, archive_ms = timed(archive_middle)
+        _, gz_ms = timed(lambda: gzip_at(args.lines // 2))
+        print(f"{'open + middle screen':<28} {archive_ms:>11.2f} {gz_ms:>10.0f}")
+
+        with RunLog(path) as log:
+            export_path = os.path.join(root, "run.jsonl")
+            count, export_ms = timed(lambda: log.export_jsonl(export_path))
+        print(f"\nJSON lines export: {count} lines in {export_ms / 1000:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: lines/s delivered to the console widget, per-line vs batched streaming
+
+A Python stand-in process writes lines as fast as it can. The legacy
+runner (text-mode line iteration, one signal and one QTextBrowser.append
+per line) is compared with the ProcessSupervisor's chunked, frame-batched
+output.
+The longest gap between GUI event loop ticks is reported as "max stall".
+
+Usage:
+    python -m benchmarks.log_throughput [--lines 50000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QApplication, QTextBrowser
+
+from core.supervisor import ProcessSupervisor
+from core.utils import strip_ansi_codes
+from ui.widgets.console_view import ConsoleView
+
+
+CHILD = (
+    "import sys\n"
+    "w = sys.stdout.write\n"
+    "for i in range({n}):\n"
+    "    w(f'\\x1b[32m[webpack]\\x1b[0m compiled module ./src/components/Widget{{i}}.tsx 1.2 KiB\\n')\n"
+)
+
+
+class LegacyRunnerThread(QThread):
+    """The pre-batching runner: one signal per line"""
+    log_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal()
+
+    def __init__(self, cmd, cwd):
+        super().__init__()
+        self.cmd = cmd
+        self.cwd = cwd
+
+    def run(self):
+        try:
+            process = subprocess.Popen(
+                self.cmd, cwd=self.cwd, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, text=True, shell=True,
+                encoding="utf-8", errors="replace"
+            )
+            for line in process.stdout:
+                self.log_signal.emit(strip_ansi_codes(line))
+        finally:
+            self.finished_signal.emit()
+
+
+class Console:
+    """Minimal copy of TerminalTab's console sinks, legacy and current"""
+
+    def __init__(self):
+        self.widget = QTextBrowser()
+        self.view = ConsoleView()
+        self.lines = 0
+
+    def _scroll(self):
+        cursor = self.widget.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        self.widget.setTextCursor(cursor)
+
+    def log(self, text):
+        self.lines += 1
+        text = re.sub(r"((http|https)://[^\s]+)", r'<a href="\1">\1</a>', text)
+        self.widget.append(text)
+        self._scroll()
+
+    def log_lines(self, lines):
+        self.lines += len(lines)
+        self.view.append_lines(lines)
+
+
+def measure(app, mode, cmd):
+    console = Console()
+    done = []
+    gaps = [0.0]
+    last_tick = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps[0] = max(gaps[0], now - last_tick[0])
+        last_tick[0] = now
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+
+    started = time.perf_counter()
+    if mode == "legacy":
+        runner = LegacyRunnerThread(cmd, os.getcwd())
+        runner.log_signal.connect(console.log)
+        runner.finished_signal.connect(lambda: done.append(time.perf_counter()))
+        runner.start()
+    else:
+        runner = ProcessSupervisor.instance().start(cmd, os.getcwd())
+        runner.lines_signal.connect(lambda lines: (console.log_lines(lines), runner.batch_done()))
+        runner.finished_signal.connect(lambda: done.append(time.perf_counter()))
+    while not done:
+        app.processEvents()
+    # Drain signals still queued for the GUI thread
+    if mode == "legacy":
+        runner.wait()
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+    timer.stop()
+    return console.lines, elapsed, gaps[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    child = CHILD.format(n=args.lines)
+    cmd = subprocess.list2cmdline([sys.executable, "-c", child])
+
+    print(f"{'mode':<8} {'lines':>8} {'seconds':>9} {'lines/s':>10} {'max stall ms':>13}")
+    for mode in ("legacy", "batched"):
+        lines, elapsed, stall = measure(app, mode, cmd)
+        print(f"{mode:<8} {lines:>8} {elapsed:>9.2f} {lines / elapsed:>10.0f} {stall * 1000:>13.1f}")
+    ProcessSupervisor.instance().shutdown()
+
+
+if __name__ == "__main__":
+    main()
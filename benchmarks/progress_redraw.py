@@ -0,0 +1,142 @@
+"""
+Benchmark: progress-bar redraws and a flood of output into a slow console
+
+progress: a stand-in installer redraws a progress bar with ``\\r`` between
+    a few log lines. The legacy runner's text-mode pipe turned every redraw
+    into a console line (universal newlines split on ``\\r``); the
+    ProcessSupervisor rewrites the line in place and only sends live updates once per frame.
+flood: a child prints lines as fast as it can into a console whose GUI
+    thread takes ``--gui-ms`` per batch; "child s" is when it exited. Without backpressure the queued
+    batches (and memory) grow with the output; with it, the runner keeps
+    draining the pipe but collapses what the console cannot take.
+
+Usage:
+    python -m benchmarks.progress_redraw [--redraws 20000] [--lines 300000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from core.supervisor import ProcessSupervisor
+from core.utils import current_rss_bytes
+
+
+PROGRESS_CHILD = (
+    "import sys\n"
+    "w = sys.stdout.write\n"
+    "for i in range({n}):\n"
+    "    if i % 5000 == 0:\n"
+    "        w(f'\\rresolving batch {{i // 5000}}\\x1b[K\\n')\n"
+    "    bar = '#' * (i * 30 // {n})\n"
+    "    w(f'\\r\\x1b[36m[{{bar:<30}}]\\x1b[0m {{i * 100 // {n}}}% fetch pkg-{{i}}\\x1b[K')\n"
+    "    sys.stdout.flush()\n"
+    "w('\\rdone\\x1b[K\\n')\n"
+)
+
+FLOOD_CHILD = (
+    "import sys\n"
+    "w = sys.stdout.write\n"
+    "for i in range({n}):\n"
+    "    w(f'[webpack] compiled module ./src/components/Widget{{i % 50}}.tsx\\n')\n"
+    "sys.stdout.flush()\n"
+    "sys.stderr.write(f'{{time.time()}}\\n')\n"
+)
+
+LEGACY_SPLIT = re.compile(r"\r\n|\r|\n")
+
+
+def run_progress(app, redraws):
+    cmd = f'"{sys.executable}" -c "{PROGRESS_CHILD.format(n=redraws)}"'
+    runner = ProcessSupervisor.instance().start(cmd, os.getcwd())
+    lines = []
+    live_updates = [0]
+    done = []
+    runner.lines_signal.connect(lambda batch: (lines.extend(batch), runner.batch_done()))
+    runner.live_signal.connect(lambda live: live_updates.__setitem__(0, live_updates[0] + 1))
+    runner.finished_signal.connect(lambda: done.append(True))
+    started = time.perf_counter()
+    while not done:
+        app.processEvents()
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+
+    # What the legacy text-mode reader would have produced from the same output
+    output = subprocess.run(cmd, shell=True, capture_output=True).stdout.decode()
+    raw = [line for line in LEGACY_SPLIT.split(output) if line]
+    print(f"progress: {redraws} redraws in {elapsed:.2f} s")
+    print(f"  legacy console lines : {len(raw)}")
+    print(f"  console lines now    : {len(lines)} ({', '.join(t for t, _ in lines[-3:])})")
+    print(f"  live redraws sent    : {live_updates[0]}\n")
+
+
+def run_flood(app, total, gui_ms, backpressure):
+    cmd = f'"{sys.executable}" -c "{FLOOD_CHILD.format(n=total)}"'
+    pending = 10 ** 9 if not backpressure else 3
+    started = time.perf_counter()
+    runner = ProcessSupervisor.instance().start(cmd, os.getcwd(), max_pending_batches=pending)
+    delivered = [0]
+    peak_queue = [0]
+    done = []
+
+    def on_lines(batch):
+        peak_queue[0] = max(peak_queue[0], runner.pipeline.in_flight)
+        delivered[0] += len(batch)
+        time.sleep(gui_ms / 1000)  # slow console
+        runner.batch_done()
+
+    runner.lines_signal.connect(on_lines)
+    runner.finished_signal.connect(lambda: done.append(time.perf_counter()))
+    rss_before = current_rss_bytes()
+    peak_rss = 0
+    exited = []
+
+    def wait_child():
+        while runner.process is None:
+            time.sleep(0.001)
+        runner.process.wait()
+        exited.append(time.perf_counter() - started)
+
+    threading.Thread(target=wait_child, daemon=True).start()
+    while not done:
+        app.processEvents()
+        peak_rss = max(peak_rss, current_rss_bytes())
+        time.sleep(0.002)  # idle like a real event loop, not a GIL-hogging spin
+    exited = exited[0] if exited else done[0] - started
+    app.processEvents()
+    shown = time.perf_counter() - started
+    label = "backpressure" if backpressure else "unbounded"
+    print(f"{label:<14} {exited:>10.2f} {shown:>9.2f} {peak_queue[0]:>10} "
+          f"{delivered[0]:>10} {runner.collapsed_lines:>10} "
+          f"{(peak_rss - rss_before) / 1024 / 1024:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--redraws", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=300000)
+    parser.add_argument("--gui-ms", type=float, default=20.0,
+                        help="Simulated GUI time per batch in the flood test")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    run_progress(app, args.redraws)
+
+    print(f"flood: {args.lines} lines, GUI takes {args.gui_ms:.0f} ms per batch")
+    print(f"{'mode':<14} {'child s':>10} {'shown s':>9} {'peak queue':>10} "
+          f"{'delivered':>10} {'collapsed':>10} {'RSS +MB':>8}")
+    run_flood(app, args.lines, args.gui_ms, backpressure=True)
+    run_flood(app, args.lines, args.gui_ms, backpressure=False)
+    ProcessSupervisor.instance().shutdown()
+
+
+if __name__ == "__main__":
+    main()
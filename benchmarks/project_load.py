@@ -0,0 +1,108 @@
+"""
+Benchmark: project loading stages, cold and with the manifest cache
+
+A throwaway project has a package.json with ``--deps`` dependencies and
+``--scripts`` scripts, nested ``--depth`` directories below the temp
+root (lock-file probing walks up the tree). The stages that
+ProjectLoader runs off the GUI thread are timed as they run there:
+cold (first load) and warm (reopening the project; package.json is
+unchanged, so the manifest is served from the cache). "parse twice" is
+what loading did before: package.json parsed for the scripts and again
+for the package info.
+
+Usage:
+    python -m benchmarks.project_load [--deps 3000] [--scripts 500] [--depth 6] [--runs 5]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import manifest_service
+from services.manifest_service import ManifestService
+from services.package_manager import PackageManagerService
+from services.workspace_service import WorkspaceService
+from services.install_state_service import InstallStateService
+from services.file_service import FileService
+
+
+def make_project(root, deps, scripts, depth):
+    project = os.path.join(root, *[f"level{i}" for i in range(depth)], "app")
+    os.makedirs(os.path.join(project, "node_modules"))
+    manifest = {
+        "name": "bench-load",
+        "version": "1.0.0",
+        "scripts": {f"task:{i}": f"node scripts/task{i}.js --flag {i}" for i in range(scripts)},
+        "dependencies": {f"dep-{i}": f"^{i % 9}.{i % 5}.0" for i in range(deps)},
+    }
+    with open(os.path.join(project, "package.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return project
+
+
+def stages(project):
+    return [
+        ("manifest", lambda: ManifestService.load(project)),
+        ("package manager", lambda: PackageManagerService.find_package_manager(project)),
+        ("workspaces", lambda: WorkspaceService.discover(project)),
+        ("install state", lambda: InstallStateService.check(project)),
+        ("leftover trash", lambda: FileService.find_trash(project)),
+    ]
+
+
+def run_stages(project, cold):
+    if cold:
+        manifest_service._cache.clear()
+    times = {}
+    for name, fn in stages(project):
+        started = time.perf_counter()
+        fn()
+        times[name] = time.perf_counter() - started
+    return times
+
+
+def parse_twice(project):
+    path = os.path.join(project, "package.json")
+    started = time.perf_counter()
+    for _ in range(2):
+        with open(path, "r", encoding="utf-8") as f:
+            json.load(f)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deps", type=int, default=3000)
+    parser.add_argument("--scripts", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="autorunner-load-")
+    try:
+        project = make_project(root, args.deps, args.scripts, args.depth)
+        cold = [run_stages(project, cold=True) for _ in range(args.runs)]
+        warm = [run_stages(project, cold=False) for _ in range(args.runs)]
+        twice = statistics.median(parse_twice(project) for _ in range(args.runs))
+
+        size = os.path.getsize(os.path.join(project, "package.json"))
+        print(f"package.json {size / 1024:.0f} KiB, {args.depth + 1} directories deep")
+        print(f"{'stage':<18} {'cold ms':>9} {'warm ms':>9}")
+        for name, _ in stages(project):
+            print(f"{name:<18} {statistics.median(t[name] for t in cold) * 1000:>9.2f} "
+                  f"{statistics.median(t[name] for t in warm) * 1000:>9.2f}")
+        print(f"{'total':<18} {statistics.median(sum(t.values()) for t in cold) * 1000:>9.2f} "
+              f"{statistics.median(sum(t.values()) for t in warm) * 1000:>9.2f}")
+        print(f"parse twice (before): {twice * 1000:.2f} ms on the GUI thread")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: first-output latency and TTY detection, pipe vs PTY runner mode
+
+Each child prints one line, keeps running for ``--hold`` seconds, then
+prints another. The time from spawn to the first bytes read is reported
+per mode (median of ``--repeat`` runs), with what the child saw: whether
+stdout is a TTY, its width, and whether it colored its output. Children:
+
+    python   stdio is block-buffered on a pipe, line-buffered on a TTY
+    node     process.stdout writes immediately either way
+    npm run  the same node child through npm, as the app runs scripts
+
+Usage:
+    python -m benchmarks.pty_latency [--repeat 5] [--hold 1.0]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.stream import PTY_SUPPORTED
+from core.supervisor import ProcessSupervisor
+
+
+PYTHON_CHILD = (
+    "import sys, os, time\n"
+    "tty = sys.stdout.isatty()\n"
+    "cols = os.get_terminal_size().columns if tty else '-'\n"
+    "print(f'python tty={{tty}} columns={{cols}}')\n"
+    "time.sleep({hold})\n"
+    "print('done')\n"
+)
+
+NODE_CHILD = (
+    "const tty = !!process.stdout.isTTY;"
+    "const color = require('util').inspect({{a: 1}}, {{colors: process.stdout.hasColors ? process.stdout.hasColors() : false}});"
+    "console.log(`node tty=${{tty}} columns=${{process.stdout.columns || '-'}} colored=${{color.includes('\\x1b')}}`);"
+    "setTimeout(() => console.log('done'), {hold} * 1000);"
+)
+
+
+def run_once(cmd, cwd, pty_size):
+    runner = ProcessSupervisor.instance().start(cmd, cwd, pty_size=pty_size)
+    lines = []
+    done = []
+    runner.lines_signal.connect(lambda batch: (lines.extend(batch), runner.batch_done()))
+    runner.finished_signal.connect(lambda: done.append(True))
+    while not done:
+        QCoreApplication.processEvents()
+        time.sleep(0.001)
+    latency = runner.first_output_at - runner.started_at if runner.first_output_at else None
+    return latency, lines[0][0] if lines else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--hold", type=float, default=1.0)
+    parser.add_argument("--columns", type=int, default=120)
+    parser.add_argument("--rows", type=int, default=30)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    # Measure default stdio buffering, as Node's child tools would get it
+    os.environ.pop("PYTHONUNBUFFERED", None)
+    workdir = tempfile.mkdtemp()
+    children = [("python", f'"{sys.executable}" -c "{PYTHON_CHILD.format(hold=args.hold)}"')]
+    node = shutil.which("node")
+    if node:
+        with open(os.path.join(workdir, "child.js"), "w", encoding="utf-8") as f:
+            f.write(NODE_CHILD.format(hold=args.hold))
+        children.append(("node", f'"{node}" child.js'))
+        if shutil.which("npm"):
+            with open(os.path.join(workdir, "package.json"), "w", encoding="utf-8") as f:
+                json.dump({"name": "bench", "scripts": {"child": "node child.js"}}, f)
+            children.append(("npm run", "npm run --silent child"))
+    else:
+        print("node not found, only the python child is measured")
+
+    modes = [("pipe", None)]
+    if PTY_SUPPORTED:
+        modes.append(("pty", (args.columns, args.rows)))
+    else:
+        print("PTY mode is not available on this platform")
+
+    print(f"First output latency, median of {args.repeat} runs "
+          f"(second line after {args.hold:.1f} s)\n")
+    print(f"{'child':<9} {'mode':<5} {'first output ms':>16}  child saw")
+    for name, cmd in children:
+        for mode, size in modes:
+            results = [run_once(cmd, workdir, size) for _ in range(args.repeat)]
+            latencies = [latency for latency, _ in results if latency is not None]
+            median = statistics.median(latencies) * 1000 if latencies else float("nan")
+            print(f"{name:<9} {mode:<5} {median:>16.1f}  {results[-1][1]}")
+    ProcessSupervisor.instance().shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
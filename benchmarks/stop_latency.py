@@ -0,0 +1,137 @@
+"""
+Benchmark: stop-to-port-free latency of a dev server behind a wrapper process
+
+The script under test is shaped like ``npm run dev``: a shell runs a
+wrapper (npm) that starts the actual server (node) listening on a port
+and waits for it. Stop methods compared:
+
+legacy: the previous ``taskkill /F /T`` call through a shell (not found
+    on POSIX, so nothing is stopped)
+terminate: Popen.terminate() on the shell, as a plain single-process
+    stop would; the server is orphaned and keeps the port
+group: core.process_tree, SIGTERM to the child's session
+group, ignores TERM: the server ignores SIGTERM, so the stop escalates to
+    SIGKILL after ``--grace`` seconds
+
+Usage:
+    python -m benchmarks.stop_latency [--runs 5] [--grace 1]
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.process_tree import GROUP_POPEN_ARGS, port_in_use, terminate_tree, wait_ports_free
+
+
+SERVER = (
+    "import os, sys, signal, http.server\n"
+    "if sys.argv[2] == '1':\n"
+    "    signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    "server = http.server.HTTPServer(('127.0.0.1', int(sys.argv[1])), http.server.BaseHTTPRequestHandler)\n"
+    "print(os.getpid(), flush=True)\n"
+    "server.serve_forever()\n"
+)
+
+WRAPPER = (
+    "import sys, subprocess\n"
+    "subprocess.run([sys.executable, '-c', sys.argv[1], sys.argv[2], sys.argv[3]])\n"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def alive(pid) -> bool:
+    """True if ``pid`` exists and is not a zombie waiting for init"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rsplit(b")", 1)[1].split()[0] != b"Z"
+    except OSError:
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+
+
+def start(port, ignore_term, group):
+    cmd = subprocess.list2cmdline(
+        [sys.executable, "-c", WRAPPER, SERVER, str(port), "1" if ignore_term else "0"]
+    )
+    options = GROUP_POPEN_ARGS if group else {}
+    process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, **options)
+    server_pid = int(process.stdout.readline())
+    while not port_in_use(port):
+        time.sleep(0.005)
+    return process, server_pid
+
+
+def measure(method, grace, timeout):
+    port = free_port()
+    group = method.startswith("group")
+    process, server_pid = start(port, method == "group, ignores TERM", group)
+
+    started = time.monotonic()
+    if method == "legacy":
+        subprocess.call(f"taskkill /F /T /PID {process.pid}", shell=True,
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        free_at = wait_ports_free({port}, timeout)
+        stop = None
+    elif method == "terminate":
+        process.terminate()
+        process.wait()
+        stop = time.monotonic() - started
+        free_at = wait_ports_free({port}, timeout)
+    else:
+        report = terminate_tree(process, grace)
+        stop = report["stop"]
+        free_at = None if report["port_free"] is None else started + report["port_free"]
+
+    orphaned = alive(server_pid)
+    if orphaned:
+        os.kill(server_pid, signal.SIGKILL)
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+    return stop, None if free_at is None else free_at - started, orphaned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--grace", type=float, default=1.0,
+                        help="Seconds before SIGKILL (stop_grace_seconds)")
+    parser.add_argument("--timeout", type=float, default=3.0,
+                        help="How long to wait for the port before giving up")
+    args = parser.parse_args()
+    if os.name == "nt":
+        print("POSIX only: Windows stops go through taskkill")
+        return
+
+    print(f"{'method':<22} {'stop ms':>9} {'port free ms':>13} {'orphans':>8}")
+    for method in ("legacy", "terminate", "group", "group, ignores TERM"):
+        stops, frees, orphans = [], [], 0
+        for _ in range(args.runs):
+            stop, free, orphaned = measure(method, args.grace, args.timeout)
+            if stop is not None:
+                stops.append(stop)
+            if free is not None:
+                frees.append(free)
+            orphans += orphaned
+        stop_ms = f"{sorted(stops)[len(stops) // 2] * 1000:.1f}" if stops else "-"
+        free_ms = (f"{sorted(frees)[len(frees) // 2] * 1000:.1f}" if len(frees) == args.runs
+                   else f"> {args.timeout * 1000:.0f}")
+        print(f"{method:<22} {stop_ms:>9} {free_ms:>13} {orphans:>5}/{args.runs}")
+
+
+if __name__ == "__main__":
+    main()
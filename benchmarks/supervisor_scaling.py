@@ -0,0 +1,169 @@
+"""
+Benchmark: 1, 10 and 50 concurrent chatty children, thread per process vs supervisor
+
+Every child prints bursts of dev-server-like lines with short sleeps in
+between. They are run once with a thread per child (ThreadPerChild, the
+runner design the supervisor replaced, reduced to reading and splitting
+lines) and once through the single-threaded ProcessSupervisor, which
+also renders each line's ANSI colors. Reported per run: peak OS threads
+of this process, wall time until every child's output was delivered,
+lines/s, CPU time of this process and the longest gap between GUI event
+loop ticks ("max stall"). The console sink only counts lines, so the
+numbers are the cost of reading and batching, not of painting.
+
+Usage:
+    python -m benchmarks.supervisor_scaling [--counts 1 10 50] [--lines 20000]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from core.supervisor import ProcessSupervisor
+
+
+CHILD = (
+    "import sys, time\n"
+    "w = sys.stdout.write\n"
+    "for i in range({n}):\n"
+    "    w(f'\\x1b[36m[vite]\\x1b[0m hmr update /src/components/Widget{{i % 50}}.tsx ({{i}})\\n')\n"
+    "    if i % {burst} == 0:\n"
+    "        sys.stdout.flush()\n"
+    "        time.sleep({sleep})\n"
+)
+
+
+class ThreadPerChild(QThread):
+    """Baseline: a thread blocking on one child's pipe, emitting lines once per frame"""
+    lines_signal = pyqtSignal(list)
+    finished_signal = pyqtSignal()
+
+    def __init__(self, cmd, cwd, flush_interval_ms: int = 16):
+        super().__init__()
+        self.cmd = cmd
+        self.cwd = cwd
+        self.flush_interval = flush_interval_ms / 1000
+
+    def batch_done(self):
+        pass  # No backpressure in the baseline
+
+    def run(self):
+        process = subprocess.Popen(
+            self.cmd, cwd=self.cwd, shell=True,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+        fd = process.stdout.fileno()
+        partial = b""
+        batch = []
+        last_flush = time.monotonic()
+        while True:
+            data = os.read(fd, 64 * 1024)
+            if not data:
+                break
+            *lines, partial = (partial + data).split(b"\n")
+            batch.extend(line.decode("utf-8", errors="replace") for line in lines)
+            now = time.monotonic()
+            if batch and now - last_flush >= self.flush_interval:
+                self.lines_signal.emit(batch)
+                batch = []
+                last_flush = now
+        process.stdout.close()
+        process.wait()
+        if partial:
+            batch.append(partial.decode("utf-8", errors="replace"))
+        if batch:
+            self.lines_signal.emit(batch)
+        self.finished_signal.emit()
+
+
+def os_threads() -> int:
+    """Threads of this process, native ones included where the OS tells"""
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+def measure(app, mode, cmd, count):
+    delivered = [0]
+    finished = []
+    gaps = [0.0]
+    last_tick = [time.perf_counter()]
+    peak_threads = os_threads()
+
+    def tick():
+        now = time.perf_counter()
+        gaps[0] = max(gaps[0], now - last_tick[0])
+        last_tick[0] = now
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+
+    def connect(runner):
+        def on_lines(batch):
+            delivered[0] += len(batch)
+            runner.batch_done()
+        runner.lines_signal.connect(on_lines)
+        runner.finished_signal.connect(lambda: finished.append(runner))
+
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    runners = []
+    for _ in range(count):
+        if mode == "threads":
+            runner = ThreadPerChild(cmd, os.getcwd())
+            connect(runner)
+            runner.start()
+        else:
+            runner = ProcessSupervisor.instance().start(cmd, os.getcwd())
+            connect(runner)
+        runners.append(runner)
+
+    while len(finished) < count:
+        app.processEvents()
+        peak_threads = max(peak_threads, os_threads())
+        time.sleep(0.001)  # idle like a real event loop
+    if mode == "threads":
+        for runner in runners:
+            runner.wait()
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+    timer.stop()
+    return peak_threads, elapsed, delivered[0], cpu, gaps[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--lines", type=int, default=20000, help="Lines per child")
+    parser.add_argument("--burst", type=int, default=20, help="Lines between sleeps")
+    parser.add_argument("--sleep-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    child = CHILD.format(n=args.lines, burst=args.burst, sleep=args.sleep_ms / 1000)
+    cmd = subprocess.list2cmdline([sys.executable, "-c", child])
+
+    print(f"{args.lines} lines per child, {args.burst}-line bursts every {args.sleep_ms:.0f} ms")
+    print(f"{'children':>8} {'mode':<11} {'threads':>8} {'seconds':>8} {'lines/s':>10} "
+          f"{'CPU s':>7} {'max stall ms':>13}")
+    for count in args.counts:
+        for mode in ("threads", "supervisor"):
+            threads, elapsed, lines, cpu, stall = measure(app, mode, cmd, count)
+            print(f"{count:>8} {mode:<11} {threads:>8} {elapsed:>8.2f} {lines / elapsed:>10.0f} "
+                  f"{cpu:>7.2f} {stall * 1000:>13.1f}")
+    ProcessSupervisor.instance().shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: task cache hit vs running a build
+
+A throwaway project has ``--files`` source files under ``src/`` and a
+``build`` script that takes ``--build-ms`` and writes ``--outputs`` files
+to ``dist/``. Measured with core.task_cache like the terminal tab uses it:
+
+run: the script itself (through the shell, as on a miss)
+key (cold): hashing every input with an empty digest memo (first run
+    after the app starts)
+key (warm): the same with memoized digests (one stat per input)
+store: writing the output and the dist/ tar (off the GUI thread in the app)
+hit: key + lookup + replaying the output + restoring dist/
+
+Usage:
+    python -m benchmarks.task_cache [--files 2000] [--outputs 200] [--build-ms 2000]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.task_cache import TaskCache
+
+
+BUILD = (
+    "import os, sys, time\n"
+    "time.sleep(int(sys.argv[1]) / 1000)\n"
+    "os.makedirs('dist', exist_ok=True)\n"
+    "for i in range(int(sys.argv[2])):\n"
+    "    with open(f'dist/chunk-{i}.js', 'w') as f:\n"
+    "        f.write('export const x = %d;\\n' % i * 200)\n"
+    "    print(f'dist/chunk-{i}.js  {i * 3 % 97 + 1}.2 kB')\n"
+)
+
+
+def make_project(root, files):
+    for i in range(files):
+        directory = os.path.join(root, "src", f"module{i % 40}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.ts"), "w", encoding="utf-8") as f:
+            f.write(f"export const value{i} = {i};\n" * 40)
+    with open(os.path.join(root, "package.json"), "w", encoding="utf-8") as f:
+        f.write('{"name": "bench-cache", "scripts": {"build": "python build.py"}}')
+    with open(os.path.join(root, "build.py"), "w", encoding="utf-8") as f:
+        f.write(BUILD)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--outputs", type=int, default=200)
+    parser.add_argument("--build-ms", type=int, default=2000)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="autorunner-cache-")
+    project = os.path.join(root, "project")
+    os.makedirs(project)
+    try:
+        make_project(project, args.files)
+        cache = TaskCache(os.path.join(root, "cache"))
+        inputs, outputs = ["src/", "build.py"], ["dist/"]
+
+        def key():
+            return cache.compute_key(project, "build", "python build.py", "npm", inputs, outputs)
+
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "build.py", str(args.build_ms), str(args.outputs)],
+            cwd=project, capture_output=True, text=True
+        )
+        run = time.perf_counter() - started
+        lines = [(line, line) for line in result.stdout.splitlines()]
+
+        started = time.perf_counter()
+        cache_key, count = key()
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        key()
+        warm = time.perf_counter() - started
+
+        started = time.perf_counter()
+        cache.store(cache_key, project, "build", run, lines, outputs)
+        store = time.perf_counter() - started
+
+        shutil.rmtree(os.path.join(project, "dist"))
+        started = time.perf_counter()
+        hit_key, _ = key()
+        meta = cache.lookup(hit_key)
+        replayed = cache.load_output(hit_key)
+        restored = cache.restore_outputs(hit_key, project, outputs)
+        hit = time.perf_counter() - started
+        ok = meta is not None and restored and len(replayed) == len(lines) and \
+            len(os.listdir(os.path.join(project, "dist"))) == args.outputs
+
+        print(f"{count} inputs, {args.outputs} outputs, {len(lines)} output lines")
+        print(f"{'step':<12} {'ms':>9}")
+        for label, seconds in (
+            ("run", run), ("key (cold)", cold), ("key (warm)", warm),
+            ("store", store), ("hit", hit),
+        ):
+            print(f"{label:<12} {seconds * 1000:>9.1f}")
+        print(f"hit restores the run: {'yes' if ok else 'NO'}; saved {(run - hit) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: a build script run as one serial chain vs the task graph scheduler
+
+A throwaway project gets a ``build`` script shaped like a real one:
+
+    prebuild -> clean -> run-p build:* (4 scripts, one depending on codegen)
+    -> bundle -> postbuild
+
+Every task sleeps (I/O-bound, like a bundler waiting on disk or network),
+so the limit and not the CPU count decides the speedup. The graph is run
+through the ProcessSupervisor with a parallelism limit of 1 (what one
+``npm run build`` does) and then with more. Reported: wall time, the
+critical path and serial time of the measured durations, and the peak
+number of tasks running at once.
+
+Usage:
+    python -m benchmarks.task_graph [--task-ms 300] [--parallel 1 2 4 8]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from core.supervisor import ProcessSupervisor
+from core.task_graph import TaskScheduler
+from services.task_graph_service import TaskGraphService
+
+
+def make_project(root, task_ms):
+    sleep = subprocess.list2cmdline(
+        [sys.executable, "-c", f"import time; time.sleep({task_ms / 1000})"]
+    )
+    scripts = {
+        "prebuild": sleep,
+        "clean": sleep,
+        "codegen": sleep,
+        "build": "npm run clean && run-p build:* && npm run bundle",
+        "build:css": sleep,
+        "build:types": sleep,
+        "build:js": f"npm run codegen && {sleep}",
+        "build:assets": sleep,
+        "bundle": sleep,
+        "postbuild": sleep,
+    }
+    with open(os.path.join(root, "package.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "bench-graph", "version": "1.0.0", "scripts": scripts}, f)
+
+
+def run_graph(app, root, max_parallel):
+    graph = TaskGraphService.build(root, "build")
+    supervisor = ProcessSupervisor.instance()
+
+    def start_node(node):
+        handle = supervisor.start(node.cmd, root, env=node.env)
+        handle.lines_signal.connect(lambda _: handle.batch_done())
+        return handle
+
+    scheduler = TaskScheduler(graph, start_node, max_parallel)
+    reports = []
+    scheduler.finished_signal.connect(reports.append)
+    scheduler.start()
+    while not reports:
+        app.processEvents()
+        time.sleep(0.001)
+    return reports[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--task-ms", type=int, default=300)
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    root = tempfile.mkdtemp(prefix="autorunner-graph-")
+    try:
+        make_project(root, args.task_ms)
+        print(f"{'limit':>5} {'wall ms':>9} {'critical ms':>12} {'serial ms':>10} {'peak':>5}  result")
+        for limit in args.parallel:
+            report = run_graph(app, root, limit)
+            failed = [name for name, state in report["states"].items() if state != "done"]
+            result = f"not done: {', '.join(failed)}" if failed else "ok"
+            print(f"{limit:>5} {report['wall'] * 1000:>9.0f} {report['critical'] * 1000:>12.0f} "
+                  f"{report['serial'] * 1000:>10.0f} {report['peak_parallel']:>5}  {result}")
+        print(f"critical path: {' -> '.join(report['path'])}")
+    finally:
+        ProcessSupervisor.instance().shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: deleting node_modules for Reinstall
+
+A throwaway ``node_modules`` has ``--packages`` packages of ``--files``
+small files each (a few nested directories per package). Measured:
+
+rmtree: shutil.rmtree, what a synchronous delete costs the caller
+move aside: the rename Reinstall does before installing, i.e. how long
+    the install waits with core.tree_remover
+remover (N threads): TreeRemover deleting the moved tree in the background
+
+Usage:
+    python -m benchmarks.tree_removal [--packages 1500] [--files 20]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tree_remover import TreeRemover
+
+
+def make_tree(root, packages, files):
+    node_modules = os.path.join(root, "node_modules")
+    for i in range(packages):
+        for j in range(files):
+            directory = os.path.join(node_modules, f"pkg-{i}", ("lib", "dist", "src")[j % 3])
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"file{j}.js"), "w", encoding="utf-8") as f:
+                f.write("module.exports = 1;\n")
+    return node_modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--packages", type=int, default=1500)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="autorunner-rm-")
+    try:
+        results = []
+        node_modules = make_tree(root, args.packages, args.files)
+        started = time.perf_counter()
+        shutil.rmtree(node_modules)
+        results.append(("rmtree", time.perf_counter() - started))
+
+        removed = 0
+        for workers in (1, 8):
+            node_modules = make_tree(root, args.packages, args.files)
+            started = time.perf_counter()
+            trash = TreeRemover.move_aside(node_modules)
+            results.append(("move aside", time.perf_counter() - started))
+            remover = TreeRemover(max_workers=workers)
+            started = time.perf_counter()
+            remover.start([trash], "node_modules")
+            remover._thread.join()
+            results.append((f"remover ({workers} threads)", time.perf_counter() - started))
+            removed = remover.removed
+
+        print(f"{args.packages} packages, {removed:,} entries per tree")
+        print(f"{'step':<22} {'ms':>9}")
+        for label, seconds in results:
+            print(f"{label:<22} {seconds * 1000:>9.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: change-to-signal latency and idle CPU of the watcher backends
+
+Usage:
+    python -m benchmarks.watcher_latency [--files 5000] [--samples 5]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.watch_backends import HAS_WATCHDOG, EventBackend, PollingBackend
+
+
+def make_tree(root, files):
+    """Create a synthetic project with ``files`` source files"""
+    per_dir = 50
+    for i in range(files):
+        folder = os.path.join(root, "src", f"pkg{i // per_dir}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"file{i}.ts"), "w") as f:
+            f.write("export const x = 1;\n")
+    os.makedirs(os.path.join(root, "node_modules", "dep"), exist_ok=True)
+
+
+def measure(backend_cls, root, samples, idle_seconds, **kwargs):
+    hit = threading.Event()
+    target = {"path": None}
+
+    def callback(path, kind):
+        if path == target["path"]:
+            hit.set()
+
+    backend = backend_cls(root, callback, **kwargs)
+    backend.start()
+    worker = threading.Thread(target=backend.run, daemon=True)
+    worker.start()
+    time.sleep(0.5)  # let the first pass / watch registration settle
+
+    # Idle CPU: process time consumed while nothing changes
+    cpu_start = time.process_time()
+    time.sleep(idle_seconds)
+    idle_cpu = (time.process_time() - cpu_start) / idle_seconds * 100
+
+    latencies = []
+    files = sorted(
+        os.path.join(dp, f)
+        for dp, _, fs in os.walk(os.path.join(root, "src")) for f in fs
+    )
+    for n in range(samples):
+        path = files[(n * 97) % len(files)]
+        target["path"] = path
+        hit.clear()
+        # Ensure mtime moves even on coarse-grained filesystems
+        time.sleep(0.05)
+        started = time.perf_counter()
+        with open(path, "a") as f:
+            f.write(f"// edit {n}\n")
+        if hit.wait(10):
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    backend.stop()
+    worker.join(5)
+    return latencies, idle_cpu
+
+
+def report(name, latencies, idle_cpu, samples):
+    if latencies:
+        latencies.sort()
+        median = latencies[len(latencies) // 2]
+        print(
+            f"{name:<8} median {median:9.1f} ms   max {latencies[-1]:9.1f} ms   "
+            f"idle CPU {idle_cpu:5.1f}%   ({len(latencies)}/{samples} detected)"
+        )
+    else:
+        print(f"{name:<8} no changes detected   idle CPU {idle_cpu:5.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--idle", type=float, default=4.0, help="idle seconds")
+    parser.add_argument("--interval", type=float, default=2.0, help="poll interval")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="autorunner-bench-")
+    try:
+        make_tree(root, args.files)
+        print(f"Tree: {args.files} files in {root}\n")
+
+        latencies, idle_cpu = measure(
+            PollingBackend, root, args.samples, args.idle, interval=args.interval
+        )
+        report("poll", latencies, idle_cpu, args.samples)
+
+        if HAS_WATCHDOG:
+            latencies, idle_cpu = measure(EventBackend, root, args.samples, args.idle)
+            report("events", latencies, idle_cpu, args.samples)
+        else:
+            print("events   skipped (watchdog not installed)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Streaming ANSI SGR renderer
+
+Converts child process output into console HTML instead of stripping
+colors. SGR state (colors, bold, ...) persists across lines and batches
+and URLs are linked while rendering, so the GUI thread only has to join
+ready-made markup. Lines arrive complete (TerminalLines reassembles
+escapes split across chunks), so an escape left unfinished at the end of
+a line is dropped rather than joined with the next one.
+"""
+import re
+
+
+# 16-color palette tuned for the dark console backgrounds of the themes
+PALETTE = (
+    "#4d4d4d", "#ff5f6d", "#5af78e", "#f3f99d",
+    "#57c7ff", "#ff6ac1", "#9aedfe", "#e6e6e6",
+    "#7f7f7f", "#ff8c94", "#8affb0", "#fbffbe",
+    "#8fd9ff", "#ff9bd7", "#c2f5ff", "#ffffff",
+)
+
+LINK_COLOR = "#66ccff"
+
+# Escape sequences in HTML-escaped output ('<' and '>' appear as entities):
+# group 1 is a run of SGR sequences, anything else (cursor movement, OSC
+# titles and hyperlinks, two-byte escapes, a stray ESC, a sequence left
+# unfinished at the end of a line) is dropped
+_ESCAPE = re.compile(
+    r"\x1b(?:(\[[0-9;:]*m(?:\x1b\[[0-9;:]*m)*)"
+    r"|\[(?:[0-?]|&lt;|&gt;)*[ -/]*(?:[@-~]|(?=\n|\Z))"
+    r"|\][^\x07\x1b\n]*(?:\x07|\x1b\\|(?=\n|\Z))"
+    r"|[@-Z\\-_]|)"
+)
+_STRIP = re.compile(
+    r"\x1b(?:\[[0-?]*[ -/]*(?:[@-~]|(?=\n|\Z))"
+    r"|\][^\x07\x1b\n]*(?:\x07|\x1b\\|(?=\n|\Z))|[@-Z\\-_]|)"
+)
+_SGR = re.compile(r"\[([0-9;:]*)m")
+_URL = re.compile(r"https?://(?:[^\s&<\"']|&amp;)+")
+_URL_LINK = rf'<a href="\g<0>" style="color:{LINK_COLOR};">\g<0></a>'
+
+# Indices into the style state
+FG, BG, BOLD, DIM, ITALIC, UNDERLINE, INVERSE = range(7)
+DEFAULT_STYLE = (None, None, False, False, False, False, False)
+
+
+def escape_html(text: str) -> str:
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def color_256(n: int) -> str:
+    """xterm 256-color index to hex"""
+    if n < 16:
+        return PALETTE[n]
+    if n < 232:
+        n -= 16
+        levels = (0, 95, 135, 175, 215, 255)
+        return "#%02x%02x%02x" % (levels[n // 36], levels[(n // 6) % 6], levels[n % 6])
+    gray = 8 + (n - 232) * 10
+    return "#%02x%02x%02x" % (gray, gray, gray)
+
+
+def apply_sgr(style: list, params: str):
+    """Update a mutable style list with the parameters of one SGR sequence"""
+    codes = [int(p) if p.isdigit() else 0 for p in params.replace(":", ";").split(";")]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            style[:] = DEFAULT_STYLE
+        elif code == 1:
+            style[BOLD] = True
+        elif code == 2:
+            style[DIM] = True
+        elif code == 3:
+            style[ITALIC] = True
+        elif code == 4:
+            style[UNDERLINE] = True
+        elif code == 7:
+            style[INVERSE] = True
+        elif code == 22:
+            style[BOLD] = style[DIM] = False
+        elif code == 23:
+            style[ITALIC] = False
+        elif code == 24:
+            style[UNDERLINE] = False
+        elif code == 27:
+            style[INVERSE] = False
+        elif 30 <= code <= 37:
+            style[FG] = PALETTE[code - 30]
+        elif 90 <= code <= 97:
+            style[FG] = PALETTE[code - 90 + 8]
+        elif code == 39:
+            style[FG] = None
+        elif 40 <= code <= 47:
+            style[BG] = PALETTE[code - 40]
+        elif 100 <= code <= 107:
+            style[BG] = PALETTE[code - 100 + 8]
+        elif code == 49:
+            style[BG] = None
+        elif code in (38, 48) and i + 1 < len(codes):
+            target = FG if code == 38 else BG
+            if codes[i + 1] == 5 and i + 2 < len(codes):
+                style[target] = color_256(codes[i + 2] & 0xFF)
+                i += 2
+            elif codes[i + 1] == 2 and i + 4 < len(codes):
+                r, g, b = (c & 0xFF for c in codes[i + 2:i + 5])
+                style[target] = "#%02x%02x%02x" % (r, g, b)
+                i += 4
+        i += 1
+
+
+def style_css(style: tuple) -> str:
+    fg, bg = style[FG], style[BG]
+    if style[INVERSE]:
+        fg, bg = bg or "#1a1a1a", fg or PALETTE[7]
+    parts = []
+    if fg:
+        parts.append(f"color:{fg}")
+    if bg:
+        parts.append(f"background-color:{bg}")
+    if style[BOLD]:
+        parts.append("font-weight:bold")
+    if style[ITALIC]:
+        parts.append("font-style:italic")
+    if style[UNDERLINE]:
+        parts.append("text-decoration:underline")
+    return ";".join(parts)
+
+
+class AnsiRenderer:
+    """
+    Stateful ANSI-to-HTML converter for one output stream
+
+    ``render_lines(lines)`` returns ``(text, html)`` pairs: each line
+    without escape sequences and its console HTML. Spans are closed at the
+    end of every line and reopened on the next, so lines can be stored and
+    shown independently. A batch is escaped and tokenized as one block;
+    Python code only runs for color changes.
+    """
+
+    def __init__(self):
+        self._styles = [DEFAULT_STYLE]
+        self._style_ids = {DEFAULT_STYLE: 0}
+        self._transitions = {}
+        self._marks = []
+        self.reset()
+
+    def reset(self):
+        self._style_id = 0
+        self._tag = ""
+
+    def _transition(self, style_id, sequences):
+        """Resolve a run of SGR sequences applied to a style (cached)"""
+        state = list(self._styles[style_id])
+        for params in _SGR.findall(sequences):
+            apply_sgr(state, params)
+        new = tuple(state)
+        new_id = self._style_ids.get(new)
+        if new_id is None:
+            new_id = self._style_ids[new] = len(self._styles)
+            self._styles.append(new)
+        css = style_css(new)
+        tag = f'<span style="{css}">' if css else ""
+        old_css = style_css(self._styles[style_id])
+        markup = ("</span>" + tag) if old_css else tag
+        result = self._transitions[style_id, sequences] = (new_id, tag, markup)
+        return result
+
+    def _replace(self, m):
+        sequences = m.group(1)
+        if sequences is None:
+            return ""
+        style_id = self._style_id
+        hit = self._transitions.get((style_id, sequences))
+        if hit is None:
+            hit = self._transition(style_id, sequences)
+        new_id, tag, markup = hit
+        if new_id == style_id:
+            return ""
+        self._style_id = new_id
+        self._tag = tag
+        self._marks.append((m.start(), tag))
+        return markup
+
+    def render_lines(self, lines) -> list:
+        """Render a batch of raw output lines to ``(text, html)`` pairs"""
+        if not lines:
+            return []
+        block = "\n".join(lines)
+        has_escapes = "\x1b" in block
+
+        start_tag = self._tag
+        escaped = escape_html(block)
+        marks = self._marks = []
+        markup = _ESCAPE.sub(self._replace, escaped) if has_escapes else escaped
+        if "://" in block:
+            markup = _URL.sub(_URL_LINK, markup)
+
+        texts = _STRIP.sub("", block).split("\n") if has_escapes else lines
+        html_lines = markup.split("\n")
+        if marks or start_tag:
+            html_lines = self._close_spans(html_lines, escaped, marks, start_tag)
+        return list(zip(texts, html_lines))
+
+    @staticmethod
+    def _close_spans(html_lines, escaped, marks, tag):
+        """Make each line self-contained given the style transitions in it"""
+        marks.append((len(escaped) + 1, None))
+        next_mark, next_tag = marks[0]
+        mark_index = 0
+        line_end = -1
+        result = []
+        append = result.append
+        for line in html_lines:
+            line_end = escaped.find("\n", line_end + 1)
+            if line_end < 0:
+                line_end = len(escaped)
+            if next_mark > line_end:
+                # No style change on this line
+                append(f"{tag}{line}</span>" if tag else line)
+                continue
+            start_tag = tag
+            while next_mark < line_end:
+                tag = next_tag
+                mark_index += 1
+                next_mark, next_tag = marks[mark_index]
+            if start_tag:
+                line = start_tag + line
+            append(line + "</span>" if tag else line)
+        return result
+
+    def preview_lines(self, lines) -> list:
+        """Render lines that may still change, leaving the stream state as is"""
+        state = (self._style_id, self._tag)
+        try:
+            return self.render_lines(lines)
+        finally:
+            self._style_id, self._tag = state
+
+    def render(self, line: str):
+        """Render a single line, see render_lines()"""
+        return self.render_lines([line])[0]
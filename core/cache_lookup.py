@@ -0,0 +1,106 @@
+"""
+Task cache lookup off the GUI thread
+
+Before a cached script starts, its key hashes every input file and a hit
+extracts the stored outputs into the project. On a large project either
+can take long enough to freeze the window, so a CacheLookup does both on
+a daemon thread and reports the hit or miss through a signal; the tab
+replays the output or starts the script from there.
+
+A lookup whose tab goes away is ``detach()``-ed like a TreeRemover: it is
+cancelled, its signals are disconnected and running lookups are
+referenced by the class until their thread ends.
+"""
+import time
+import threading
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class CacheLookup(QObject):
+    """
+    Compute a run's cache key and restore its outputs on a hit
+
+    Signals:
+        hit_signal(meta, lines, seconds): outputs restored; ``lines`` are
+            the stored ``(text, html)`` console lines
+        miss_signal(key, inputs, hashed, restore_failed): ``hashed`` is the
+            time spent hashing; ``restore_failed`` is True when a stored
+            run was found but its outputs could not be restored
+
+    Args:
+        cache: TaskCache to look in
+        project_path: Project directory
+        script: Script name
+        body: Script command line
+        package_manager: Package manager running the script
+        config: ``ProjectConfigService.get_cache_config()`` of the script
+        lockfile: Lock file of the project, None if there is none
+    """
+    hit_signal = pyqtSignal(object, object, float)
+    miss_signal = pyqtSignal(str, int, float, bool)
+
+    _running = set()
+    _running_lock = threading.Lock()
+
+    def __init__(self, cache, project_path: str, script: str, body: str,
+                 package_manager: str, config: dict, lockfile: str = None):
+        super().__init__()
+        self.cache = cache
+        self.project_path = project_path
+        self.script = script
+        self.body = body
+        self.package_manager = package_manager
+        self.config = config
+        self.lockfile = lockfile
+        self.cancelled = False
+        self._thread = None
+
+    def start(self):
+        """Look up the run on a background thread"""
+        with CacheLookup._running_lock:
+            CacheLookup._running.add(self)
+        self._thread = threading.Thread(target=self._lookup, daemon=True)
+        self._thread.start()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def cancel(self):
+        """Report nothing and skip restoring outputs not yet touched"""
+        self.cancelled = True
+
+    def detach(self):
+        """Cancel and disconnect every receiver; the thread ends on its own"""
+        self.cancel()
+        for signal in (self.hit_signal, self.miss_signal):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass  # Nothing connected
+
+    def _lookup(self):
+        try:
+            started = time.perf_counter()
+            key, inputs = self.cache.compute_key(
+                self.project_path, self.script, self.body, self.package_manager,
+                self.config["inputs"], self.config["outputs"], self.config["env"],
+                self.lockfile
+            )
+            hashed = time.perf_counter() - started
+            meta = self.cache.lookup(key)
+            restore_failed = False
+            if meta is not None:
+                lines = self.cache.load_output(key)
+                if self.cancelled:
+                    return
+                if self.cache.restore_outputs(key, self.project_path, self.config["outputs"]):
+                    if not self.cancelled:
+                        self.hit_signal.emit(meta, lines, time.perf_counter() - started)
+                    return
+                restore_failed = True
+            if not self.cancelled:
+                self.miss_signal.emit(key, inputs, hashed, restore_failed)
+        finally:
+            with CacheLookup._running_lock:
+                CacheLookup._running.discard(self)
@@ -0,0 +1,164 @@
+"""
+Coalescing and debouncing of file watcher events
+
+Raw ``(path, kind)`` events from a watcher backend are merged per path and
+released as one ChangeSet once the tree has been quiet for ``quiet_ms``.
+Bursts larger than ``storm_threshold`` files (git checkout, formatter runs)
+are flagged as storms and held until they settle, so they reach the UI as a
+single summary event.
+"""
+import os
+import time
+import threading
+from dataclasses import dataclass, field
+
+
+CHANGE_KINDS = ("created", "modified", "deleted")
+
+
+def merge_kinds(previous: str, current: str):
+    """
+    Merge two consecutive change kinds for the same path
+
+    Returns:
+        str or None: Net kind, None if the changes cancel out
+    """
+    if previous == "created":
+        if current == "deleted":
+            return None  # created and removed within the window
+        return "created"
+    if previous == "deleted" and current == "created":
+        return "modified"  # replaced (atomic save)
+    return current
+
+
+@dataclass
+class ChangeSet:
+    """A batch of coalesced file changes under ``root``"""
+    root: str
+    changes: dict = field(default_factory=dict)
+    events: int = 0
+    unchanged: int = 0
+    storm: bool = False
+    first_event: float = 0.0
+    last_event: float = 0.0
+
+    @property
+    def total(self):
+        return len(self.changes)
+
+    @property
+    def counts(self):
+        counts = dict.fromkeys(CHANGE_KINDS, 0)
+        for kind in self.changes.values():
+            counts[kind] += 1
+        return counts
+
+    def paths(self, kind=None):
+        """Sorted relative paths, optionally filtered by kind"""
+        return sorted(
+            path for path, k in self.changes.items() if kind is None or k == kind
+        )
+
+    def summary(self, limit=3):
+        """Human readable one-line description"""
+        counts = ", ".join(f"{n} {kind}" for kind, n in self.counts.items() if n)
+        if self.storm or self.total > limit:
+            return f"{self.total} files changed ({counts})"
+        return ", ".join(f"{path} ({kind})" for path, kind in sorted(self.changes.items()))
+
+
+class ChangeCoalescer:
+    """
+    Thread-safe event aggregator with its own flush loop
+
+    Args:
+        root: Project root, paths in change-sets are relative to it
+        on_flush: Called with a ChangeSet from the flush thread
+        quiet_ms: Flush after this long without new events
+        max_delay_ms: Flush a continuous stream at least this often
+        storm_threshold: More files than this in one window is a storm
+        storm_max_ms: Upper bound on how long a storm is held back
+    """
+
+    def __init__(self, root: str, on_flush, quiet_ms: int = 300,
+                 max_delay_ms: int = 2000, storm_threshold: int = 200,
+                 storm_max_ms: int = 10000):
+        self.root = root
+        self.on_flush = on_flush
+        self.quiet = quiet_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.storm_threshold = storm_threshold
+        self.storm_max = storm_max_ms / 1000
+        self._pending = None
+        self._cond = threading.Condition()
+        self._running = True
+
+    def relative(self, path: str) -> str:
+        rel = os.path.relpath(path, self.root)
+        return rel.replace(os.sep, "/")
+
+    def add(self, path: str, kind: str):
+        """Record a raw event, may be called from any thread"""
+        rel = self.relative(path)
+        now = time.monotonic()
+        with self._cond:
+            pending = self._pending
+            if pending is None:
+                pending = self._pending = ChangeSet(self.root, first_event=now)
+            pending.events += 1
+            pending.last_event = now
+
+            previous = pending.changes.get(rel)
+            merged = kind if previous is None else merge_kinds(previous, kind)
+            if merged is None:
+                del pending.changes[rel]
+            else:
+                pending.changes[rel] = merged
+
+            if len(pending.changes) > self.storm_threshold:
+                pending.storm = True
+            self._cond.notify()
+
+    def _due_in(self, pending, now):
+        """Seconds until ``pending`` should be flushed (<= 0 means now)"""
+        quiet_due = pending.last_event + self.quiet
+        cap = self.storm_max if pending.storm else self.max_delay
+        return min(quiet_due, pending.first_event + cap) - now
+
+    def flush(self):
+        """
+        Take the pending change-set, if any
+
+        Returns:
+            ChangeSet or None
+        """
+        with self._cond:
+            pending, self._pending = self._pending, None
+        if pending is not None and pending.changes:
+            return pending
+        return None
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def run(self):
+        """Flush loop, blocks until stop() is called"""
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._pending is None:
+                        self._cond.wait()
+                        continue
+                    delay = self._due_in(self._pending, time.monotonic())
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if not self._running:
+                    return
+
+            change_set = self.flush()
+            if change_set is not None:
+                self.on_flush(change_set)
@@ -2,7 +2,7 @@ import os
 from scripts import APP_NAME, APP_PUBLISHER
 
 BASE_DIR = os.path.join(
-    os.getenv("APPDATA"),
+    os.getenv("APPDATA") or os.path.join(os.path.expanduser("~"), ".config"),
     APP_PUBLISHER,
     APP_NAME
 )
@@ -10,5 +10,11 @@ BASE_DIR = os.path.join(
 RECENT_FILE = os.path.join(BASE_DIR, "recent.json")
 FAVORITES_FILE = os.path.join(BASE_DIR, "favorites.json")
 SETTINGS_FILE = os.path.join(BASE_DIR, "settings.json")
+LOGS_DIR = os.path.join(BASE_DIR, "logs")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+INSTALL_HISTORY_FILE = os.path.join(BASE_DIR, "install_history.json")
+
+# Prefix of node_modules trees moved aside by Reinstall while they are deleted
+TRASH_PREFIX = ".autorunner-trash-"
 
 os.makedirs(BASE_DIR, exist_ok=True)
@@ -0,0 +1,142 @@
+"""
+Content verification for watcher change-sets
+
+Drops "modified" entries whose bytes did not actually change (save without
+edits, ``touch``, tools rewriting identical output). Each file's last seen
+``(inode, size, mtime_ns)`` key and content digest are cached; a change is
+only forwarded when the key moved *and* the streamed digest differs.
+
+Hashing is bounded: files above ``max_bytes`` are never hashed, each batch
+has a time budget after which remaining entries are forwarded unverified,
+and the work runs on the coalescer's flush thread, never the UI thread.
+
+The watcher primes the cache with ``prime()`` before it starts listening,
+so the first save of an already existing file can be verified too. Priming
+has its own time budget; files it did not reach are fingerprinted on
+their first event, which is then forwarded.
+"""
+import os
+import time
+import hashlib
+from collections import OrderedDict
+
+
+class ContentVerifier:
+    """
+    Cache of file fingerprints used to filter spurious changes
+
+    Args:
+        root: Project root, change-set paths are relative to it
+        max_bytes: Files larger than this are forwarded without hashing
+        budget_ms: Hashing time allowed per change-set
+        max_entries: LRU bound on cached fingerprints
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: str, max_bytes: int = 8 * 1024 * 1024,
+                 budget_ms: int = 250, max_entries: int = 50000):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.budget = budget_ms / 1000
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+
+    def _digest(self, path: str):
+        """Streamed blake2b digest, None if the file can't be read"""
+        h = hashlib.blake2b(digest_size=16)
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    h.update(chunk)
+        except OSError:
+            return None
+        return h.digest()
+
+    def _store(self, path, key, digest):
+        self._cache[path] = (key, digest)
+        self._cache.move_to_end(path)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def prime(self, paths, budget_ms: int = 2000) -> int:
+        """
+        Record fingerprints of existing files without reporting changes
+
+        Args:
+            paths: Iterable of absolute file paths, consumed lazily
+            budget_ms: Stop priming after this much time
+
+        Returns:
+            int: Number of files fingerprinted
+        """
+        deadline = time.monotonic() + budget_ms / 1000
+        primed = 0
+        for path in paths:
+            if time.monotonic() > deadline or primed >= self.max_entries:
+                break
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            digest = self._digest(path) if st.st_size <= self.max_bytes else None
+            self._store(path, key, digest)
+            primed += 1
+        return primed
+
+    def forget(self, path: str):
+        self._cache.pop(path, None)
+
+    def is_changed(self, path: str) -> bool:
+        """
+        Check whether a file's content changed since it was last seen
+
+        Unknown files count as changed (there is nothing to compare with),
+        but their fingerprint is recorded for the next event.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.forget(path)
+            return True
+
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        entry = self._cache.get(path)
+        if entry is not None and entry[0] == key:
+            return False
+
+        if st.st_size > self.max_bytes:
+            self._store(path, key, None)
+            return True
+
+        digest = self._digest(path)
+        self._store(path, key, digest)
+        if entry is None or entry[1] is None or digest is None:
+            return True
+        return digest != entry[1]
+
+    def filter(self, change_set):
+        """
+        Remove unchanged files from a ChangeSet in place
+
+        Returns:
+            ChangeSet: The same object, ``unchanged`` counts dropped entries
+        """
+        deadline = time.monotonic() + self.budget
+        for rel, kind in list(change_set.changes.items()):
+            path = os.path.join(self.root, rel)
+            if kind == "deleted":
+                self.forget(path)
+                continue
+            if time.monotonic() > deadline:
+                # Over budget: forward the rest, just drop stale fingerprints
+                self.forget(path)
+                continue
+            if not self.is_changed(path) and kind == "modified":
+                del change_set.changes[rel]
+                change_set.unchanged += 1
+        return change_set
@@ -0,0 +1,245 @@
+"""
+Compiled include/exclude matcher for the file watcher
+
+Combines the built-in excludes, ``.gitignore`` files, ``.git/info/exclude``
+and per-project include/exclude globs into one regular expression per
+entry type, so deciding whether a path is watched costs a single
+``fullmatch``. Gitignore semantics ("last matching pattern wins") are kept
+by placing patterns in reverse order: the first alternative that matches
+is the last pattern in file order, and its group index says whether it
+was a negation.
+"""
+import os
+import re
+
+
+# Directories that are never worth watching in a Node.js project
+DEFAULT_EXCLUDE = (
+    "node_modules/",
+    ".git/",
+    "dist/",
+    "build/",
+    ".next/",
+    ".nuxt/",
+    ".svelte-kit/",
+    ".turbo/",
+    ".cache/",
+    ".parcel-cache/",
+    ".vercel/",
+    "coverage/",
+    ".autorunner-trash-*/",
+)
+
+DEFAULT_INCLUDE = (
+    "*.js", "*.mjs", "*.cjs", "*.jsx",
+    "*.ts", "*.mts", "*.cts", "*.tsx",
+    "*.json",
+    "*.vue", "*.svelte",
+    "*.css", "*.scss", "*.sass", "*.less",
+    "*.html",
+)
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a gitignore-style glob (without anchors) to a regex"""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                end = i + 2
+                at_segment_start = i == 0 or pattern[i - 1] == "/"
+                if at_segment_start and end == n:
+                    out.append(".*")
+                    i = end
+                    continue
+                if at_segment_start and pattern[end] == "/":
+                    out.append("(?:.*/)?")
+                    i = end + 1
+                    continue
+                i = end
+            else:
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_pattern(line: str, base: str = ""):
+    """
+    Parse one gitignore line
+
+    Args:
+        line: Raw line from a .gitignore (or a config glob)
+        base: Directory of the ignore file relative to the root ('' for root)
+
+    Returns:
+        tuple or None: ``(regex, negated, dir_only)``
+    """
+    if line.endswith("\\ "):
+        line = line[:-2].rstrip() + "\\ "
+    else:
+        line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    prefix = re.escape(base + "/") if base else ""
+    if not anchored:
+        prefix += "(?:.*/)?"
+    return prefix + translate_glob(line), negated, dir_only
+
+
+class _RuleSet:
+    """Ordered patterns compiled into one last-match-wins regex"""
+
+    def __init__(self, rules):
+        # rules: [(regex, negated)] in priority order (last wins)
+        alternatives = []
+        self.negated = [None]
+        for regex, negated in reversed(rules):
+            alternatives.append(f"({regex})")
+            self.negated.append(negated)
+        self.regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def ignored(self, rel: str) -> bool:
+        if self.regex is None:
+            return False
+        m = self.regex.fullmatch(rel)
+        if m is None:
+            return False
+        return not self.negated[m.lastindex]
+
+
+class PathMatcher:
+    """
+    Decide which paths under ``root`` the watcher cares about
+
+    Args:
+        root: Project root
+        include: Globs a file must match to be watched
+        exclude: Extra globs to ignore, applied after .gitignore rules
+        use_gitignore: Read .gitignore files and .git/info/exclude
+    """
+
+    def __init__(self, root: str, include=DEFAULT_INCLUDE, exclude=(),
+                 use_gitignore: bool = True):
+        self.root = os.path.normpath(root)
+        self._prefix_len = len(self.root) + 1
+        self.ignore_files = []
+
+        patterns = [parse_pattern(p) for p in DEFAULT_EXCLUDE]
+        if use_gitignore:
+            patterns.extend(self._read_ignore_files(patterns))
+        patterns.extend(parse_pattern(p) for p in exclude)
+        patterns = [p for p in patterns if p]
+
+        # Files must match an include glob; ``!`` rules only undo ignore rules
+        includes = [regex for regex, _, _ in filter(None, (parse_pattern(p) for p in include))]
+        self._include = re.compile(
+            "|".join(f"(?:{regex})(?:/.+)?" for regex in includes)
+        ) if includes else None
+
+        dir_rules = []
+        file_rules = []
+        for regex, negated, dir_only in patterns:
+            dir_rules.append((regex + "(?:/.+)?", negated))
+            # A directory-only pattern matches files only below that directory
+            file_rules.append((regex + ("/.+" if dir_only else "(?:/.+)?"), negated))
+
+        self._dirs = _RuleSet(dir_rules)
+        self._files = _RuleSet(file_rules)
+
+    def _read_ignore_files(self, builtin):
+        """Collect patterns from .gitignore files in non-ignored directories"""
+        patterns = []
+        exclude_file = os.path.join(self.root, ".git", "info", "exclude")
+        patterns.extend(self._read_patterns(exclude_file, ""))
+
+        current = _RuleSet([(r + "(?:/.+)?", neg) for r, neg, _ in builtin if r])
+        stack = [""]
+        while stack:
+            base = stack.pop()
+            folder = os.path.join(self.root, base) if base else self.root
+            found = self._read_patterns(os.path.join(folder, ".gitignore"), base)
+            if found:
+                patterns.extend(found)
+                current = _RuleSet(
+                    [(r + "(?:/.+)?", neg) for r, neg, _ in builtin + patterns if r]
+                )
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        rel = f"{base}/{entry.name}" if base else entry.name
+                        if not current.ignored(rel):
+                            stack.append(rel)
+            except OSError:
+                continue
+        return patterns
+
+    def _read_patterns(self, path, base):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        self.ignore_files.append(path)
+        return [p for p in (parse_pattern(line, base) for line in lines) if p]
+
+    def relative(self, path: str) -> str:
+        """Root-relative path with forward slashes"""
+        rel = path[self._prefix_len:]
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        return rel
+
+    def is_dir_ignored(self, path: str) -> bool:
+        """True if the directory (absolute path) should be pruned"""
+        return self._dirs.ignored(self.relative(path))
+
+    def is_file_watched(self, path: str) -> bool:
+        """True if the file (absolute path) is included and not ignored"""
+        if self._include is None:
+            return False
+        rel = self.relative(path)
+        return self._include.fullmatch(rel) is not None and not self._files.ignored(rel)
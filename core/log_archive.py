@@ -0,0 +1,436 @@
+"""
+Persistent, compressed per-run log archive
+
+Every run is streamed to one ``.arlog`` file under the archive directory:
+
+    header   b"ARLOG1" + u32 length + JSON metadata (project, script, ...)
+    chunks   CHUNK header + zlib-compressed records, one record per line:
+             "<timestamp>\\t<stream>\\t<text>\\n"
+    index    one INDEX record per chunk (written when the run ends)
+    trailer  TRAILER with the index position, line count and end time
+
+A finished file is opened by reading the trailer and binary-searching the
+index in place through mmap, so reopening does not depend on the log size
+and only the chunks being viewed are decompressed. Files without a trailer
+(still running, or the app crashed) are recovered by walking the chunk
+headers, which also needs no decompression.
+"""
+import os
+import re
+import json
+import mmap
+import time
+import zlib
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from core.constants import LOGS_DIR
+
+
+MAGIC = b"ARLOG1"
+TRAILER_MAGIC = b"ARLOGEND"
+SUFFIX = ".arlog"
+
+HEADER = struct.Struct("<6sI")          # magic, metadata length
+CHUNK = struct.Struct("<2sIId")         # b"CK", compressed size, lines, first timestamp
+INDEX = struct.Struct("<QIIQd")         # offset, compressed size, lines, first line, first timestamp
+TRAILER = struct.Struct("<QIQd8s")      # index offset, chunks, lines, end time, magic
+
+SAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+class RunLogWriter:
+    """
+    Append-only writer for one run, safe to use from several threads
+
+    Args:
+        path: File to create
+        meta: JSON-serialisable run metadata
+        chunk_bytes: Uncompressed chunk size that triggers compression
+        flush_seconds: Age of the oldest pending line that also triggers it,
+            so slow output reaches the file
+        level: zlib compression level
+    """
+
+    def __init__(self, path: str, meta: dict, chunk_bytes: int = 256 * 1024,
+                 flush_seconds: float = 2.0, level: int = 6):
+        self.path = path
+        self.meta = dict(meta)
+        self.chunk_bytes = chunk_bytes
+        self.flush_seconds = flush_seconds
+        self.level = level
+        self.lines = 0
+        self.bytes_written = 0
+        self._index = []
+        self._records = []
+        self._size = 0
+        self._first_ts = 0.0
+        self._lock = threading.Lock()
+
+        encoded = json.dumps(self.meta).encode("utf-8")
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, len(encoded)) + encoded)
+        self._file.flush()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write_lines(self, texts, stream: str = "stdout", timestamp: float = None):
+        """Append lines that arrived together"""
+        if not texts:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        prefix = f"{timestamp:.3f}\t{stream}\t"
+        with self._lock:
+            if self._file is None:
+                return
+            if not self._records:
+                self._first_ts = timestamp
+            for text in texts:
+                record = prefix + text.replace("\n", " ") + "\n"
+                self._records.append(record)
+                self._size += len(record)
+            if self._size >= self.chunk_bytes or timestamp - self._first_ts >= self.flush_seconds:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        if not self._records:
+            return
+        data = zlib.compress("".join(self._records).encode("utf-8"), self.level)
+        offset = self._file.tell()
+        self._file.write(CHUNK.pack(b"CK", len(data), len(self._records), self._first_ts))
+        self._file.write(data)
+        self._file.flush()
+        self._index.append((offset, len(data), len(self._records), self.lines, self._first_ts))
+        self.lines += len(self._records)
+        self.bytes_written += self._size
+        self._records = []
+        self._size = 0
+
+    def flush(self):
+        """Compress and write the pending lines as a (short) chunk"""
+        with self._lock:
+            if self._file is not None:
+                self._write_chunk()
+
+    def close(self):
+        """Write the last chunk, the index and the trailer"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._write_chunk()
+            index_offset = self._file.tell()
+            self._file.write(b"".join(INDEX.pack(*entry) for entry in self._index))
+            self._file.write(TRAILER.pack(index_offset, len(self._index), self.lines,
+                                          time.time(), TRAILER_MAGIC))
+            self._file.close()
+            self._file = None
+
+
+class RunLog:
+    """
+    Read access to one archived run
+
+    Lines are addressed 0..``lines``-1 and returned as
+    ``(timestamp, stream, text)`` tuples.
+    """
+
+    CACHED_CHUNKS = 8
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._cache = OrderedDict()
+        self.size = size
+        self.ended = None
+
+        data = self._map
+        if data is None or size < HEADER.size:
+            raise ValueError(f"Not a run log: {path}")
+        magic, meta_len = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a run log: {path}")
+        self.meta = json.loads(bytes(data[HEADER.size:HEADER.size + meta_len]))
+        self._data_start = HEADER.size + meta_len
+
+        self._index_offset = None
+        self._entries = None
+        if size >= self._data_start + TRAILER.size:
+            index_offset, chunks, lines, ended, end_magic = TRAILER.unpack_from(data, size - TRAILER.size)
+            if end_magic == TRAILER_MAGIC and index_offset + chunks * INDEX.size == size - TRAILER.size:
+                self._index_offset = index_offset
+                self.chunks = chunks
+                self.lines = lines
+                self.ended = ended
+        if self._index_offset is None:
+            self._recover()
+
+    def _recover(self):
+        """Build the index by walking chunk headers (unfinished file)"""
+        entries = []
+        offset = self._data_start
+        lines = 0
+        data = self._map
+        while offset + CHUNK.size <= self.size:
+            tag, csize, count, first_ts = CHUNK.unpack_from(data, offset)
+            if tag != b"CK" or offset + CHUNK.size + csize > self.size:
+                break
+            entries.append((offset, csize, count, lines, first_ts))
+            lines += count
+            offset += CHUNK.size + csize
+        self._entries = entries
+        self.chunks = len(entries)
+        self.lines = lines
+
+    def close(self):
+        self._cache.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def entry(self, i: int):
+        """``(offset, size, lines, first_line, first_timestamp)`` of chunk ``i``"""
+        if self._entries is not None:
+            return self._entries[i]
+        return INDEX.unpack_from(self._map, self._index_offset + i * INDEX.size)
+
+    def chunk_of(self, line: int) -> int:
+        """Chunk holding ``line`` (binary search over the index)"""
+        low, high = 0, self.chunks - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.entry(middle)[3] <= line:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def _chunk_lines(self, i: int) -> list:
+        lines = self._cache.get(i)
+        if lines is not None:
+            self._cache.move_to_end(i)
+            return lines
+        offset, csize, _, _, _ = self.entry(i)
+        start = offset + CHUNK.size
+        text = zlib.decompress(self._map[start:start + csize]).decode("utf-8", errors="replace")
+        lines = text.split("\n")[:-1]
+        self._cache[i] = lines
+        if len(self._cache) > self.CACHED_CHUNKS:
+            self._cache.popitem(last=False)
+        return lines
+
+    @staticmethod
+    def _parse(record: str):
+        timestamp, stream, text = record.split("\t", 2)
+        return float(timestamp), stream, text
+
+    def read(self, start: int, count: int) -> list:
+        """Lines ``start`` .. ``start + count - 1`` (clipped to the log)"""
+        start = max(0, start)
+        end = min(self.lines, start + count)
+        result = []
+        if start >= end:
+            return result
+        chunk = self.chunk_of(start)
+        while start < end:
+            first_line = self.entry(chunk)[3]
+            records = self._chunk_lines(chunk)
+            take = records[start - first_line:end - first_line]
+            result.extend(self._parse(record) for record in take)
+            start += len(take)
+            chunk += 1
+        return result
+
+    def export_jsonl(self, path: str) -> int:
+        """Write the run as JSON lines ``{"timestamp", "stream", "text"}``"""
+        written = 0
+        prefixes = {}
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        with open(path, "w", encoding="utf-8") as out:
+            for i in range(self.chunks):
+                offset, csize, _, _, _ = self.entry(i)
+                start = offset + CHUNK.size
+                text = zlib.decompress(self._map[start:start + csize]).decode("utf-8", errors="replace")
+                records = text.split("\n")[:-1]
+                rows = []
+                for record in records:
+                    timestamp, stream, line = record.split("\t", 2)
+                    # Lines of one batch share timestamp and stream
+                    prefix = prefixes.get((timestamp, stream))
+                    if prefix is None:
+                        iso = datetime.fromtimestamp(float(timestamp)).isoformat(timespec="milliseconds")
+                        prefix = f'{{"timestamp": "{iso}", "stream": {encode(stream)}, "text": '
+                        if len(prefixes) > 4096:
+                            prefixes.clear()
+                        prefixes[(timestamp, stream)] = prefix
+                    rows.append(prefix + encode(line) + "}\n")
+                out.write("".join(rows))
+                written += len(records)
+        return written
+
+
+def read_meta(path: str):
+    """Metadata of an archived run without mapping it, None if unreadable"""
+    try:
+        with open(path, "rb") as f:
+            magic, meta_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                return None
+            return json.loads(f.read(meta_len))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+class LogArchive:
+    """
+    Directory of run logs with size/age based rotation
+
+    The directory is listed (and every header read) once, on a background
+    thread when the first run starts; after that the listing is kept up to
+    date as runs are created and rotated, so starting a run does not touch
+    the other logs. ``refresh()`` re-reads it.
+
+    Args:
+        root: Archive directory
+        max_bytes: Total size cap, oldest runs are deleted first
+        max_age_days: Runs older than this are deleted
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = LogArchive(LOGS_DIR)
+        return cls._instance
+
+    def __init__(self, root: str, max_bytes: int = 1024 * 1024 * 1024, max_age_days: float = 14):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._writers = {}
+        self._listing = None  # path -> [size, meta]
+        self._lock = threading.RLock()
+        self._loading = None
+
+    def new_run(self, project: str, script: str, command: str) -> RunLogWriter:
+        """Create the log file for a run that is starting"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            if self._listing is not None:
+                self.rotate()
+            elif self._loading is None:
+                self._loading = threading.Thread(
+                    target=self._load_and_rotate, name="log-archive-rotate", daemon=True
+                )
+                self._loading.start()
+        started = time.time()
+        stamp = datetime.fromtimestamp(started).strftime("%Y%m%d-%H%M%S")
+        name = SAFE_NAME.sub("_", f"{os.path.basename(project)}-{script or 'install'}")
+        path = os.path.join(self.root, f"{stamp}-{name}{SUFFIX}")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.root, f"{stamp}-{name}-{suffix}{SUFFIX}")
+            suffix += 1
+
+        writer = RunLogWriter(path, {
+            "project": project,
+            "script": script,
+            "command": command,
+            "started": started
+        })
+        with self._lock:
+            self._writers[path] = writer
+            if self._listing is not None:
+                self._listing[path] = [writer.bytes_written, writer.meta]
+        return writer
+
+    def _load_and_rotate(self):
+        self.refresh()
+        self.rotate()
+
+    def is_active(self, path: str) -> bool:
+        """True while the run logged to ``path`` is still being written"""
+        writer = self._writers.get(path)
+        if writer is not None and writer.closed:
+            del self._writers[path]
+            writer = None
+        return writer is not None
+
+    def refresh(self):
+        """Re-read the archive directory and every run's metadata"""
+        listing = {}
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if not entry.name.endswith(SUFFIX):
+                continue
+            meta = read_meta(entry.path)
+            if meta is None:
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            listing[entry.path] = [size, meta]
+        with self._lock:
+            # Runs started while the directory was being read
+            for path, writer in self._writers.items():
+                listing.setdefault(path, [writer.bytes_written, writer.meta])
+            self._listing = listing
+
+    def runs(self) -> list:
+        """``(path, size, meta)`` of archived runs, newest first"""
+        if self._listing is None:
+            self.refresh()
+        with self._lock:
+            # Only logs written since the listing was taken can have grown
+            for path in list(self._writers):
+                self.is_active(path)
+                entry = self._listing.get(path)
+                if entry is None:
+                    continue
+                try:
+                    entry[0] = os.path.getsize(path)
+                except OSError:
+                    del self._listing[path]
+            result = [(path, size, meta) for path, (size, meta) in self._listing.items()]
+        result.sort(key=lambda run: run[2].get("started", 0), reverse=True)
+        return result
+
+    def rotate(self) -> int:
+        """Delete runs over the age and size limits, returns how many"""
+        cutoff = time.time() - self.max_age_days * 86400
+        total = 0
+        removed = 0
+        with self._lock:
+            for path, size, meta in self.runs():
+                if self.is_active(path):
+                    total += size
+                    continue
+                if meta.get("started", 0) < cutoff or total + size > self.max_bytes:
+                    try:
+                        os.remove(path)
+                        self._listing.pop(path, None)
+                        removed += 1
+                    except FileNotFoundError:
+                        self._listing.pop(path, None)
+                    except OSError:
+                        total += size  # still open elsewhere (Windows)
+                    continue
+                total += size
+        return removed
@@ -0,0 +1,344 @@
+"""
+Process-tree termination and port checks
+
+Children are started in their own session (POSIX) or process group
+(Windows), so a script and everything it spawned - npm, node, esbuild
+services - can be signalled as a unit. Stopping sends SIGTERM to the whole
+group (CTRL_BREAK on Windows), escalates to SIGKILL (``taskkill /F /T``)
+once the grace period is over and reaps the child.
+
+Windows has no process groups to probe, and a child that exits on
+CTRL_BREAK can leave its own children running with nothing linking them
+to the app any more. The tree's PIDs are therefore tracked from a process
+snapshot taken when the stop begins, extended on every poll with the
+children of tracked PIDs, and whatever is left after the grace period is
+killed with ``taskkill /F /T``.
+
+Listening ports are read from /proc on Linux so the time until a stopped
+dev server's port is free again can be measured; elsewhere a connect()
+probe is used.
+"""
+import os
+import time
+import signal
+import socket
+import subprocess
+
+
+# Popen keyword arguments that put the child in a group of its own
+if os.name == "nt":
+    GROUP_POPEN_ARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    GROUP_POPEN_ARGS = {"start_new_session": True}
+
+
+# ============================================================
+# SIGNALS
+# ============================================================
+def signal_tree(process, force: bool = False, pids=None) -> str:
+    """
+    Ask (or force) a child's whole process tree to exit
+
+    Args:
+        process: subprocess.Popen started with GROUP_POPEN_ARGS
+        force: SIGKILL / ``taskkill /F`` instead of SIGTERM / CTRL_BREAK
+        pids: Windows: live PIDs of the tree to kill, the child's if None
+
+    Returns:
+        str: Name of what was sent, "" if the tree was already gone
+    """
+    if os.name == "nt":
+        if not force:
+            try:
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+                return "CTRL_BREAK"
+            except (OSError, ValueError):
+                # No console to deliver it through: go straight to taskkill
+                pass
+        pids = [process.pid] if pids is None else sorted(pids)
+        if not pids:
+            return ""
+        args = ["taskkill", "/F", "/T"]
+        for pid in pids:
+            args += ["/PID", str(pid)]
+        subprocess.call(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return "taskkill"
+
+    sig = signal.SIGKILL if force else signal.SIGTERM
+    try:
+        # start_new_session made the child a group leader: pgid == pid
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        return ""
+    except PermissionError:
+        return ""
+    return sig.name
+
+
+def tree_alive(process, stop: dict = None) -> bool:
+    """
+    Check whether any process of the child's tree is left
+
+    Reaps the child itself as a side effect, since a zombie leader would
+    keep its group alive.
+
+    Args:
+        process: The child
+        stop: Windows: begin_stop() state whose tracked tree is checked
+            (and extended); without it only the child is
+    """
+    poll = getattr(process, "poll", None)  # asyncio's Process tracks returncode itself
+    if poll is not None:
+        poll()
+    if os.name == "nt":
+        if stop is None or stop.get("tree") is None:
+            return process.returncode is None
+        return bool(_track_tree(stop))
+    try:
+        os.killpg(process.pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    if os.path.isdir("/proc/self"):
+        # Orphaned zombies count for killpg until init reaps them, which
+        # can take seconds in containers
+        return bool(group_pids(process.pid, running=True))
+    return True
+
+
+def begin_stop(process) -> dict:
+    """
+    Start stopping a child's process tree: note its ports, send SIGTERM
+
+    Returns:
+        dict: Stop state for wait_stopped() and stop_report()
+    """
+    started = time.monotonic()
+    ports = group_ports(process)
+    stop = {"started": started, "ports": ports, "signal": "", "stopped": None, "tree": None}
+    if os.name == "nt":
+        stop["tree"] = {process.pid}
+        _track_tree(stop)
+    stop["signal"] = signal_tree(process)
+    return stop
+
+
+def wait_stopped(process, stop: dict, grace: float = 5.0, poll_interval: float = 0.02):
+    """
+    Block until the tree is gone, escalating to SIGKILL after ``grace`` seconds
+
+    Args:
+        process: The child passed to begin_stop()
+        stop: State returned by begin_stop(), updated in place
+    """
+    deadline = stop["started"] + grace
+    while tree_alive(process, stop):
+        if time.monotonic() >= deadline:
+            pids = _track_tree(stop) if stop.get("tree") is not None else None
+            stop["signal"] = signal_tree(process, force=True, pids=pids) or stop["signal"]
+            deadline = float("inf")
+        time.sleep(poll_interval)
+    stop["stopped"] = time.monotonic()
+
+
+def stop_report(stop: dict, ports_free_at) -> dict:
+    """
+    Summary of a finished stop for the UI
+
+    Args:
+        stop: State from begin_stop() after wait_stopped()
+        ports_free_at: Result of wait_ports_free()
+
+    Returns:
+        dict: ``signal`` last signal sent, ``stop`` seconds until the tree
+        was gone, ``ports`` ports it was listening on, ``port_free``
+        seconds until they were free (None if there were none or they
+        stayed busy)
+    """
+    started = stop["started"]
+    return {
+        "signal": stop["signal"],
+        "stop": stop["stopped"] - started,
+        "ports": sorted(stop["ports"]),
+        "port_free": None if ports_free_at is None else ports_free_at - started,
+    }
+
+
+def terminate_tree(process, grace: float = 5.0) -> dict:
+    """Stop a child's process tree, blocking until it is gone; returns stop_report()"""
+    stop = begin_stop(process)
+    wait_stopped(process, stop, grace)
+    return stop_report(stop, wait_ports_free(stop["ports"]))
+
+
+# ============================================================
+# WINDOWS PROCESS TREE
+# ============================================================
+def _windows_processes() -> dict:
+    """``{pid: parent_pid}`` of every running process (Toolhelp snapshot)"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_size_t),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", ctypes.c_char * 260),
+        ]
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    snapshot = kernel32.CreateToolhelp32Snapshot(0x2, 0)  # TH32CS_SNAPPROCESS
+    if not snapshot or snapshot == wintypes.HANDLE(-1).value:
+        return {}
+    processes = {}
+    try:
+        entry = PROCESSENTRY32()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32)
+        found = kernel32.Process32First(wintypes.HANDLE(snapshot), ctypes.byref(entry))
+        while found:
+            processes[entry.th32ProcessID] = entry.th32ParentProcessID
+            found = kernel32.Process32Next(wintypes.HANDLE(snapshot), ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(wintypes.HANDLE(snapshot))
+    return processes
+
+
+def _track_tree(stop: dict) -> set:
+    """
+    Add the children of tracked PIDs to ``stop["tree"]``
+
+    Exited PIDs stay tracked so their orphaned children are still found.
+
+    Returns:
+        set: Tracked PIDs that are still running
+    """
+    tree = stop["tree"]
+    processes = _windows_processes()
+    added = True
+    while added:
+        added = False
+        for pid, parent in processes.items():
+            if parent in tree and pid not in tree:
+                tree.add(pid)
+                added = True
+    return {pid for pid in tree if pid in processes}
+
+
+# ============================================================
+# PORTS
+# ============================================================
+def group_pids(pgid: int, running: bool = False) -> list:
+    """
+    PIDs in a process group (Linux; empty elsewhere)
+
+    Args:
+        pgid: Process group ID
+        running: Leave out zombies
+    """
+    pids = []
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return pids
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesized command: state ppid pgrp ...
+        fields = stat[stat.rfind(b")") + 2:].split()
+        if len(fields) > 2 and int(fields[2]) == pgid:
+            if not (running and fields[0] == b"Z"):
+                pids.append(int(entry))
+    return pids
+
+
+def _socket_inodes(pids) -> set:
+    inodes = set()
+    for pid in pids:
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if target.startswith("socket:["):
+                inodes.add(target[8:-1])
+    return inodes
+
+
+def listening_ports(inodes=None) -> set:
+    """
+    TCP ports in LISTEN state (Linux)
+
+    Args:
+        inodes: Only sockets with these inode numbers, all if None
+    """
+    ports = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, "r") as f:
+                rows = f.readlines()[1:]
+        except OSError:
+            continue
+        for row in rows:
+            fields = row.split()
+            if len(fields) < 10 or fields[3] != "0A":
+                continue
+            if inodes is not None and fields[9] not in inodes:
+                continue
+            ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+    return ports
+
+
+def group_ports(process) -> set:
+    """Ports the child's process tree is listening on (Linux only)"""
+    if os.name == "nt" or not os.path.isdir("/proc/net"):
+        return set()
+    inodes = _socket_inodes(group_pids(process.pid))
+    return listening_ports(inodes) if inodes else set()
+
+
+def port_in_use(port: int) -> bool:
+    """Check whether something still listens on a local TCP port"""
+    if os.path.exists("/proc/net/tcp"):
+        return port in listening_ports()
+    for host in ("127.0.0.1", "::1"):
+        try:
+            with socket.create_connection((host, port), timeout=0.05):
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def wait_ports_free(ports, timeout: float = 5.0, poll_interval: float = 0.005):
+    """
+    Wait until none of ``ports`` is listening
+
+    Returns:
+        float: time.monotonic() when they were free, None if ``ports`` is
+        empty or they stayed busy for ``timeout`` seconds
+    """
+    if not ports:
+        return None
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not any(port_in_use(port) for port in ports):
+            return time.monotonic()
+        time.sleep(poll_interval)
+    return None
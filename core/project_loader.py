@@ -0,0 +1,65 @@
+"""
+Background project loading pipeline
+
+Opening a project touches the filesystem several times: package.json,
+lock files up the directory tree, workspace manifests, node_modules.
+On a network drive each of those can take a noticeable time, so they
+run on a ProjectLoader thread as a list of named stages. Every stage's
+result is signalled as soon as it is ready and the tab fills in
+progressively. Each stage is timed for the load report.
+
+A stage is ``(name, fn)``. ``fn(results)`` gets the results of the
+earlier stages by name. It must not touch widgets; the GUI thread
+applies its result from ``stage_done``. A stage that raises ends the
+load with ``stage_failed``.
+"""
+import time
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class ProjectLoader(QThread):
+    """
+    Run project loading stages off the GUI thread
+
+    Signals:
+        stage_done(name, result, seconds)
+        stage_failed(name, message)
+        loaded(timings): ``[(name, seconds), ...]`` once every stage ran
+
+    Args:
+        project_path: Project being loaded (for the receivers)
+        stages: ``[(name, fn), ...]`` run in order
+    """
+    stage_done = pyqtSignal(str, object, float)
+    stage_failed = pyqtSignal(str, str)
+    loaded = pyqtSignal(object)
+
+    def __init__(self, project_path: str, stages, parent=None):
+        super().__init__(parent)
+        self.project_path = project_path
+        self.stages = list(stages)
+        self.started_at = time.perf_counter()
+        self.cancelled = False
+
+    def cancel(self):
+        """Skip the remaining stages (a newer load replaced this one)"""
+        self.cancelled = True
+
+    def run(self):
+        results = {}
+        timings = []
+        for name, fn in self.stages:
+            if self.cancelled:
+                return
+            started = time.perf_counter()
+            try:
+                results[name] = fn(results)
+            except Exception as e:
+                self.stage_failed.emit(name, str(e))
+                return
+            elapsed = time.perf_counter() - started
+            timings.append((name, elapsed))
+            self.stage_done.emit(name, results[name], elapsed)
+        if not self.cancelled:
+            self.loaded.emit(timings)
@@ -1,55 +1,191 @@
+import os
+import threading
 import subprocess
-from PyQt6.QtCore import QThread, pyqtSignal
 
-from core.utils import strip_ansi_codes
+from core.ansi import AnsiRenderer
+from core.process_tree import GROUP_POPEN_ARGS
+from core.stream import TerminalLines, open_pty
 
 
 # ============================================================
-# RUNNER THREAD
+# PROCESS START
 # ============================================================
-class RunnerThread(QThread):
-    log_signal = pyqtSignal(str)
-    finished_signal = pyqtSignal()
-
-    def __init__(self, cmd: str, cwd: str):
-        super().__init__()
-        self.cmd = cmd
-        self.cwd = cwd
-        self.process = None
-        self.running = True
-
-    def stop(self):
-        self.running = False
-        if self.process and self.process.poll() is None:
-            try:
-                subprocess.call(
-                    f"taskkill /F /T /PID {self.process.pid}",
-                    shell=True
-                )
-            except:
-                pass
-
-    def run(self):
-        try:
-            self.process = subprocess.Popen(
-                self.cmd,
-                cwd=self.cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                shell=True,
-                encoding="utf-8",
-                errors="replace",
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
-            )
-
-            for line in self.process.stdout:
-                if not self.running:
-                    break
-                self.log_signal.emit(strip_ansi_codes(line))
-
-            if self.process and self.process.poll() is None:
-                self.process.terminate()
-
-        finally:
-            self.finished_signal.emit()
+def spawn_process(cmd, cwd: str, pty_size=None, env=None):
+    """
+    Start a command with its output on a pipe or a pseudo-terminal
+
+    ``cmd`` is a command line for the shell, or an argv list to execute
+    without one; ``env`` replaces the environment if given.
+
+    With ``pty_size=(columns, rows)`` (POSIX only) stdout/stderr is a
+    pseudo-terminal of that size, so Node tools keep colors and progress
+    output and do not block-buffer. stdin is /dev/null either way, so
+    prompts fail instead of waiting forever. The child gets a session
+    (process group on Windows) of its own, see core.process_tree.
+
+    Returns:
+        tuple: (Popen, fd to read the output from); for a pty the fd is the
+        master side, which the caller must close
+    """
+    if pty_size is None:
+        process = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            shell=isinstance(cmd, str),
+            env=env,
+            bufsize=0,
+            **GROUP_POPEN_ARGS
+        )
+        return process, process.stdout.fileno()
+
+    columns, rows = pty_size
+    master, slave = open_pty(columns, rows)
+    env = dict(os.environ if env is None else env)
+    env.setdefault("TERM", "xterm-256color")
+    env["COLUMNS"] = str(columns)
+    env["LINES"] = str(rows)
+    try:
+        process = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=slave,
+            stderr=slave,
+            shell=isinstance(cmd, str),
+            env=env,
+            **GROUP_POPEN_ARGS
+        )
+    except Exception:
+        os.close(master)
+        raise
+    finally:
+        os.close(slave)
+    return process, master
+
+
+# ============================================================
+# OUTPUT PIPELINE
+# ============================================================
+class OutputPipeline:
+    """
+    Turn a child's raw output into console batches
+
+    Bytes go through core.stream.TerminalLines (carriage returns and
+    erase/cursor sequences rewrite lines in place) and committed lines are
+    rendered to ``(text, html)`` pairs and archived to ``log_writer``.
+    ``take()`` hands out the batch and, if it changed, the rendered live
+    lines.
+
+    Backpressure: the receiver calls ``batch_done()`` for every batch
+    taken. While ``max_pending_batches`` are unacknowledged the owner
+    should keep feeding but not take, and a backlog over
+    ``max_backlog_lines`` is collapsed (see ``_collapse()``).
+    """
+
+    def __init__(self, log_writer=None, max_pending_batches: int = 3,
+                 max_backlog_lines: int = 20000):
+        self.log_writer = log_writer
+        self.max_pending_batches = max_pending_batches
+        self.max_backlog_lines = max_backlog_lines
+        self.terminal = TerminalLines()
+        self.renderer = AnsiRenderer()
+        self.batch = []
+        self.collapsed_lines = 0
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def blocked(self) -> bool:
+        """True while the receiver is behind"""
+        return self._in_flight >= self.max_pending_batches
+
+    @property
+    def pending(self) -> bool:
+        """True if there is a batch or a live update to take"""
+        return bool(self.batch) or self.terminal.changed
+
+    def feed(self, data: bytes):
+        self._commit(self.terminal.feed(data))
+
+    def finish(self):
+        """Commit everything still live (end of output)"""
+        self._commit(self.terminal.flush())
+        if len(self.batch) > self.max_backlog_lines and self.blocked:
+            self.batch = self._collapse(self.batch)
+
+    def _commit(self, lines):
+        if not lines:
+            return
+        rendered = self.renderer.render_lines(lines)
+        if self.log_writer is not None:
+            self.log_writer.write_lines([text for text, _ in rendered])
+        self.batch.extend(rendered)
+        if len(self.batch) > self.max_backlog_lines and self.blocked:
+            self.batch = self._collapse(self.batch)
+
+    def take(self):
+        """
+        Hand out the pending output
+
+        Returns:
+            tuple: (batch or None, live lines or None if unchanged)
+        """
+        batch = None
+        if self.batch:
+            batch, self.batch = self.batch, []
+            with self._in_flight_lock:
+                self._in_flight += 1
+        live = None
+        if self.terminal.changed:
+            self.terminal.changed = False
+            live = self.renderer.preview_lines(self.terminal.live)
+        return batch, live
+
+    def batch_done(self):
+        """Acknowledge a batch (call from the GUI thread)"""
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    def _collapse(self, batch: list) -> list:
+        """
+        Shrink a backlog the GUI could not take yet
+
+        Runs of identical lines are folded first; if the backlog is still
+        over ``max_backlog_lines``, its oldest lines are dropped. Each fold
+        leaves an "N lines collapsed" marker line.
+        """
+        result = []
+        previous = None
+        repeats = 0
+        for pair in batch:
+            if pair[0] == previous:
+                repeats += 1
+                continue
+            if repeats:
+                result.append(self._marker(repeats, "repeated "))
+                self.collapsed_lines += repeats
+                repeats = 0
+            result.append(pair)
+            previous = pair[0]
+        if repeats:
+            result.append(self._marker(repeats, "repeated "))
+            self.collapsed_lines += repeats
+
+        keep = self.max_backlog_lines // 2
+        if len(result) > self.max_backlog_lines:
+            dropped = len(result) - keep
+            self.collapsed_lines += dropped
+            result = [self._marker(dropped)] + result[-keep:]
+        return result
+
+    def _marker(self, count: int, kind: str = "") -> tuple:
+        where = " (kept in the run log)" if self.log_writer is not None else ""
+        text = f"⋯ {count:,} {kind}lines collapsed{where}"
+        return text, f"<span style='color:#7f7f7f;'>{text}</span>"
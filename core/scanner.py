@@ -0,0 +1,278 @@
+"""
+Incremental directory scanner with a compact file index
+
+Used by the polling watcher backend. Instead of re-walking the tree and
+keeping a ``{full_path: mtime}`` dict, the scanner keeps:
+
+- one interned path per *directory* plus its last seen mtime
+- per directory, a tuple of interned file names and an array of slots
+- global ``array`` columns holding mtime/size for every slot
+
+A directory's mtime only moves when entries are added, removed or renamed,
+so only directories whose mtime changed are re-listed with ``os.scandir``.
+Known files in unchanged directories are still stat'ed to catch in-place
+edits, but no listing or path bookkeeping is repeated for them.
+"""
+import os
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+
+from core.utils import current_rss_bytes
+
+
+# On Windows DirEntry.stat() is served from the directory listing itself,
+# so re-listing is cheaper than one stat() call per known file.
+ALWAYS_RELIST = os.name == "nt"
+
+# Directory mtimes this close to "now" may still change within the same
+# timestamp tick (coarse filesystems, network mounts), so they are not
+# trusted and the directory is re-listed on the next pass.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass
+class ScanStats:
+    """Metrics for a single scan pass"""
+    duration_ms: float = 0.0
+    dirs_total: int = 0
+    dirs_listed: int = 0
+    files_total: int = 0
+    files_stat: int = 0
+    changes: int = 0
+    index_bytes: int = 0
+    rss_bytes: int = 0
+
+
+class IncrementalScanner:
+    """
+    Track file mtimes/sizes under ``root`` and report changes per pass
+
+    Args:
+        root: Directory to scan
+        dir_filter: ``dir_filter(path) -> bool``, False prunes the directory
+        file_filter: ``file_filter(path) -> bool``, False skips the file
+    """
+
+    def __init__(self, root: str, dir_filter=None, file_filter=None):
+        self.root = os.path.normpath(root)
+        self.dir_filter = dir_filter or (lambda path: True)
+        self.file_filter = file_filter or (lambda path: True)
+
+        # Directory table, indexed by directory id
+        self._dir_ids = {}
+        self._dir_paths = []
+        self._dir_mtimes = array("q")
+        self._dir_children = []
+        self._dir_names = []
+        self._dir_slots = []
+        self._free_dirs = []
+
+        # File columns, indexed by slot
+        self._mtimes = array("q")
+        self._sizes = array("q")
+        self._free_slots = []
+
+        self._primed = False
+        self.stats = ScanStats()
+
+    # ------------------------------------------------------------
+    # Index bookkeeping
+    # ------------------------------------------------------------
+    def _add_dir(self, path):
+        path = sys.intern(path)
+        if self._free_dirs:
+            did = self._free_dirs.pop()
+            self._dir_paths[did] = path
+            self._dir_mtimes[did] = -1
+            self._dir_children[did] = []
+            self._dir_names[did] = ()
+            self._dir_slots[did] = array("l")
+        else:
+            did = len(self._dir_paths)
+            self._dir_paths.append(path)
+            self._dir_mtimes.append(-1)
+            self._dir_children.append([])
+            self._dir_names.append(())
+            self._dir_slots.append(array("l"))
+        self._dir_ids[path] = did
+        return did
+
+    def _drop_dir(self, did, changes):
+        """Forget a directory subtree, reporting its files as deleted"""
+        stack = [did]
+        while stack:
+            current = stack.pop()
+            path = self._dir_paths[current]
+            for name, slot in zip(self._dir_names[current], self._dir_slots[current]):
+                self._free_slots.append(slot)
+                changes.append((os.path.join(path, name), "deleted"))
+            stack.extend(self._dir_children[current])
+            del self._dir_ids[path]
+            self._dir_paths[current] = None
+            self._dir_children[current] = []
+            self._dir_names[current] = ()
+            self._dir_slots[current] = array("l")
+            self._free_dirs.append(current)
+
+    def _alloc_slot(self, mtime_ns, size):
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._mtimes[slot] = mtime_ns
+            self._sizes[slot] = size
+        else:
+            slot = len(self._mtimes)
+            self._mtimes.append(mtime_ns)
+            self._sizes.append(size)
+        return slot
+
+    # ------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------
+    def _relist(self, did, path, changes, report):
+        """Re-read a directory listing and diff it against the index"""
+        old_files = dict(zip(self._dir_names[did], self._dir_slots[did]))
+        old_children = {
+            os.path.basename(self._dir_paths[c]): c for c in self._dir_children[did]
+        }
+        names = []
+        slots = array("l")
+        children = []
+        stat_count = 0
+
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                if is_dir:
+                    # Known directories skip the filter, they passed it already
+                    child = old_children.pop(name, None)
+                    if child is None:
+                        if not self.dir_filter(entry.path):
+                            continue
+                        child = self._add_dir(entry.path)
+                    children.append(child)
+                    continue
+
+                slot = old_files.get(name)
+                if slot is None and not self.file_filter(entry.path):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue  # vanished, reported as deleted below
+                old_files.pop(name, None)
+                stat_count += 1
+
+                if slot is None:
+                    slot = self._alloc_slot(st.st_mtime_ns, st.st_size)
+                    if report:
+                        changes.append((entry.path, "created"))
+                else:
+                    if st.st_mtime_ns != self._mtimes[slot] or st.st_size != self._sizes[slot]:
+                        self._mtimes[slot] = st.st_mtime_ns
+                        self._sizes[slot] = st.st_size
+                        changes.append((entry.path, "modified"))
+                names.append(sys.intern(name))
+                slots.append(slot)
+
+        for name, slot in old_files.items():
+            self._free_slots.append(slot)
+            changes.append((os.path.join(path, name), "deleted"))
+        for child in old_children.values():
+            self._drop_dir(child, changes)
+
+        self._dir_names[did] = tuple(names)
+        self._dir_slots[did] = slots
+        self._dir_children[did] = children
+        return stat_count
+
+    def _restat(self, did, path, changes):
+        """Stat the known files of an unchanged directory"""
+        mtimes = self._mtimes
+        sizes = self._sizes
+        prefix = path + os.sep
+        for name, slot in zip(self._dir_names[did], self._dir_slots[did]):
+            try:
+                st = os.stat(prefix + name)
+            except OSError:
+                # Vanished without the directory mtime moving yet
+                self._dir_mtimes[did] = -1
+                continue
+            if st.st_mtime_ns != mtimes[slot] or st.st_size != sizes[slot]:
+                mtimes[slot] = st.st_mtime_ns
+                sizes[slot] = st.st_size
+                changes.append((prefix + name, "modified"))
+        return len(self._dir_names[did])
+
+    def scan(self):
+        """
+        Run one pass over the tree
+
+        Returns:
+            list: ``(path, kind)`` tuples, kind is created/modified/deleted.
+            The first pass only builds the index and returns no changes.
+        """
+        started = time.perf_counter()
+        changes = []
+        report = self._primed
+        dirs_listed = 0
+        files_stat = 0
+
+        root_id = self._dir_ids.get(self.root)
+        if root_id is None:
+            root_id = self._add_dir(self.root)
+
+        now_ns = time.time_ns()
+        stack = [root_id]
+        while stack:
+            did = stack.pop()
+            path = self._dir_paths[did]
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                if did == root_id:
+                    break
+                # Removal is picked up when the parent is re-listed
+                continue
+
+            if ALWAYS_RELIST or mtime_ns != self._dir_mtimes[did]:
+                try:
+                    files_stat += self._relist(did, path, changes, report)
+                except OSError:
+                    continue
+                dirs_listed += 1
+                racy = now_ns - mtime_ns < RACY_WINDOW_NS
+                self._dir_mtimes[did] = -1 if racy else mtime_ns
+            else:
+                files_stat += self._restat(did, path, changes)
+
+            stack.extend(self._dir_children[did])
+
+        self._primed = True
+        self.stats = ScanStats(
+            duration_ms=(time.perf_counter() - started) * 1000,
+            dirs_total=len(self._dir_ids),
+            dirs_listed=dirs_listed,
+            files_total=len(self._mtimes) - len(self._free_slots),
+            files_stat=files_stat,
+            changes=len(changes),
+            index_bytes=self.index_bytes(),
+            rss_bytes=current_rss_bytes(),
+        )
+        return changes
+
+    def index_bytes(self):
+        """Approximate memory held by the index columns (excluding names)"""
+        size = self._mtimes.buffer_info()[1] * self._mtimes.itemsize * 2
+        size += self._dir_mtimes.buffer_info()[1] * self._dir_mtimes.itemsize
+        size += sum(s.buffer_info()[1] * s.itemsize for s in self._dir_slots)
+        size += sum(8 * len(names) for names in self._dir_names)
+        return size
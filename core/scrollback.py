@@ -0,0 +1,103 @@
+"""
+Bounded scrollback store for console output
+
+Lines live in a fixed-size ring of slots addressed by absolute line
+numbers: appending never moves existing lines, and once the line or size
+cap is reached the oldest lines are dropped. Plain lines (no markup) keep
+only their text, their HTML slot stays empty.
+"""
+
+
+class ScrollbackBuffer:
+    """
+    Ring buffer of ``(text, html)`` console lines
+
+    Args:
+        max_lines: Maximum number of lines kept
+        max_bytes: Approximate size cap, counted in characters of text + HTML
+
+    Line numbers are absolute: the oldest kept line is ``start`` and the
+    next appended line gets ``end``, so they stay valid while older lines
+    are evicted.
+    """
+
+    def __init__(self, max_lines: int = 100000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_lines = max(1, max_lines)
+        self.max_bytes = max(1, max_bytes)
+        self._text = [None] * self.max_lines
+        self._html = [None] * self.max_lines
+        self.start = 0
+        self.end = 0
+        self.bytes = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def clear(self):
+        capacity = self.max_lines
+        self._text = [None] * capacity
+        self._html = [None] * capacity
+        self.start = self.end
+        self.bytes = 0
+
+    def set_limits(self, max_lines: int, max_bytes: int):
+        """Change the caps, keeping the newest lines that still fit"""
+        lines = [self.line(i) for i in range(max(self.start, self.end - max_lines), self.end)]
+        self.max_lines = max(1, max_lines)
+        self.max_bytes = max(1, max_bytes)
+        first = self.end - len(lines)
+        self.evicted += first - self.start
+        self.clear()
+        self.start = self.end = first
+        self.extend(lines)
+
+    def _evict(self):
+        slot = self.start % self.max_lines
+        html = self._html[slot]
+        self.bytes -= len(self._text[slot]) + (len(html) if html else 0)
+        self._text[slot] = self._html[slot] = None
+        self.start += 1
+        self.evicted += 1
+
+    def extend(self, lines) -> int:
+        """
+        Append ``(text, html)`` pairs
+
+        Returns:
+            int: Number of old lines evicted to make room
+        """
+        evicted = self.evicted
+        capacity = self.max_lines
+        texts = self._text
+        htmls = self._html
+        for text, html in lines:
+            if self.end - self.start == capacity:
+                self._evict()
+            if html == text:
+                html = None
+            slot = self.end % capacity
+            texts[slot] = text
+            htmls[slot] = html
+            self.bytes += len(text) + (len(html) if html else 0)
+            self.end += 1
+
+        while self.bytes > self.max_bytes and self.end - self.start > 1:
+            self._evict()
+        return self.evicted - evicted
+
+    def append(self, text: str, html: str = None) -> int:
+        return self.extend(((text, text if html is None else html),))
+
+    def line(self, index: int):
+        """``(text, html)`` of absolute line ``index``"""
+        if not self.start <= index < self.end:
+            raise IndexError(index)
+        slot = index % self.max_lines
+        text = self._text[slot]
+        return text, self._html[slot] or text
+
+    def text(self, index: int) -> str:
+        if not self.start <= index < self.end:
+            raise IndexError(index)
+        return self._text[index % self.max_lines]
@@ -0,0 +1,421 @@
+"""
+Incremental search index over console scrollback
+
+Lines are grouped into chunks of ``chunk_lines``. A full chunk is sealed
+once: its lowercased text is joined into one string with a line offset
+table, and the trigrams of its distinct words are recorded. A query only
+scans chunks that contain every trigram its literal text requires, and
+then with C-speed ``str.count``/``str.find`` or one regex pass over the
+chunk string. Per-chunk hit counts are cached per query, so new output
+only costs a scan of the open chunk.
+
+Lowercasing keeps every line's length (see ``fold``) so chunk offsets are
+also highlight columns, and regex matches never span two lines.
+
+Line numbers are absolute, matching ScrollbackBuffer.
+"""
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+
+WORD_PATTERN = re.compile(r"\w+")
+GRAM_PATTERN = re.compile(r"(?=(\w{3}))")
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase ``text`` without changing its length
+
+    ``str.lower()`` turns a few characters (e.g. "İ") into two; those are
+    kept as they are so offsets in the result are offsets in ``text``.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(low if len(low) == 1 else char for char, low in zip(text, map(str.lower, text)))
+
+
+def word_grams(text: str) -> set:
+    """Trigrams inside the words of ``text`` (already folded)"""
+    words = set(WORD_PATTERN.findall(text))
+    return set(GRAM_PATTERN.findall(" ".join(words)))
+
+
+# Escapes naming a character by code, which may be an uppercase one
+CODE_ESCAPE = re.compile(r"\\[xuUN0-7]")
+UNESCAPED_UPPER = re.compile(r"\\.|\(\?P|[^\W\d_a-z]")
+REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+def required_grams(parsed) -> list:
+    """
+    Trigrams every match of a parsed regex must contain
+
+    Returns:
+        list: Alternative frozensets; a chunk can only match if it has all
+        trigrams of at least one of them
+    """
+    required = set()
+    current = []
+    alternatives = None
+
+    def flush():
+        if current:
+            required.update(word_grams(fold("".join(current))))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            options = required_grams(av[-1])
+        elif op in REPEATS and av[0] >= 1:
+            options = required_grams(av[2])
+        elif op is sre_parse.BRANCH:
+            options = [grams for branch in av[1] for grams in required_grams(branch)]
+        else:
+            continue
+        if len(options) == 1:
+            required.update(options[0])
+        elif alternatives is None and len(options) <= 32:
+            alternatives = options
+    flush()
+
+    if alternatives is None:
+        return [frozenset(required)]
+    return [frozenset(required | option) for option in alternatives]
+
+
+class SearchQuery:
+    """
+    A compiled console search, case-insensitive
+
+    Args:
+        text: Search text, or a pattern if ``regex`` is True
+        regex: Treat ``text`` as a regular expression
+
+    Raises:
+        re.error: If ``regex`` is True and the pattern is invalid
+    """
+
+    def __init__(self, text: str, regex: bool = False):
+        self.text = text
+        self.regex = regex
+        source = text if regex else re.escape(text)
+        self.pattern = re.compile(source, re.IGNORECASE | re.MULTILINE)
+        self.needle = None if regex else fold(text)
+
+        # Chunks are lowercased: scan them with the pattern's own letters
+        # lowercased (escapes such as \D kept), IGNORECASE is several times slower.
+        # MULTILINE so ^ and $ match at the line ends inside a chunk.
+        self.scan = self.pattern
+        if regex and not CODE_ESCAPE.search(text):
+            lowered = UNESCAPED_UPPER.sub(
+                lambda m: m.group().lower() if len(m.group()) == 1 else m.group(), text
+            )
+            try:
+                self.scan = re.compile(lowered, re.MULTILINE)
+            except re.error:
+                pass
+
+        if regex:
+            try:
+                self.grams = required_grams(sre_parse.parse(text))
+            except Exception:
+                self.grams = [frozenset()]
+        else:
+            self.grams = [frozenset(word_grams(self.needle))]
+
+    @property
+    def key(self):
+        return (self.text, self.regex)
+
+    def matches(self, text: str, start: int = 0, end: int = None):
+        """
+        Non-empty regex matches in chunk text, each within a single line
+
+        A match that runs across a line break (``\s``, ``[^x]``...) is
+        replaced by the matches of the line it starts on, as if that line
+        was searched on its own.
+        """
+        end = len(text) if end is None else end
+        position = start
+        while position <= end:
+            m = self.scan.search(text, position, end)
+            if m is None:
+                return
+            if m.end() == m.start():
+                position = m.end() + 1
+                continue
+            line_end = text.find("\n", m.start(), m.end())
+            if line_end == -1:
+                yield m
+                position = m.end()
+                continue
+            for part in self.scan.finditer(text, m.start(), line_end):
+                if part.end() > part.start():
+                    yield part
+            position = line_end + 1
+
+    def spans(self, line: str) -> list:
+        """``(start, end)`` columns of the matches in one line"""
+        return [m.span() for m in self.pattern.finditer(line) if m.end() > m.start()]
+
+
+class _Chunk:
+    __slots__ = ("first", "text", "starts", "grams")
+
+    def __init__(self, first, lines):
+        self.first = first
+        self.text = "\n".join(lines)
+        self.starts = array("L", accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+        self.grams = None
+
+    def build_grams(self):
+        self.grams = frozenset(map(sys.intern, word_grams(self.text)))
+
+    @property
+    def end(self):
+        return self.first + len(self.starts)
+
+    def offset(self, line):
+        return self.starts[line - self.first]
+
+    def line_at(self, offset):
+        return self.first + bisect_right(self.starts, offset) - 1
+
+    def could_match(self, query):
+        if self.grams is None:
+            return True
+        return any(grams <= self.grams for grams in query.grams)
+
+    def count(self, query, start=0):
+        if query.needle is not None:
+            return self.text.count(query.needle, start) if query.needle else 0
+        return sum(1 for _ in query.matches(self.text, start))
+
+    def find(self, query, start, backwards=False):
+        """Offset of the first match at/after ``start`` (last before, backwards)"""
+        if query.needle is not None:
+            if backwards:
+                return self.text.rfind(query.needle, 0, start + len(query.needle) - 1)
+            return self.text.find(query.needle, start)
+        if not backwards:
+            for m in query.matches(self.text, start):
+                return m.start()
+            return -1
+        found = -1
+        for m in query.matches(self.text, 0, start):
+            if m.start() < start:
+                found = m.start()
+        return found
+
+
+class SearchIndex:
+    """
+    Chunked, trigram-filtered index of console lines
+
+    Appending only lowercases lines and cuts full chunks; trigram sets are
+    built later by ``build_pending()`` (e.g. from an idle timer). Chunks
+    without trigrams yet are simply scanned, so results never depend on
+    how far indexing has got.
+
+    Args:
+        chunk_lines: Lines per sealed chunk
+    """
+
+    def __init__(self, chunk_lines: int = 4096):
+        self.chunk_lines = chunk_lines
+        self.chunks = []
+        self.start = 0
+        self.end = 0
+        self._open = []
+        self._open_chunk = None
+        self._pending = []
+        self._counts_key = None
+        self._counts = {}
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def pending(self) -> int:
+        """Sealed chunks still waiting for their trigram sets"""
+        return len(self._pending)
+
+    def extend(self, texts):
+        """Index lines appended to the scrollback"""
+        texts = list(texts)
+        if not texts:
+            return
+        self._open.extend(fold("\n".join(texts)).split("\n"))
+        self.end += len(texts)
+        size = self.chunk_lines
+        while len(self._open) >= size:
+            chunk = _Chunk(self.end - len(self._open), self._open[:size])
+            self.chunks.append(chunk)
+            self._pending.append(chunk)
+            del self._open[:size]
+        self._open_chunk = None
+
+    def build_pending(self, deadline: float = None) -> bool:
+        """
+        Build trigram sets of sealed chunks
+
+        Args:
+            deadline: time.monotonic() value to stop at
+
+        Returns:
+            bool: True if nothing is left to build
+        """
+        while self._pending:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            chunk = self._pending.pop(0)
+            if chunk.end > self.start:
+                chunk.build_grams()
+        return True
+
+    def discard_before(self, line: int):
+        """Forget lines evicted from the scrollback"""
+        if line <= self.start:
+            return
+        self.start = min(line, self.end)
+        while self.chunks and self.chunks[0].end <= self.start:
+            dropped = self.chunks.pop(0)
+            self._counts.pop(dropped.first, None)
+        while self._pending and self._pending[0].end <= self.start:
+            self._pending.pop(0)
+        if self.start > self.end - len(self._open):
+            # Only part of the open chunk is left
+            del self._open[:self.start - (self.end - len(self._open))]
+            self._open_chunk = None
+
+    def clear(self):
+        self.chunks = []
+        self._pending = []
+        self._open = []
+        self._open_chunk = None
+        self._counts = {}
+        self.start = self.end
+
+    def _live_chunks(self):
+        if self._open and self._open_chunk is None:
+            self._open_chunk = _Chunk(self.end - len(self._open), self._open)
+        if self._open_chunk is not None:
+            return self.chunks + [self._open_chunk]
+        return self.chunks
+
+    def _min_offset(self, chunk):
+        return chunk.offset(self.start) if chunk.first < self.start else 0
+
+    def _chunk_count(self, chunk, query, end=None):
+        """Matches in a chunk's live lines, cached for sealed whole chunks"""
+        if not chunk.could_match(query):
+            return 0
+        if end is not None or chunk.first < self.start or chunk is self._open_chunk:
+            # Partial range, partly evicted or still growing: not cacheable
+            minimum = self._min_offset(chunk)
+            if end is None:
+                return chunk.count(query, minimum)
+            if query.needle is not None:
+                return chunk.text.count(query.needle, minimum, end)
+            return sum(1 for _ in query.matches(chunk.text, minimum, end))
+        cached = self._counts.get(chunk.first)
+        if cached is None:
+            cached = self._counts[chunk.first] = chunk.count(query)
+        return cached
+
+    def _use_query(self, query):
+        if query.key != self._counts_key:
+            self._counts_key = query.key
+            self._counts = {}
+
+    def count(self, query: SearchQuery, deadline: float = None):
+        """
+        Count matches in the live lines
+
+        Args:
+            query: Compiled query
+            deadline: time.monotonic() value after which to stop scanning
+                chunks that are not cached yet; call again to continue
+
+        Returns:
+            tuple: (count, complete), count is a lower bound if incomplete
+        """
+        self._use_query(query)
+        total = 0
+        for chunk in self._live_chunks():
+            if deadline is not None and time.monotonic() > deadline \
+                    and chunk.first not in self._counts:
+                return total, False
+            total += self._chunk_count(chunk, query)
+        return total, True
+
+    def _chunk_index(self, chunks, line):
+        firsts = [chunk.first for chunk in chunks]
+        return max(0, bisect_right(firsts, line) - 1)
+
+    def find(self, query: SearchQuery, line: int, column: int = -1, backwards: bool = False):
+        """
+        Next match after (or before) a position, wrapping around
+
+        Args:
+            query: Compiled query
+            line: Absolute line of the current position
+            column: Column in that line, -1 for before its start
+            backwards: Search towards older lines
+
+        Returns:
+            tuple or None: ``(line, column)`` of the match start
+        """
+        self._use_query(query)
+        chunks = self._live_chunks()
+        if not chunks:
+            return None
+        line = min(max(line, self.start), self.end - 1)
+        first_index = self._chunk_index(chunks, line)
+        order = list(range(len(chunks)))
+        if backwards:
+            order = order[first_index::-1] + order[:first_index:-1]
+        else:
+            order = order[first_index:] + order[:first_index]
+
+        for step, index in enumerate(order + [first_index]):
+            chunk = chunks[index]
+            if not chunk.could_match(query) or self._counts.get(chunk.first) == 0:
+                continue
+            minimum = self._min_offset(chunk)
+            if step == 0:
+                position = chunk.offset(line) + column
+                start = position if backwards else position + 1
+            else:
+                start = len(chunk.text) if backwards else minimum
+            found = chunk.find(query, start if backwards else max(start, minimum), backwards)
+            if found >= minimum:
+                hit_line = chunk.line_at(found)
+                return hit_line, found - chunk.offset(hit_line)
+        return None
+
+    def rank(self, query: SearchQuery, line: int, column: int) -> int:
+        """1-based number of the match at ``(line, column)`` among all matches"""
+        self._use_query(query)
+        total = 0
+        for chunk in self._live_chunks():
+            if chunk.end <= line:
+                total += self._chunk_count(chunk, query)
+                continue
+            total += self._chunk_count(chunk, query, chunk.offset(line) + column)
+            break
+        return total + 1
@@ -0,0 +1,291 @@
+"""
+Incremental decoding of child process output
+
+Raw bytes are read from the pipe in large chunks and turned into lines
+here, so the runner never iterates the pipe line by line in text mode.
+"""
+import os
+import re
+import time
+import codecs
+
+if os.name == "nt":
+    import msvcrt
+    import _winapi
+else:
+    import select
+
+try:
+    import pty
+    import fcntl
+    import struct
+    import termios
+    PTY_SUPPORTED = True
+except ImportError:  # Windows
+    PTY_SUPPORTED = False
+
+
+READ_CHUNK = 64 * 1024
+
+# Carriage return and the CSI sequences that move the cursor or erase text
+_CONTROL = re.compile(r"\r|\x1b\[[0-9;]*[A-GJK]")
+# Tokens of the slow path: newline, CR, any CSI sequence
+_TOKEN = re.compile(r"(\n|\r|\x1b\[[0-?]*[ -/]*[@-~])")
+_STRIP_SGR = re.compile(r"\x1b\[[0-9;:]*m")
+_INCOMPLETE_CSI = re.compile(r"\x1b(?:\[[0-?]*[ -/]*)?\Z")
+
+
+def pipe_has_data(fd: int) -> bool:
+    """
+    Check whether a read on ``fd`` would return immediately
+
+    Returns True on errors so the caller's read observes EOF/failure.
+    """
+    try:
+        if os.name == "nt":
+            available, _ = _winapi.PeekNamedPipe(msvcrt.get_osfhandle(fd), 0)
+            return available > 0
+        readable, _, _ = select.select([fd], [], [], 0)
+        return bool(readable)
+    except (OSError, ValueError):
+        return True
+
+
+def open_pty(columns: int = 120, rows: int = 30):
+    """
+    Open a pseudo-terminal for a child process (POSIX only)
+
+    The window size is set on the terminal, and output post-processing
+    (``\n`` to ``\r\n``) is turned off so lines read back like pipe output.
+
+    Returns:
+        tuple: (master_fd, slave_fd); the child gets the slave, the parent
+        reads the master and must close both
+    """
+    master, slave = pty.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+    attrs = termios.tcgetattr(slave)
+    attrs[1] &= ~termios.ONLCR
+    termios.tcsetattr(slave, termios.TCSANOW, attrs)
+    return master, slave
+
+
+def wait_readable(fd: int, timeout: float):
+    """Sleep until ``fd`` has data or ``timeout`` seconds passed"""
+    if timeout <= 0:
+        return
+    if os.name != "nt":
+        try:
+            select.select([fd], [], [], timeout)
+        except (OSError, ValueError):
+            pass
+        return
+    # Anonymous pipes cannot be waited on: poll them every millisecond
+    deadline = time.monotonic() + timeout
+    while not pipe_has_data(fd) and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TerminalLines:
+    """
+    Turn a stream of byte chunks into lines the way a terminal would
+
+    Carriage returns, erase-line/erase-display and cursor movement
+    sequences rewrite the line they apply to instead of producing new
+    lines, so a progress bar redrawn ten thousand times is one line. Lines
+    keep their color (SGR) sequences; rendering them is left to
+    core.ansi.AnsiRenderer.
+
+    Rows that may still be rewritten are "live" (``live``): normally only
+    the unterminated current line, or the last ``live_rows`` rows once the
+    output has moved the cursor up (multi-line progress displays). Rows
+    leave the live area as committed lines returned by ``feed()``.
+
+    Output without control sequences takes a fast path equivalent to
+    splitting on newlines. Multi-byte characters and escape sequences split
+    across chunk boundaries are carried over to the next ``feed()`` call.
+    """
+
+    def __init__(self, encoding: str = "utf-8", live_rows: int = 24):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.live_rows = live_rows
+        self.changed = False
+        self._carry = ""
+        self._partial = ""      # current line while on the fast path
+        self._rows = None       # [cells, tail] per live row on the slow path
+        self._row = 0
+        self._col = 0
+        self._style = ""        # SGR sequences not yet attached to a cell
+        self._since_up = live_rows + 1  # newlines since the cursor moved up
+
+    @property
+    def pending(self) -> bool:
+        """True if live (not yet committed) text is buffered"""
+        return bool(self._partial) or self._rows is not None
+
+    @property
+    def live(self) -> list:
+        """Rows that can still change, trailing empty rows left out"""
+        if self._rows is None:
+            return [self._partial] if self._partial else []
+        lines = [self._join(row) for row in self._rows]
+        while lines and not _STRIP_SGR.sub("", lines[-1]):
+            lines.pop()
+        return lines
+
+    @staticmethod
+    def _join(row) -> str:
+        return "".join(row[0]) + row[1]
+
+    def feed(self, data: bytes) -> list:
+        """Decode a chunk and return the lines it committed"""
+        text = self._carry + self._decoder.decode(data)
+        self._carry = ""
+        last_escape = text.rfind("\x1b")
+        if last_escape >= 0 and _INCOMPLETE_CSI.match(text, last_escape):
+            self._carry = text[last_escape:]
+            text = text[:last_escape]
+        if text.endswith("\r"):
+            # May be the first half of \r\n
+            self._carry = "\r" + self._carry
+            text = text[:-1]
+        return self._feed_text(text)
+
+    def _feed_text(self, text: str) -> list:
+        if not text:
+            return []
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        self.changed = True
+
+        if self._rows is None and not _CONTROL.search(text):
+            text = self._partial + text
+            end = text.rfind("\n")
+            if end < 0:
+                self._partial = text
+                return []
+            self._partial = text[end + 1:]
+            return text[:end].split("\n")
+
+        if self._rows is None:
+            # Replay the current line into cells
+            self._rows = [[[], ""]]
+            self._row = self._col = 0
+            text, self._partial = self._partial + text, ""
+        self._apply(text)
+
+        committed = []
+        keep = self.live_rows if self._since_up <= self.live_rows else 0
+        while self._row > keep:
+            committed.append(self._join(self._rows.pop(0)))
+            self._row -= 1
+
+        # Back to the fast path once nothing can be rewritten any more
+        if keep == 0 and len(self._rows) == 1 and self._col == len(self._rows[0][0]):
+            self._partial = self._join(self._rows[0]) + self._style
+            self._rows = None
+            self._style = ""
+        return committed
+
+    def _apply(self, text: str):
+        """Slow path: apply carriage returns and cursor sequences"""
+        for i, part in enumerate(_TOKEN.split(text)):
+            if not part:
+                continue
+            if i % 2 == 0:
+                self._write(part)
+            elif part == "\n":
+                self._newline()
+            elif part == "\r":
+                self._col = 0
+            else:
+                self._control(part)
+
+    def _write(self, text: str):
+        row = self._rows[self._row]
+        cells = row[0]
+        chars = list(text)
+        col = self._col
+        if col > len(cells):
+            cells.extend(" " * (col - len(cells)))
+        if col == len(cells):
+            style = row[1] + self._style
+            row[1] = ""
+            if style:
+                chars[0] = style + chars[0]
+            cells.extend(chars)
+        else:
+            if not self._style:
+                # Overwritten cells keep their color
+                for j, cell in enumerate(cells[col:col + len(chars)]):
+                    if len(cell) > 1:
+                        chars[j] = cell[:-1] + chars[j]
+            else:
+                chars[0] = self._style + chars[0]
+            cells[col:col + len(chars)] = chars
+        self._style = ""
+        self._col = col + len(chars)
+
+    def _newline(self):
+        if self._style:
+            self._rows[self._row][1] += self._style
+            self._style = ""
+        self._since_up += 1
+        self._move_row(self._row + 1)
+        self._col = 0
+
+    def _move_row(self, row: int):
+        self._row = max(0, row)
+        while self._row >= len(self._rows):
+            self._rows.append([[], ""])
+
+    def _control(self, sequence: str):
+        final = sequence[-1]
+        if final == "m":
+            self._style += sequence
+            return
+        params = sequence[2:-1]
+        number = int(params) if params.isdigit() else 0
+        count = max(1, number)
+        cells = self._rows[self._row][0]
+        if final == "K":
+            if number == 0:
+                del cells[self._col:]
+            elif number == 1:
+                cells[:self._col] = " " * min(self._col, len(cells))
+            else:
+                cells.clear()
+        elif final == "J":
+            if number == 0:
+                del cells[self._col:]
+                del self._rows[self._row + 1:]
+            else:
+                self._rows = [[[], ""]]
+                self._row = 0
+        elif final in "AF":
+            self._move_row(self._row - count)
+            self._since_up = 0
+            if final == "F":
+                self._col = 0
+        elif final in "BE":
+            self._move_row(self._row + count)
+            if final == "E":
+                self._col = 0
+        elif final == "C":
+            self._col += count
+        elif final == "D":
+            self._col = max(0, self._col - count)
+        elif final == "G":
+            self._col = count - 1
+
+    def flush(self) -> list:
+        """Finish the stream, committing every live row"""
+        text = self._carry.replace("\r", "") + self._decoder.decode(b"", final=True)
+        self._carry = ""
+        committed = self._feed_text(text)
+        committed.extend(self.live)
+        self._partial = ""
+        self._rows = None
+        self._style = ""
+        self.changed = True
+        return committed
@@ -0,0 +1,387 @@
+"""
+One asyncio event loop that owns every child process of the app
+
+A thread per process blocks a whole OS thread on its pipe, so a session
+with dozens of dev servers, watchers and test runners means dozens of
+threads contending for the GIL. The supervisor instead runs all children
+from a single background thread: their pipes (or pty masters) are non-blocking
+and read when the loop reports them readable, output goes through one
+OutputPipeline per process, and once per frame everything produced since
+the last frame is handed to the Qt event loop in a single queued signal.
+
+Tabs use ``start()`` to get a ProcessHandle, connect to its signals and
+call ``handle.stop()``.
+"""
+import os
+import time
+import asyncio
+import threading
+import subprocess
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.process_tree import (
+    GROUP_POPEN_ARGS, begin_stop, signal_tree, stop_report, wait_ports_free, wait_stopped
+)
+from core.runner import OutputPipeline, spawn_process
+from core.stream import READ_CHUNK, PTY_SUPPORTED
+
+
+# ============================================================
+# PROCESS HANDLE
+# ============================================================
+class ProcessHandle(QObject):
+    """
+    A process run by the ProcessSupervisor
+
+    Signals are emitted in the GUI thread: ``lines_signal`` batches of ``(text, html)`` pairs (the
+    receiver calls ``batch_done()`` for each), ``live_signal`` lines still
+    being rewritten, ``started_signal`` / ``first_output_signal`` with
+    time.monotonic() stamps, and ``finished_signal`` once the output is
+    closed and the process has exited. After a ``stop()`` the whole
+    process tree is terminated (see core.process_tree) and
+    ``stopped_signal`` follows ``finished_signal`` with the stop report.
+    """
+    lines_signal = pyqtSignal(list)
+    live_signal = pyqtSignal(list)
+    started_signal = pyqtSignal(float)
+    first_output_signal = pyqtSignal(float)
+    finished_signal = pyqtSignal()
+    stopped_signal = pyqtSignal(dict)
+
+    def __init__(self, supervisor, cmd, cwd: str, pty_size=None, log_writer=None,
+                 stop_grace: float = 5.0, env=None, max_pending_batches: int = 3,
+                 max_backlog_lines: int = 20000):
+        super().__init__()
+        self.supervisor = supervisor
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = env
+        self.pty_size = pty_size if PTY_SUPPORTED else None
+        self.log_writer = log_writer
+        self.stop_grace = stop_grace
+        self.pipeline = OutputPipeline(log_writer, max_pending_batches, max_backlog_lines)
+        self.process = None
+        self.started_at = None
+        self.first_output_at = None
+        self.stopping = False
+        self.output_closed = False
+        self.fd = None
+        self.running = True
+
+    @property
+    def collapsed_lines(self) -> int:
+        return self.pipeline.collapsed_lines
+
+    def is_running(self) -> bool:
+        """True until ``finished_signal`` has been emitted"""
+        return self.running
+
+    def stop(self):
+        self.supervisor.stop(self)
+
+    def batch_done(self):
+        """Acknowledge a ``lines_signal`` batch (call from the GUI thread)"""
+        self.pipeline.batch_done()
+
+
+# ============================================================
+# SUPERVISOR
+# ============================================================
+class ProcessSupervisor(QObject):
+    """
+    Start, stop and stream child processes from one event-loop thread
+
+    The loop thread is started with the first process. Output is batched
+    per frame (``flush_interval_ms``); the frame timer only runs while
+    processes are alive, so an idle app has one sleeping thread.
+    """
+    _deliver = pyqtSignal(list)
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = ProcessSupervisor()
+        return cls._instance
+
+    def __init__(self, flush_interval_ms: int = 16, parent=None):
+        super().__init__(parent)
+        self.flush_interval = flush_interval_ms / 1000
+        self.loop = None
+        self.thread = None
+        self._handles = []      # loop thread only
+        self._events = []       # (handle, kind, value) not yet delivered
+        self._wake = None
+        self._deliver.connect(self._dispatch)
+
+    # -------------------- GUI thread API --------------------
+    def start(self, cmd, cwd: str, pty_size=None, log_writer=None,
+              stop_grace: float = 5.0, env=None, **options) -> ProcessHandle:
+        """
+        Start a command
+
+        Args:
+            cmd: Command line for the shell, or an argv list to run without one
+            cwd: Working directory
+            pty_size: (columns, rows) to run in a pseudo-terminal, None for pipes
+            log_writer: core.log_archive.RunLogWriter, closed when the process ends
+            stop_grace: Seconds between SIGTERM and SIGKILL when stopped
+            env: Environment for the child, os.environ if None
+            **options: OutputPipeline backpressure options
+
+        Returns:
+            ProcessHandle: Connect to its signals right away, they are
+            delivered on the next pass of the Qt event loop at the earliest
+        """
+        self._ensure_loop()
+        handle = ProcessHandle(self, cmd, cwd, pty_size, log_writer, stop_grace, env, **options)
+        self.loop.call_soon_threadsafe(self._spawn, handle)
+        return handle
+
+    def stop(self, handle: ProcessHandle):
+        """Stop a process; ``finished_signal`` follows"""
+        if self.loop is not None and handle.running:
+            self.loop.call_soon_threadsafe(self._stop, handle)
+
+    def running_handles(self) -> list:
+        return [handle for handle in list(self._handles) if handle.running]
+
+    def shutdown(self, grace: float = 1.0):
+        """
+        Stop every process tree and the loop thread (application exit)
+
+        The GUI thread blocks here, so the processes' own grace periods are
+        not honoured: trees still alive after ``grace`` seconds are killed,
+        and the wait ends at most half a second later.
+        """
+        if self.loop is None:
+            return
+        done = threading.Event()
+
+        async def stop_all():
+            for handle in list(self._handles):
+                self._stop(handle)
+            deadline = time.monotonic() + grace
+            while self._handles and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+            for handle in list(self._handles):
+                if handle.process is not None:
+                    signal_tree(handle.process, force=True)
+            deadline = time.monotonic() + 0.5
+            while self._handles and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+            done.set()
+
+        asyncio.run_coroutine_threadsafe(stop_all(), self.loop)
+        done.wait(grace + 1)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(1)
+        self.loop = None
+        self.thread = None
+
+    def _ensure_loop(self):
+        if self.loop is not None:
+            return
+        if os.name == "nt":
+            # Subprocess pipes need the proactor loop on Windows
+            self.loop = asyncio.ProactorEventLoop()
+        else:
+            self.loop = asyncio.SelectorEventLoop()
+        ready = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run_loop, args=(ready,), name="ProcessSupervisor", daemon=True
+        )
+        self.thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready):
+        loop = self.loop
+        asyncio.set_event_loop(loop)
+        self._wake = asyncio.Event()
+        loop.create_task(self._frames())
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    def _dispatch(self, events):
+        """Re-emit a frame of events on their handles (GUI thread)"""
+        for handle, kind, value in events:
+            if kind == "lines":
+                handle.lines_signal.emit(value)
+            elif kind == "live":
+                handle.live_signal.emit(value)
+            elif kind == "started":
+                handle.started_signal.emit(value)
+            elif kind == "first_output":
+                handle.first_output_signal.emit(value)
+            elif kind == "finished":
+                handle.running = False
+                handle.finished_signal.emit()
+            elif kind == "stopped":
+                handle.stopped_signal.emit(value)
+
+    # -------------------- loop thread --------------------
+    async def _frames(self):
+        """Deliver everything produced since the last frame, once per frame"""
+        while True:
+            if not self._handles and not self._events:
+                self._wake.clear()
+                await self._wake.wait()
+            await asyncio.sleep(self.flush_interval)
+            for handle in self._handles:
+                self._take(handle)
+            self._flush()
+
+    def _flush(self):
+        if self._events:
+            events, self._events = self._events, []
+            self._deliver.emit(events)
+
+    def _take(self, handle, force=False):
+        pipeline = handle.pipeline
+        if not pipeline.pending or (pipeline.blocked and not force):
+            return
+        batch, live = pipeline.take()
+        if batch:
+            self._events.append((handle, "lines", batch))
+        if live is not None:
+            self._events.append((handle, "live", live))
+
+    def _spawn(self, handle):
+        self._handles.append(handle)
+        self._wake.set()
+        if os.name == "nt":
+            self.loop.create_task(self._run_windows(handle))
+            return
+        try:
+            handle.process, handle.fd = spawn_process(
+                handle.cmd, handle.cwd, handle.pty_size, handle.env
+            )
+            os.set_blocking(handle.fd, False)
+            self.loop.add_reader(handle.fd, self._on_readable, handle)
+        except Exception as e:
+            print(f"Error starting process: {e}")
+            self._close_output(handle)
+            self.loop.create_task(self._reap(handle))
+            return
+        self._started(handle)
+
+    def _started(self, handle):
+        handle.started_at = time.monotonic()
+        self._events.append((handle, "started", handle.started_at))
+
+    def _on_data(self, handle, data: bytes):
+        if handle.first_output_at is None:
+            handle.first_output_at = time.monotonic()
+            self._events.append((handle, "first_output", handle.first_output_at))
+        handle.pipeline.feed(data)
+
+    def _on_readable(self, handle):
+        """Drain a POSIX pipe/pty master without blocking"""
+        try:
+            while True:
+                data = os.read(handle.fd, READ_CHUNK)
+                if not data:
+                    break
+                self._on_data(handle, data)
+                if len(data) < READ_CHUNK:
+                    return
+        except BlockingIOError:
+            return
+        except OSError:
+            # A pty reports EIO instead of EOF once the child has exited
+            pass
+        self._close_output(handle)
+        self.loop.create_task(self._reap(handle))
+
+    async def _run_windows(self, handle):
+        try:
+            options = dict(
+                cwd=handle.cwd,
+                env=handle.env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                **GROUP_POPEN_ARGS
+            )
+            if isinstance(handle.cmd, str):
+                handle.process = await asyncio.create_subprocess_shell(handle.cmd, **options)
+            else:
+                handle.process = await asyncio.create_subprocess_exec(*handle.cmd, **options)
+        except Exception as e:
+            print(f"Error starting process: {e}")
+            self._close_output(handle)
+            await self._reap(handle)
+            return
+        self._started(handle)
+        if handle.stopping:
+            # stop() arrived while the process was being created
+            self.loop.create_task(self._terminate(handle))
+        stream = handle.process.stdout
+        while not handle.output_closed:
+            data = await stream.read(READ_CHUNK)
+            if not data:
+                break
+            self._on_data(handle, data)
+        self._close_output(handle)
+        await self._reap(handle)
+
+    def _close_output(self, handle):
+        """Stop reading and commit what is left (EOF or stop)"""
+        if handle.output_closed:
+            return
+        handle.output_closed = True
+        if handle.fd is not None and os.name != "nt":
+            self.loop.remove_reader(handle.fd)
+            if handle.pty_size is not None:
+                os.close(handle.fd)
+            elif handle.process is not None:
+                handle.process.stdout.close()
+        handle.pipeline.finish()
+        self._take(handle, force=True)
+        if handle.log_writer is not None:
+            handle.log_writer.close()
+
+    async def _reap(self, handle):
+        """Wait for the process to exit without a child-watcher thread"""
+        process = handle.process
+        if process is not None:
+            if os.name == "nt":
+                await process.wait()
+            else:
+                # A process that closed its output may keep running
+                # (daemonizing scripts): wait for it, don't stop it
+                while process.poll() is None:
+                    await asyncio.sleep(0.02)
+        if handle not in self._handles:
+            return  # Already reaped by the reader or a stop
+        self._handles.remove(handle)
+        self._events.append((handle, "finished", None))
+        self._flush()
+
+    def _stop(self, handle):
+        if handle.stopping or handle not in self._handles:
+            return
+        handle.stopping = True
+        if handle.process is not None:
+            self.loop.create_task(self._terminate(handle))
+
+    async def _terminate(self, handle):
+        """Stop the process tree, escalating after the grace period"""
+        process = handle.process
+        stop = begin_stop(process)
+        if os.name != "nt":
+            # Drop whatever the process prints while it goes down
+            self._close_output(handle)
+        await self.loop.run_in_executor(None, wait_stopped, process, stop, handle.stop_grace)
+        await self._reap(handle)
+        ports_free_at = await self.loop.run_in_executor(None, wait_ports_free, stop["ports"])
+        self._events.append((handle, "stopped", stop_report(stop, ports_free_at)))
+        self._flush()
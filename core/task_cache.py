@@ -0,0 +1,398 @@
+"""
+Content-addressed cache of successful script runs
+
+A run's key hashes everything the script declares it depends on: the
+script name and body, the package manager, package.json, the lockfile,
+the values of selected environment variables and the path and content of
+every input file. File digests are memoized by ``(size, mtime)``, so an
+unchanged tree costs one ``stat`` per input file.
+
+An entry stores the console output of a successful run, its duration and
+a tar of the declared output paths:
+
+    <cache>/<key[:2]>/<key>/meta.json      project, script, duration, size
+    <cache>/<key[:2]>/<key>/output.z       zlib JSON [[text, html], ...]
+    <cache>/<key[:2]>/<key>/outputs.tar    declared outputs
+
+On a hit the output is replayed and the outputs restored instead of
+running the script. Restoring extracts into a scratch directory in the
+project first and only then swaps the outputs in, so a damaged archive
+leaves the current outputs alone. Entries are evicted least recently used first once
+the cache is over its size limit; a hit touches ``meta.json``.
+"""
+import os
+import re
+import json
+import time
+import zlib
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import threading
+
+from core.constants import CACHE_DIR, TRASH_PREFIX
+from core.ignore import parse_pattern, translate_glob
+from core.utils import format_duration
+
+
+SKIP_DIRS = {"node_modules", ".git"}
+
+
+def _compile(patterns):
+    """One regex for project-relative globs; a directory match covers its contents"""
+    rules = []
+    for pattern in patterns:
+        # Anchored at the project root; ``**/`` matches at any depth
+        parsed = parse_pattern("/" + pattern.lstrip("/"))
+        if parsed is not None:
+            rules.append(f"(?:{parsed[0]})(?:/.*)?")
+    return re.compile("|".join(rules)) if rules else None
+
+
+def _segments(pattern):
+    """Per-segment regexes of a glob, None for a ``**`` segment"""
+    return [
+        None if segment == "**" else re.compile(translate_glob(segment))
+        for segment in pattern.strip().strip("/").split("/") if segment
+    ]
+
+
+def _reachable(segments, parts) -> bool:
+    """Whether a directory (path segments) can hold a match of the glob"""
+    for i, part in enumerate(parts):
+        if i == len(segments) or segments[i] is None:
+            return True  # Inside a matching directory, or past a ``**``
+        if not segments[i].fullmatch(part):
+            return False
+    return True
+
+
+def _safe_relpath(path):
+    """Normalized project-relative path, None if it leaves the project"""
+    rel = os.path.normpath(path.strip().strip("/\\"))
+    if not rel or rel == "." or os.path.isabs(rel) or rel.split(os.sep)[0] == "..":
+        return None
+    return rel
+
+
+class TaskCache:
+    """
+    Run results by input hash, with an LRU size limit
+
+    Args:
+        root: Cache directory
+        max_bytes: Total size cap
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = TaskCache(CACHE_DIR)
+        return cls._instance
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    # ==================== Keys ====================
+
+    def file_digest(self, path: str):
+        """Content digest of a file, memoized by size and mtime"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        digest = hashlib.blake2b(digest_size=20)
+        try:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        except OSError:
+            return None
+        result = digest.hexdigest()
+        with self._lock:
+            self._digests[path] = (stamp, result)
+        return result
+
+    def input_files(self, project_path: str, inputs, outputs=()) -> list:
+        """
+        Project-relative input files, sorted
+
+        Only directories an input glob can reach are walked: ``src/**/*.ts``
+        walks ``src``, ``*.json`` only the project root and ``**/*.ts``
+        everything.
+
+        Args:
+            project_path: Project directory
+            inputs: Globs relative to the project root (gitignore syntax,
+                ``!`` excludes); a matching directory includes everything
+                under it
+            outputs: Paths never treated as inputs
+        """
+        includes = [p for p in inputs if not p.startswith("!")]
+        include = _compile(includes)
+        exclude = _compile([p[1:] for p in inputs if p.startswith("!")])
+        skip = {rel.replace(os.sep, "/") for rel in map(_safe_relpath, outputs) if rel}
+        if include is None:
+            return []
+        globs = [_segments(p) for p in includes]
+
+        files = []
+        for dirpath, dirnames, filenames in os.walk(project_path):
+            rel_dir = os.path.relpath(dirpath, project_path).replace(os.sep, "/")
+            rel_dir = "" if rel_dir == "." else rel_dir + "/"
+            parts = tuple(rel_dir.split("/")[:-1])
+            dirnames[:] = [
+                d for d in dirnames
+                if d not in SKIP_DIRS and not d.startswith(TRASH_PREFIX)
+                and rel_dir + d not in skip and any(_reachable(segments, parts + (d,)) for segments in globs)
+            ]
+            for name in filenames:
+                rel = rel_dir + name
+                if rel in skip or not include.fullmatch(rel):
+                    continue
+                if exclude is not None and exclude.fullmatch(rel):
+                    continue
+                files.append(rel)
+        files.sort()
+        return files
+
+    def compute_key(self, project_path: str, script: str, body: str, package_manager: str,
+                    inputs, outputs=(), env_names=(), lockfile: str = None):
+        """
+        Cache key of a run that is about to start
+
+        Args:
+            lockfile: Lock file that applies to the project (the monorepo
+                root's for a workspace package), None if there is none
+
+        Returns:
+            tuple: ``(key, input_count)``
+        """
+        digest = hashlib.blake2b(digest_size=20)
+
+        def add(*parts):
+            for part in parts:
+                digest.update(str(part).encode("utf-8", errors="surrogateescape"))
+                digest.update(b"\0")
+
+        add("v1", script, body, package_manager)
+        add("package.json", self.file_digest(os.path.join(project_path, "package.json")))
+        add("lockfile", lockfile and os.path.basename(lockfile),
+            lockfile and self.file_digest(lockfile))
+        for name in sorted(env_names):
+            add("env", name, os.environ.get(name))
+        for name in sorted(outputs):
+            add("output", name)
+        files = self.input_files(project_path, inputs, outputs)
+        for rel in files:
+            add(rel, self.file_digest(os.path.join(project_path, rel)))
+        return digest.hexdigest(), len(files)
+
+    # ==================== Entries ====================
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def lookup(self, key: str):
+        """
+        Metadata of a stored run (and mark it used), None on a miss
+
+        Returns:
+            dict: ``meta.json`` contents
+        """
+        meta_path = os.path.join(self.entry_dir(key), "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("outputs") and not os.path.exists(
+                    os.path.join(self.entry_dir(key), "outputs.tar")):
+                return None
+            os.utime(meta_path)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return meta
+
+    def load_output(self, key: str) -> list:
+        """Stored ``(text, html)`` console lines"""
+        try:
+            with open(os.path.join(self.entry_dir(key), "output.z"), "rb") as f:
+                return [tuple(line) for line in json.loads(zlib.decompress(f.read()))]
+        except (OSError, ValueError, zlib.error):
+            return []
+
+    def restore_outputs(self, key: str, project_path: str, outputs) -> bool:
+        """
+        Replace the declared outputs in the project with the stored ones
+
+        Returns:
+            bool: False if the archive could not be extracted; the project's
+            outputs are then left as they were
+        """
+        archive = os.path.join(self.entry_dir(key), "outputs.tar")
+        try:
+            # In the project so the swap is a rename; the trash prefix keeps
+            # it out of the watcher and of input hashing
+            scratch = tempfile.mkdtemp(prefix=f"{TRASH_PREFIX}restore-", dir=project_path)
+        except OSError as e:
+            print(f"Error restoring cached outputs: {e}")
+            return False
+        extracted = os.path.join(scratch, "new")
+        replaced = os.path.join(scratch, "old")
+        moved = []  # (target, aside) of outputs already swapped out
+        try:
+            if os.path.exists(archive):
+                with tarfile.open(archive, "r") as tar:
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extractall(extracted, filter="data")
+                    else:
+                        members = [
+                            m for m in tar.getmembers()
+                            if _safe_relpath(m.name) and not (m.issym() or m.islnk())
+                        ]
+                        tar.extractall(extracted, members)
+
+            for rel in filter(None, map(_safe_relpath, outputs)):
+                target = os.path.join(project_path, rel)
+                if os.path.lexists(target):
+                    aside = os.path.join(replaced, rel)
+                    os.makedirs(os.path.dirname(aside), exist_ok=True)
+                    os.replace(target, aside)
+                    moved.append((target, aside))
+                source = os.path.join(extracted, rel)
+                if os.path.lexists(source):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(source, target)
+        except (OSError, tarfile.TarError) as e:
+            print(f"Error restoring cached outputs: {e}")
+            for target, aside in reversed(moved):
+                try:
+                    if os.path.isdir(target) and not os.path.islink(target):
+                        shutil.rmtree(target)
+                    elif os.path.lexists(target):
+                        os.remove(target)
+                    os.replace(aside, target)
+                except OSError:
+                    pass
+            return False
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        return True
+
+    def store(self, key: str, project_path: str, script: str, duration: float,
+              lines, outputs=()):
+        """
+        Save a successful run
+
+        Args:
+            key: ``compute_key()`` of the run
+            project_path: Project directory
+            script: Script name
+            duration: Run time in seconds
+            lines: Rendered ``(text, html)`` console lines
+            outputs: Project-relative output paths to archive
+        """
+        final = self.entry_dir(key)
+        temp = f"{final}.tmp{threading.get_ident()}"
+        try:
+            os.makedirs(temp, exist_ok=True)
+            with open(os.path.join(temp, "output.z"), "wb") as f:
+                f.write(zlib.compress(json.dumps(list(lines)).encode("utf-8"), 6))
+            size = 0
+            existing = [
+                rel for rel in filter(None, map(_safe_relpath, outputs))
+                if os.path.lexists(os.path.join(project_path, rel))
+            ]
+            if existing:
+                with tarfile.open(os.path.join(temp, "outputs.tar"), "w") as tar:
+                    for rel in existing:
+                        tar.add(os.path.join(project_path, rel), arcname=rel.replace(os.sep, "/"))
+            for name in os.listdir(temp):
+                size += os.path.getsize(os.path.join(temp, name))
+            meta = {
+                "project": project_path,
+                "script": script,
+                "duration": duration,
+                "created": time.time(),
+                "outputs": existing,
+                "lines": len(lines),
+                "size": size,
+            }
+            with open(os.path.join(temp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            shutil.rmtree(final, ignore_errors=True)
+            os.replace(temp, final)
+        except OSError as e:
+            print(f"Error storing cache entry: {e}")
+            shutil.rmtree(temp, ignore_errors=True)
+            return
+        self.evict()
+
+    def store_async(self, *args, **kwargs) -> threading.Thread:
+        """
+        ``store()`` on a background thread (archiving outputs can take a while)
+
+        The outputs are read while the thread runs: the caller must not
+        start anything that rewrites them until the thread has finished.
+        """
+        thread = threading.Thread(target=self.store, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def entries(self) -> list:
+        """``(last_used, size, path)`` of every entry"""
+        result = []
+        try:
+            shards = list(os.scandir(self.root))
+        except OSError:
+            return result
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if ".tmp" in entry.name:
+                    continue
+                meta_path = os.path.join(entry.path, "meta.json")
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        size = json.load(f).get("size", 0)
+                    result.append((os.stat(meta_path).st_mtime, size, entry.path))
+                except (OSError, json.JSONDecodeError):
+                    continue
+        return result
+
+    def evict(self) -> int:
+        """Delete least recently used entries over ``max_bytes``, returns how many"""
+        entries = sorted(self.entries(), reverse=True)
+        total = 0
+        removed = 0
+        for _, size, path in entries:
+            total += size
+            if total > self.max_bytes:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def record(self, hit: bool, saved: float = 0.0):
+        """Count a lookup for the session totals"""
+        if hit:
+            self.hits += 1
+            self.saved += saved
+        else:
+            self.misses += 1
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {format_duration(self.saved)} saved this session"
@@ -0,0 +1,255 @@
+"""
+Dependency graph of script tasks and a parallel scheduler for it
+
+A TaskGraph holds one node per task: a command plus the names of the
+tasks that must succeed before it starts. TaskScheduler runs the graph
+through the ProcessSupervisor, starting every task whose dependencies are
+done as long as fewer than ``max_parallel`` are running. A failing task
+skips everything that depends on it; independent branches finish. The
+report compares the wall time with the serial time (sum of all task
+durations) and the critical path (the longest dependency chain by
+measured duration), which bounds how fast the graph can run.
+"""
+import os
+import time
+from dataclasses import dataclass, field
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+# ==================== Graph ====================
+
+@dataclass
+class TaskNode:
+    """
+    One task of a graph
+
+    ``cmd`` None makes a join node that only groups its dependencies.
+    ``script`` is the package.json script the task belongs to; ``cwd``
+    None runs it in the project directory.
+    """
+    name: str
+    cmd: object = None
+    env: dict = None
+    script: str = None
+    deps: set = field(default_factory=set)
+    cwd: str = None
+
+
+class TaskGraph:
+    """Tasks by name with their dependencies"""
+
+    def __init__(self):
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, name):
+        return name in self.nodes
+
+    def add(self, node: TaskNode) -> TaskNode:
+        self.nodes[node.name] = node
+        return node
+
+    def dependents(self, name: str) -> set:
+        """Every task that directly or indirectly depends on ``name``"""
+        result = set()
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            for node in self.nodes.values():
+                if current in node.deps and node.name not in result:
+                    result.add(node.name)
+                    pending.append(node.name)
+        return result
+
+    def order(self) -> list:
+        """
+        Task names with every task after its dependencies
+
+        Raises:
+            ValueError: On a dependency cycle or a dependency that is not a task
+        """
+        for node in self.nodes.values():
+            missing = node.deps - self.nodes.keys()
+            if missing:
+                raise ValueError(f"{node.name} depends on unknown task {sorted(missing)[0]}")
+
+        order = []
+        remaining = {name: set(node.deps) for name, node in self.nodes.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle between {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+                order.append(name)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def critical_path(self, durations: dict):
+        """
+        Longest dependency chain by duration
+
+        Args:
+            durations: Seconds per task; missing tasks count as 0
+
+        Returns:
+            tuple: ``(seconds, [names])`` from the first task to the last,
+            join nodes and tasks without a duration left out
+        """
+        finish = {}
+        previous = {}
+        order = self.order()
+        for name in order:
+            deps = self.nodes[name].deps
+            before = max(deps, key=lambda dep: finish[dep]) if deps else None
+            finish[name] = durations.get(name, 0.0) + (finish[before] if before else 0.0)
+            previous[name] = before
+        if not finish:
+            return 0.0, []
+        name = max(reversed(order), key=finish.get)
+        total = finish[name]
+        path = []
+        while name is not None:
+            if self.nodes[name].cmd is not None and name in durations:
+                path.append(name)
+            name = previous[name]
+        return total, path[::-1]
+
+
+# ==================== Scheduler ====================
+
+class TaskScheduler(QObject):
+    """
+    Run a TaskGraph with bounded parallelism
+
+    Create and use from the GUI thread; handles report back through their
+    queued signals.
+
+    Args:
+        graph: Graph to run (validated here)
+        start_node: Called with a TaskNode, returns its ProcessHandle
+        max_parallel: Task limit, default the number of CPUs
+
+    Signals:
+        node_started(name)
+        node_finished(name, state): state is "done", "failed" or "skipped"
+        finished_signal(report): see ``report()``
+    """
+    node_started = pyqtSignal(str)
+    node_finished = pyqtSignal(str, str)
+    finished_signal = pyqtSignal(dict)
+
+    def __init__(self, graph: TaskGraph, start_node, max_parallel: int = None):
+        super().__init__()
+        self.graph = graph
+        self.start_node = start_node
+        self.max_parallel = max(1, max_parallel or os.cpu_count() or 1)
+        self.order = graph.order()
+        self.states = dict.fromkeys(self.order, "pending")
+        self.started = {}
+        self.durations = {}
+        self.handles = {}
+        self.started_at = None
+        self.finished_at = None
+        self.peak_parallel = 0
+
+    @property
+    def running(self) -> list:
+        return [name for name, state in self.states.items() if state == "running"]
+
+    def is_running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._schedule()
+
+    def cancel(self):
+        """Start nothing more; running tasks are left to the caller to stop"""
+        for name, state in self.states.items():
+            if state == "pending":
+                self._set_state(name, "skipped")
+        self._schedule()
+
+    def _set_state(self, name, state):
+        self.states[name] = state
+        if state in ("done", "failed", "skipped"):
+            self.node_finished.emit(name, state)
+
+    def _schedule(self):
+        if self.finished_at is not None:
+            return
+        progress = True
+        while progress:
+            progress = False
+            for name in self.order:
+                if self.states[name] != "pending":
+                    continue
+                deps = self.graph.nodes[name].deps
+                if any(self.states[dep] != "done" for dep in deps):
+                    continue
+                node = self.graph.nodes[name]
+                if node.cmd is None:
+                    # Join node: done as soon as its dependencies are
+                    self.durations[name] = 0.0
+                    self._set_state(name, "done")
+                    progress = True
+                    continue
+                if len(self.running) >= self.max_parallel:
+                    break
+                self._launch(node)
+        if not self.running and not any(s == "pending" for s in self.states.values()):
+            self.finished_at = time.monotonic()
+            self.finished_signal.emit(self.report())
+        elif not self.running:
+            # Pending tasks whose dependencies can no longer succeed
+            for name, state in self.states.items():
+                if state == "pending":
+                    self._set_state(name, "skipped")
+            self._schedule()
+
+    def _launch(self, node):
+        self.states[node.name] = "running"
+        self.started[node.name] = time.monotonic()
+        self.peak_parallel = max(self.peak_parallel, len(self.running))
+        handle = self.start_node(node)
+        self.handles[node.name] = handle
+        handle.finished_signal.connect(lambda: self._on_finished(node.name, handle))
+        self.node_started.emit(node.name)
+
+    def _on_finished(self, name, handle):
+        if self.states.get(name) != "running":
+            return
+        self.durations[name] = time.monotonic() - self.started[name]
+        code = handle.process.returncode if handle.process is not None else None
+        if code == 0:
+            self._set_state(name, "done")
+        else:
+            self._set_state(name, "failed")
+            for dependent in sorted(self.graph.dependents(name)):
+                if self.states[dependent] == "pending":
+                    self._set_state(dependent, "skipped")
+        self._schedule()
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: ``wall``, ``serial`` and ``critical`` seconds, ``path``
+            (critical path task names), ``states`` per task and the
+            ``max_parallel`` limit and ``peak_parallel`` reached
+        """
+        end = self.finished_at or time.monotonic()
+        critical, path = self.graph.critical_path(self.durations)
+        return {
+            "wall": end - self.started_at if self.started_at else 0.0,
+            "serial": sum(self.durations.values()),
+            "critical": critical,
+            "path": path,
+            "states": dict(self.states),
+            "max_parallel": self.max_parallel,
+            "peak_parallel": self.peak_parallel,
+        }
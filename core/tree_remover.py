@@ -0,0 +1,200 @@
+"""
+Background deletion of large directory trees
+
+Reinstall must not wait for ``node_modules`` to be deleted. The tree is
+first renamed to a ``.autorunner-trash-*`` sibling. That is one rename
+on the same filesystem, so the original path is free at once. The old
+tree is then deleted on a thread pool, one top-level entry per task.
+Symlinks and Windows junctions (pnpm, workspaces) are unlinked and never
+followed. Read-only files are made writable and retried.
+
+Trash left behind by a crashed session keeps its prefix, so the next
+load of the project finds it and deletes it.
+
+A remover whose tab goes away is ``detach()``-ed: its signals are
+disconnected and the deletion finishes on its daemon thread. Running
+removers are referenced by the class until then, so the QObject the
+thread emits on stays alive.
+"""
+import os
+import stat
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.constants import TRASH_PREFIX
+
+
+PROGRESS_INTERVAL = 0.2  # Seconds between progress signals
+
+
+def _is_link(entry):
+    """Symlink or Windows junction: remove the link, not what it points to"""
+    try:
+        if entry.is_symlink():
+            return True
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+        return bool(attributes & getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0))
+    except OSError:
+        return False
+
+
+def _writable_retry(func, path):
+    try:
+        func(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        func(path)
+
+
+class TreeRemover(QObject):
+    """
+    Delete directory trees off the GUI thread
+
+    Signals carry the label passed to ``start()``:
+        progress_signal(label, removed, elapsed)
+        finished_signal(label, removed, errors, elapsed)
+
+    Args:
+        max_workers: Threads deleting top-level entries in parallel
+    """
+    progress_signal = pyqtSignal(str, int, float)
+    finished_signal = pyqtSignal(str, int, int, float)
+
+    _running = set()
+    _running_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = 8):
+        super().__init__()
+        self.max_workers = max_workers
+        self.removed = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._label = ""
+        self._started = 0.0
+        self._last_progress = 0.0
+
+    # ==================== Trash ====================
+
+    @staticmethod
+    def move_aside(path: str):
+        """
+        Rename ``path`` to a trash sibling so it can be recreated at once
+
+        Returns:
+            str or None: Trash path, None if the rename failed (on Windows a
+            running process holding a file open prevents it)
+        """
+        trash = os.path.join(
+            os.path.dirname(path),
+            f"{TRASH_PREFIX}{os.path.basename(path)}-{os.getpid()}-{int(time.time() * 1000)}"
+        )
+        try:
+            os.rename(path, trash)
+        except OSError as e:
+            print(f"Error moving {path} aside: {e}")
+            return None
+        return trash
+
+    @staticmethod
+    def find_trash(directory: str) -> list:
+        """Trash directories left in ``directory`` by earlier sessions"""
+        try:
+            with os.scandir(directory) as entries:
+                return [
+                    entry.path for entry in entries
+                    if entry.name.startswith(TRASH_PREFIX) and entry.is_dir(follow_symlinks=False)
+                ]
+        except OSError:
+            return []
+
+    # ==================== Deletion ====================
+
+    def start(self, paths, label: str):
+        """Delete ``paths`` on a background thread"""
+        self._label = label
+        self._started = time.perf_counter()
+        with TreeRemover._running_lock:
+            TreeRemover._running.add(self)
+        self._thread = threading.Thread(target=self._remove_all, args=(list(paths),), daemon=True)
+        self._thread.start()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def detach(self):
+        """Disconnect every receiver; the deletion still runs to the end"""
+        for signal in (self.progress_signal, self.finished_signal):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass  # Nothing connected
+
+    def _remove_all(self, paths):
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for path in paths:
+                    try:
+                        with os.scandir(path) as entries:
+                            entries = list(entries)
+                    except OSError:
+                        self._count(error=True)
+                        continue
+                    list(pool.map(self._remove_entry, entries))
+                    self._remove(os.rmdir, path)
+            self.finished_signal.emit(
+                self._label, self.removed, self.errors, time.perf_counter() - self._started
+            )
+        finally:
+            with TreeRemover._running_lock:
+                TreeRemover._running.discard(self)
+
+    def _remove_entry(self, entry):
+        if entry.is_dir(follow_symlinks=False) and not _is_link(entry):
+            self._remove_tree(entry.path)
+        elif _is_link(entry):
+            # Directory links and junctions need rmdir on Windows
+            if not self._remove(os.unlink, entry.path, count_error=False):
+                self._remove(os.rmdir, entry.path)
+        else:
+            self._remove(os.unlink, entry.path)
+
+    def _remove_tree(self, path):
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError:
+            self._count(error=True)
+            return
+        for entry in entries:
+            self._remove_entry(entry)
+        self._remove(os.rmdir, path)
+
+    def _remove(self, func, path, count_error=True) -> bool:
+        try:
+            _writable_retry(func, path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            if count_error:
+                self._count(error=True)
+            return False
+        self._count()
+        return True
+
+    def _count(self, error=False):
+        now = time.perf_counter()
+        with self._lock:
+            if error:
+                self.errors += 1
+            else:
+                self.removed += 1
+            report = now - self._last_progress >= PROGRESS_INTERVAL
+            if report:
+                self._last_progress = now
+            removed = self.removed
+        if report:
+            self.progress_signal.emit(self._label, removed, now - self._started)
@@ -0,0 +1,304 @@
+"""
+File watching backends used by FileWatcherThread
+
+Both backends are plain Python (no Qt) and report changes through a
+callback ``callback(path, kind)`` where ``path`` is the absolute file path
+and ``kind`` is one of ``created``, ``modified`` or ``deleted``. Which paths
+are reported is decided by a core.ignore.PathMatcher.
+"""
+import os
+import errno
+import threading
+
+from core.ignore import PathMatcher
+from core.scanner import IncrementalScanner
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:  # pragma: no cover - optional at runtime
+    Observer = None
+    FileSystemEventHandler = object
+    HAS_WATCHDOG = False
+
+
+# errno values raised by inotify when the per-user watch/instance limit
+# (fs.inotify.max_user_watches / max_user_instances) is exhausted
+_WATCH_LIMIT_ERRNOS = (errno.ENOSPC, errno.EMFILE)
+
+
+def is_watch_limit_error(exc: BaseException) -> bool:
+    """Return True if an exception (or its cause) means the OS ran out of file watches"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, OSError) and exc.errno in _WATCH_LIMIT_ERRNOS:
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+# ============================================================
+# POLLING BACKEND
+# ============================================================
+class PollingBackend:
+    """Re-scan the tree every ``interval`` seconds with IncrementalScanner"""
+
+    name = "poll"
+
+    def __init__(self, root: str, callback, interval: float = 2.0, matcher=None):
+        self.root = root
+        self.callback = callback
+        self.interval = interval
+        self.matcher = matcher or PathMatcher(root)
+        self.scanner = IncrementalScanner(
+            root,
+            dir_filter=lambda path: not self.matcher.is_dir_ignored(path),
+            file_filter=self.matcher.is_file_watched
+        )
+        self._stop = threading.Event()
+
+    def start(self):
+        """Nothing to set up, the first pass primes the index"""
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stats(self):
+        """ScanStats of the last pass"""
+        return self.scanner.stats
+
+    def scan(self):
+        """Run a single polling pass"""
+        for path, kind in self.scanner.scan():
+            self.callback(path, kind)
+
+    def run(self):
+        """Poll until stop() is called or the root disappears"""
+        while not self._stop.is_set():
+            if not os.path.exists(self.root):
+                break
+            try:
+                self.scan()
+            except OSError:
+                pass
+            self._stop.wait(self.interval)
+
+
+# ============================================================
+# EVENT BACKEND (watchdog: inotify / FSEvents / ReadDirectoryChangesW)
+# ============================================================
+class _ChangeHandler(FileSystemEventHandler):
+    _KINDS = {
+        "created": "created",
+        "modified": "modified",
+        "deleted": "deleted",
+    }
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+
+    def on_any_event(self, event):
+        backend = self.backend
+
+        if event.event_type == "moved":
+            # A rename is a delete of the old name and a create of the new one
+            if not event.is_directory:
+                backend.dispatch(event.src_path, "deleted")
+                backend.dispatch(event.dest_path, "created")
+            else:
+                backend.directory_deleted(event.src_path)
+                backend.directory_created(event.dest_path)
+            return
+
+        if event.is_directory:
+            if event.event_type == "created":
+                backend.directory_created(event.src_path)
+            elif event.event_type == "deleted":
+                backend.directory_deleted(event.src_path)
+            return
+
+        kind = self._KINDS.get(event.event_type)
+        if kind:
+            backend.dispatch(event.src_path, kind)
+
+
+class EventBackend:
+    """
+    Push-based watcher built on watchdog
+
+    Watches are planned with the PathMatcher at every level: a directory
+    whose subtree holds no ignored directory gets one recursive watch, any
+    other directory a non-recursive watch plus the plan of each child that
+    is not ignored. ``node_modules`` and friends, at the root or inside a
+    workspace package, never consume OS watch descriptors.
+
+    If the OS runs out of watches after start (scheduling a new directory
+    fails, or an emitter thread dies), ``failure`` is set and run()
+    returns so the caller can switch to polling.
+    """
+
+    name = "events"
+    HEALTH_INTERVAL = 1.0  # Seconds between emitter liveness checks
+
+    def __init__(self, root: str, callback, matcher=None):
+        if not HAS_WATCHDOG:
+            raise RuntimeError("watchdog is not installed")
+        self.root = root
+        self.callback = callback
+        self.matcher = matcher or PathMatcher(root)
+        self.observer = None
+        self.handler = _ChangeHandler(self)
+        self.failure = None
+        self._watches = {}  # path -> (ObservedWatch, recursive)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def plan(self, path: str):
+        """
+        Watches that cover ``path`` without entering ignored directories
+
+        Returns:
+            tuple: ``([(directory, recursive), ...], clean)``; ``clean``
+            means no ignored directory lies below ``path``
+        """
+        try:
+            with os.scandir(path) as entries:
+                children = [e.path for e in entries if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return [(path, True)], True
+        watches = []
+        clean = True
+        for child in children:
+            if self.matcher.is_dir_ignored(child):
+                clean = False
+                continue
+            child_watches, child_clean = self.plan(child)
+            watches.extend(child_watches)
+            clean = clean and child_clean
+        if clean:
+            return [(path, True)], True
+        return [(path, False)] + watches, False
+
+    def start(self):
+        """
+        Schedule watches and start the observer
+
+        Raises:
+            OSError: If the OS refuses to add watches (e.g. inotify limit)
+        """
+        self.observer = Observer()
+        for path, recursive in self.plan(self.root)[0]:
+            self._schedule(path, recursive)
+
+        try:
+            self.observer.start()
+        except Exception:
+            self._shutdown_observer()
+            raise
+
+    def _schedule(self, path: str, recursive: bool):
+        with self._lock:
+            if path in self._watches:
+                return
+        watch = self.observer.schedule(self.handler, path, recursive=recursive)
+        with self._lock:
+            self._watches[path] = (watch, recursive)
+
+    def _unschedule(self, path: str):
+        with self._lock:
+            entry = self._watches.pop(path, None)
+        if entry is None:
+            return
+        try:
+            self.observer.unschedule(entry[0])
+        except (KeyError, OSError):
+            pass
+
+    def _recursive_owner(self, path: str):
+        """Ancestor of ``path`` whose recursive watch already covers it"""
+        current = os.path.dirname(path)
+        while len(current) >= len(self.root):
+            with self._lock:
+                entry = self._watches.get(current)
+            if entry and entry[1]:
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+        return None
+
+    def directory_created(self, path: str):
+        """Watch a new directory, or split a recursive watch around a new ignored one"""
+        owner = self._recursive_owner(path)
+        try:
+            if self.matcher.is_dir_ignored(path):
+                if owner is not None:
+                    # e.g. npm install in a package: stop watching its node_modules
+                    new_watches = self.plan(owner)[0]
+                    self._unschedule(owner)
+                    for watch_path, recursive in new_watches:
+                        self._schedule(watch_path, recursive)
+                return
+            if owner is not None:
+                return  # covered by the recursive watch of an ancestor
+            with self._lock:
+                parent_watched = os.path.dirname(path) in self._watches
+            if parent_watched:
+                for watch_path, recursive in self.plan(path)[0]:
+                    self._schedule(watch_path, recursive)
+        except OSError as e:
+            self._fail(e)
+
+    def directory_deleted(self, path: str):
+        """Forget the watches of a removed directory so it can be watched again"""
+        with self._lock:
+            gone = [p for p in self._watches if p == path or p.startswith(path + os.sep)]
+        for watch_path in gone:
+            self._unschedule(watch_path)
+
+    def dispatch(self, path: str, kind: str):
+        if not self.matcher.is_file_watched(path):
+            return
+        self.callback(path, kind)
+
+    def _fail(self, exc: BaseException):
+        """Give up on OS events; run() returns and the caller decides what next"""
+        if self.failure is None:
+            self.failure = exc
+        self._stop.set()
+
+    def _emitter_died(self) -> bool:
+        """An emitter stopped although its directory still exists (add_watch failed)"""
+        try:
+            emitters = list(self.observer.emitters)
+        except RuntimeError:
+            return False
+        return any(
+            not emitter.is_alive() and os.path.isdir(emitter.watch.path)
+            for emitter in emitters
+        )
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """Block until stop() or a failure, events arrive on watchdog threads"""
+        while not self._stop.wait(self.HEALTH_INTERVAL):
+            if self._emitter_died():
+                self._fail(OSError(errno.ENOSPC, "an event watcher thread stopped"))
+        self._shutdown_observer()
+
+    def _shutdown_observer(self):
+        if self.observer is None:
+            return
+        try:
+            self.observer.stop()
+            if self.observer.is_alive():
+                self.observer.join(timeout=2)
+        except RuntimeError:
+            pass
@@ -0,0 +1,210 @@
+"""
+Process-wide hub that shares file watchers between terminal tabs
+
+Tabs subscribe to a project root instead of owning a FileWatcherThread.
+The hub keeps one watcher per distinct tree and set of options: a root
+that lies inside an existing watch with the same options reuses it, and a
+root that contains such watches replaces them with one watcher at the
+outer root. Subscriptions with different options (include/exclude globs,
+mode, content verification) always get a watcher of their own.
+
+Replacing nested watches is gapless: the old watchers keep serving their
+subscribers until the outer watcher is running, then hand them over and
+flush whatever changes they still had buffered. Change-sets are fanned
+out to subscribers filtered by their subtree, and a watcher is stopped
+when its last subscription is released.
+"""
+import os
+from PyQt6.QtCore import QObject
+
+from core.coalescer import ChangeSet
+from core.watcher import FileWatcherThread
+
+
+def _key(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _is_under(path_key, root_key):
+    return path_key == root_key or path_key.startswith(root_key.rstrip(os.sep) + os.sep)
+
+
+class WatchSubscription:
+    """Handle returned by WatchHub.subscribe()"""
+
+    def __init__(self, root, on_changes, on_mode=None, options=None):
+        self.root = os.path.normpath(root)
+        self.key = _key(root)
+        self.on_changes = on_changes
+        self.on_mode = on_mode
+        self.options = options or {}
+        self.prefix = ""
+        self.watch = None
+
+
+class _Watch:
+    """One FileWatcherThread plus its subscribers"""
+
+    def __init__(self, root, options):
+        self.root = os.path.normpath(root)
+        self.key = _key(root)
+        self.options = options
+        self.subscribers = []
+        self.thread = None
+        # Nested watches to stop once this one is running
+        self.replaces = []
+
+
+class WatchHub(QObject):
+    """Deduplicates watches by root and options, reference-counts subscriptions"""
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = WatchHub()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watches = []
+        # Stopped threads are kept alive until they actually finish
+        self._stopping = set()
+
+    def subscribe(self, path, on_changes, on_mode=None, **options):
+        """
+        Subscribe to changes under ``path``
+
+        Args:
+            path: Directory to watch
+            on_changes: Called with a ChangeSet relative to ``path``
+            on_mode: Called with the active backend name ("events"/"poll")
+            **options: FileWatcherThread options; only watches started with
+                the same options are shared
+
+        Returns:
+            WatchSubscription: Pass to unsubscribe() to release the watch
+        """
+        subscription = WatchSubscription(path, on_changes, on_mode, options)
+
+        for watch in self.watches:
+            if watch.options == options and _is_under(subscription.key, watch.key):
+                self._attach(watch, subscription)
+                return subscription
+
+        # New outer root: nested watches with the same options are replaced
+        # once the new watcher runs (see _hand_over)
+        watch = _Watch(path, options)
+        watch.replaces = [
+            w for w in self.watches
+            if w.options == options and _is_under(w.key, subscription.key)
+        ]
+        self.watches.append(watch)
+        self._start_watch(watch)
+        self._attach(watch, subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Release a subscription, stopping the watch if it was the last one"""
+        watch = subscription.watch
+        if watch is None:
+            return
+        subscription.watch = None
+        if subscription in watch.subscribers:
+            watch.subscribers.remove(subscription)
+        if not watch.subscribers:
+            self._stop_watch(watch)
+
+    def shutdown(self, timeout_ms=2000):
+        """Stop every watcher and wait for the threads (application exit)"""
+        for watch in list(self.watches):
+            for subscription in watch.subscribers:
+                subscription.watch = None
+            watch.subscribers = []
+            self._stop_watch(watch)
+        for thread in list(self._stopping):
+            thread.wait(timeout_ms)
+
+    def _attach(self, watch, subscription):
+        subscription.watch = watch
+        rel = os.path.relpath(subscription.root, watch.root)
+        subscription.prefix = "" if rel == os.curdir else rel.replace(os.sep, "/") + "/"
+        watch.subscribers.append(subscription)
+
+        active_mode = watch.thread.active_mode if watch.thread else None
+        if active_mode and subscription.on_mode:
+            subscription.on_mode(active_mode)
+
+    def _start_watch(self, watch):
+        thread = FileWatcherThread(watch.root, **watch.options)
+        thread.changes_ready.connect(lambda change_set: self._dispatch(watch, change_set))
+        thread.mode_changed.connect(lambda mode: self._mode_changed(watch, mode))
+        watch.thread = thread
+        thread.start()
+
+    def _hand_over(self, watch):
+        """Move the subscribers of replaced nested watches to ``watch``"""
+        replaced, watch.replaces = watch.replaces, []
+        for old in replaced:
+            if old not in self.watches:
+                continue  # released in the meantime
+            # Deliver what the old watcher buffered before it goes away
+            if old.thread:
+                old.thread.flush_pending()
+            moved = old.subscribers
+            old.subscribers = []
+            self._stop_watch(old)
+            for subscription in moved:
+                self._attach(watch, subscription)
+
+    def _stop_watch(self, watch):
+        watch.replaces = []
+        if watch in self.watches:
+            self.watches.remove(watch)
+        thread = watch.thread
+        if thread:
+            watch.thread = None
+            self._stopping.add(thread)
+            thread.finished.connect(lambda: self._stopping.discard(thread))
+            thread.stop()
+
+    def _mode_changed(self, watch, mode):
+        for subscription in list(watch.subscribers):
+            if subscription.on_mode:
+                subscription.on_mode(mode)
+        if watch.replaces and watch in self.watches:
+            if mode.startswith("failed"):
+                watch.replaces = []  # the nested watchers keep running
+            else:
+                self._hand_over(watch)
+
+    def _dispatch(self, watch, change_set):
+        """Fan a change-set out to subscribers, filtered by subtree"""
+        if watch not in self.watches:
+            return  # late signal from a stopped watcher
+
+        storm_threshold = watch.thread.coalescer.storm_threshold if watch.thread else 0
+        for subscription in list(watch.subscribers):
+            prefix = subscription.prefix
+            if not prefix:
+                subscription.on_changes(change_set)
+                continue
+
+            cut = len(prefix)
+            changes = {
+                rel[cut:]: kind
+                for rel, kind in change_set.changes.items()
+                if rel.startswith(prefix)
+            }
+            if not changes:
+                continue
+            subscription.on_changes(ChangeSet(
+                subscription.root,
+                changes,
+                events=change_set.events,
+                unchanged=change_set.unchanged,
+                storm=len(changes) > storm_threshold,
+                first_event=change_set.first_event,
+                last_event=change_set.last_event
+            ))
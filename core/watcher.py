@@ -1,43 +1,170 @@
 import os
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from core.coalescer import ChangeCoalescer
+from core.content_verifier import ContentVerifier
+from core.ignore import DEFAULT_INCLUDE, PathMatcher
+from core.watch_backends import (
+    HAS_WATCHDOG, EventBackend, PollingBackend, is_watch_limit_error
+)
+
+
+WATCH_MODES = ("auto", "events", "poll")
+
 
 class FileWatcherThread(QThread):
-    file_changed = pyqtSignal(str)
+    """
+    Watch a project tree and emit ``changes_ready`` with coalesced ChangeSets
+
+    Modes:
+        auto   - OS events when available; polling if they are unavailable
+                 or the OS watch limit is hit, at start or later
+        events - OS events only; if they fail, ``mode_changed`` emits
+                 ``"failed: <reason>"`` and the watcher stops
+        poll   - periodic tree scan every ``interval_ms``
+
+    ``include``/``exclude`` are globs merged with the project's .gitignore
+    files into one PathMatcher, built on the watcher thread. With
+    ``verify_content`` modified files whose bytes did not change are dropped
+    before the change-set is emitted; existing files are fingerprinted
+    before watching starts.
+    """
+    changes_ready = pyqtSignal(object)
+    mode_changed = pyqtSignal(str)
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, mode: str = "auto", interval_ms: int = 2000,
+                 quiet_ms: int = 300, storm_threshold: int = 200,
+                 include=None, exclude=(), use_gitignore: bool = True,
+                 verify_content: bool = False):
         super().__init__()
         self.path = path
+        self.mode = mode if mode in WATCH_MODES else "auto"
+        self.interval_ms = interval_ms
+        self.include = include or DEFAULT_INCLUDE
+        self.exclude = exclude
+        self.use_gitignore = use_gitignore
+        self.matcher = None
         self.running = True
-        self.last_modified = {}
+        self.backend = None
+        self.active_mode = None
+        self.verifier = ContentVerifier(path) if verify_content else None
+        self.coalescer = ChangeCoalescer(
+            path,
+            self._emit_changes,
+            quiet_ms=quiet_ms,
+            storm_threshold=storm_threshold
+        )
 
     def stop(self):
         self.running = False
+        if self.backend:
+            self.backend.stop()
+        self.coalescer.stop()
+
+    def flush_pending(self):
+        """Emit buffered changes now instead of after the quiet period"""
+        change_set = self.coalescer.flush()
+        if change_set is not None:
+            self._emit_changes(change_set)
+
+    def _on_change(self, path, kind):
+        self.coalescer.add(path, kind)
+
+    def _emit_changes(self, change_set):
+        """Runs on the coalescer thread, so hashing never blocks the UI"""
+        if self.verifier:
+            self.verifier.filter(change_set)
+            if not change_set.changes:
+                return
+        self.changes_ready.emit(change_set)
+
+    def _start_event_backend(self):
+        """
+        Try to start the watchdog backend
+
+        Returns:
+            tuple: ``(backend, None)``, or ``(None, reason)`` on failure
+        """
+        if not HAS_WATCHDOG:
+            return None, "watchdog is not installed"
+        backend = EventBackend(self.path, self._on_change, self.matcher)
+        try:
+            backend.start()
+        except Exception as e:
+            if is_watch_limit_error(e):
+                return None, f"OS watch limit reached: {e}"
+            return None, f"event watcher unavailable: {e}"
+        return backend, None
+
+    def _use_backend(self, backend):
+        self.backend = backend
+        self.active_mode = backend.name
+        self.mode_changed.emit(backend.name)
+        # stop() may have been called before the backend existed
+        if not self.running:
+            backend.stop()
+
+    def _watched_files(self):
+        """Yield every watched file, pruning ignored directories"""
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            dirnames[:] = [
+                d for d in dirnames
+                if not self.matcher.is_dir_ignored(os.path.join(dirpath, d))
+            ]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if self.matcher.is_file_watched(path):
+                    yield path
+
+    def _polling_backend(self):
+        return PollingBackend(self.path, self._on_change, self.interval_ms / 1000, self.matcher)
 
     def run(self):
-        while self.running:
-            try:
-                if not self.path or not os.path.exists(self.path):
-                    break
-
-                for root, dirs, files in os.walk(self.path):
-                    dirs[:] = [
-                        d for d in dirs
-                        if d not in ['node_modules', '.git', 'dist', 'build']
-                    ]
-
-                    for file in files:
-                        if file.endswith(('.js', '.ts', '.jsx', '.tsx', '.json')):
-                            filepath = os.path.join(root, file)
-                            try:
-                                mtime = os.path.getmtime(filepath)
-                                if filepath in self.last_modified:
-                                    if mtime > self.last_modified[filepath]:
-                                        self.file_changed.emit(file)
-                                self.last_modified[filepath] = mtime
-                            except:
-                                pass
-            except:
-                pass
-
-            self.msleep(2000)
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        self.matcher = PathMatcher(
+            self.path, self.include, self.exclude, self.use_gitignore
+        )
+
+        # Before any backend runs: a file edited while priming must still
+        # count as changed when its event arrives
+        if self.verifier:
+            self.verifier.prime(self._watched_files())
+
+        backend = None
+        if self.mode != "poll":
+            backend, reason = self._start_event_backend()
+            if backend is None:
+                if self.mode == "events":
+                    print(f"File watching failed: {reason}")
+                    self.mode_changed.emit(f"failed: {reason}")
+                    return
+                print(f"{reason}, falling back to polling")
+        if backend is None:
+            backend = self._polling_backend()
+
+        flusher = threading.Thread(
+            target=self.coalescer.run, name="watch-coalescer", daemon=True
+        )
+        flusher.start()
+
+        self._use_backend(backend)
+        backend.run()
+
+        # The event backend gave up at runtime (e.g. ENOSPC on a new directory)
+        failure = getattr(backend, "failure", None)
+        if failure is not None and self.running:
+            if self.mode == "events":
+                print(f"File watching failed: {failure}")
+                self.active_mode = None
+                self.mode_changed.emit(f"failed: {failure}")
+            else:
+                print(f"Event watcher stopped ({failure}), falling back to polling")
+                backend = self._polling_backend()
+                self._use_backend(backend)
+                backend.run()
+
+        self.coalescer.stop()
+        flusher.join(timeout=1)
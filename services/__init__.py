@@ -5,5 +5,14 @@ Services package
 from .package_manager import PackageManagerService
 from .file_service import FileService
 from .settings_service import SettingsService
+from .project_config_service import ProjectConfigService
+from .script_exec_service import ScriptExecService
+from .task_graph_service import TaskGraphService
+from .workspace_service import WorkspaceService
+from .install_state_service import InstallStateService
+from .install_service import InstallService
+from .manifest_service import ManifestService
 
-__all__ = ['PackageManagerService', 'FileService', 'SettingsService']
\ No newline at end of file
+__all__ = ['PackageManagerService', 'FileService', 'SettingsService', 'ProjectConfigService', 'ScriptExecService',
+           'TaskGraphService', 'WorkspaceService', 'InstallStateService',
+           'InstallService', 'ManifestService']
\ No newline at end of file
@@ -2,8 +2,9 @@
 File service for project operations
 """
 import os
-import json
-import subprocess
+
+from core.tree_remover import TreeRemover
+from services.manifest_service import ManifestService
 
 
 class FileService:
@@ -48,30 +49,42 @@ class FileService:
         Returns:
             dict: Scripts from package.json
         """
-        package_json = os.path.join(project_path, "package.json")
-        
-        try:
-            with open(package_json, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("scripts", {})
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        manifest = ManifestService.load(project_path)
+        return manifest.scripts if manifest else {}
     
     @staticmethod
     def remove_node_modules(project_path):
         """
-        Remove node_modules directory
+        Move node_modules aside so a fresh install can start at once
+        
+        The returned trash directory still has to be deleted, see
+        core.tree_remover.TreeRemover.
         
         Args:
             project_path: Path to project directory
+            
+        Returns:
+            str or None: Trash path, None if there was no node_modules or
+            it could not be moved
         """
         node_modules = os.path.join(project_path, "node_modules")
         
-        if os.path.exists(node_modules):
-            try:
-                subprocess.call(f'rmdir /S /Q "{node_modules}"', shell=True)
-            except Exception as e:
-                print(f"Error removing node_modules: {e}")
+        if not os.path.exists(node_modules):
+            return None
+        return TreeRemover.move_aside(node_modules)
+    
+    @staticmethod
+    def find_trash(project_path):
+        """
+        Trash left by an earlier Reinstall that was not fully deleted
+        
+        Args:
+            project_path: Path to project directory
+            
+        Returns:
+            list: Trash directory paths
+        """
+        return TreeRemover.find_trash(project_path)
     
     @staticmethod
     def load_package_info(project_path):
@@ -84,10 +97,5 @@ class FileService:
         Returns:
             dict: Package metadata or empty dict
         """
-        package_json = os.path.join(project_path, "package.json")
-        
-        try:
-            with open(package_json, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
\ No newline at end of file
+        manifest = ManifestService.load(project_path)
+        return dict(manifest.data) if manifest else {}
\ No newline at end of file
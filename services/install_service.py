@@ -0,0 +1,441 @@
+"""
+Dependency installs: strategy selection, phase timings and history
+
+``plan()`` picks the install command for the project's state:
+
+    no lockfile, or package.json changed after it    plain install
+    npm, lockfile in sync, no node_modules           npm ci
+    npm, lockfile in sync, node_modules present      npm install (ci would wipe it)
+    pnpm / Yarn / Bun, lockfile in sync              frozen lockfile install
+
+``--prefer-offline`` is added when the package manager's cache already
+has content. A ``packageManager`` field pins the manager; a pinned
+version runs through corepack when it is installed. If a frozen install
+fails because the lockfile is out of date, the plan's plain fallback is
+run instead.
+
+InstallTracker splits the run time into resolve, fetch and link phases.
+npm runs with ``--timing`` and reports them exactly. Yarn and Bun print
+step markers, and pnpm prints progress lines, which time the phases to
+within an output batch. Every install is appended to a per-project
+history, so regressions show up against earlier installs with the same
+strategy.
+"""
+import os
+import re
+import json
+import time
+import shutil
+import statistics
+from dataclasses import dataclass, field
+
+from core.constants import INSTALL_HISTORY_FILE
+from core.utils import format_duration
+from services.package_manager import PackageManagerService
+
+
+HISTORY_LIMIT = 50
+PHASES = ("resolve", "fetch", "link")
+
+# Dependency fields npm copies into the root entry of package-lock.json
+NPM_LOCK_FIELDS = ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies")
+
+# Failures of a frozen install that a plain install fixes
+OUT_OF_SYNC = re.compile(
+    r"can only install packages when your package\.json and (?:package-lock|npm-shrinkwrap)"
+    r"|ERR_PNPM_OUTDATED_LOCKFILE|ERR_PNPM_LOCKFILE_CONFIG_MISMATCH"
+    r"|Your lockfile needs to be updated|YN0028"
+    r"|lockfile had changes, but lockfile is frozen",
+    re.IGNORECASE
+)
+
+_NPM_TIMING = re.compile(r"^npm timing (\S+) Completed in (\d+)ms")
+_NPM_TIMERS = {"reify:loadTrees": "resolve", "reify:unpack": "fetch", "reify:build": "link"}
+_NPM_COUNTS = re.compile(r"\b(added|removed|changed) (\d+) packages?")
+_YARN_STEP = re.compile(r"^\[\d+/\d+\]\s*\S*\s*(Resolving|Fetching|Linking|Building)")
+_YARN_BERRY_STEP = re.compile(r"┌ (Resolution|Fetch|Link) step")
+_PNPM_PROGRESS = re.compile(
+    r"Progress: resolved (\d+), reused (\d+), downloaded (\d+), added (\d+)(, done)?"
+)
+_PNPM_PACKAGES = re.compile(r"^Packages: [+-]\d|Lockfile is up to date, resolution step is skipped")
+_BUN_EXTRACTED = re.compile(r"Resolved, downloaded and extracted \[(\d+)\]")
+_BUN_INSTALLED = re.compile(r"^(\d+) packages? installed")
+_STEP_PHASES = {
+    "Resolving": "resolve", "Resolution": "resolve",
+    "Fetching": "fetch", "Fetch": "fetch",
+    "Linking": "link", "Link": "link", "Building": "link",
+}
+
+
+@dataclass
+class InstallPlan:
+    """How to install a project's dependencies"""
+    manager: str
+    command: str
+    strategy: str  # "ci", "frozen", "incremental" or "install"
+    reasons: list = field(default_factory=list)
+    fallback: str = None  # Plain install if the lockfile turns out to be stale
+    lockfile: str = None
+
+
+class InstallTracker:
+    """
+    Phase times and package counts from an install's output
+
+    Args:
+        manager: Package manager running the install
+        started: ``time.monotonic()`` at launch
+    """
+
+    def __init__(self, manager, started=None):
+        self.manager = manager
+        self.started = started if started is not None else time.monotonic()
+        self.marks = [("resolve", self.started)]
+        self.exact = {}
+        self.counts = {}
+        self.out_of_sync = False
+
+    def _mark(self, phase, now):
+        if self.marks[-1][0] != phase:
+            self.marks.append((phase, now))
+
+    def feed(self, text, now=None) -> bool:
+        """
+        Read one output line
+
+        Returns:
+            bool: True for bookkeeping lines not worth showing (npm timers)
+        """
+        now = time.monotonic() if now is None else now
+        text = text.strip()
+        if OUT_OF_SYNC.search(text):
+            self.out_of_sync = True
+
+        if self.manager == "npm":
+            match = _NPM_TIMING.match(text)
+            if match:
+                phase = _NPM_TIMERS.get(match.group(1))
+                if phase:
+                    self.exact[phase] = self.exact.get(phase, 0.0) + int(match.group(2)) / 1000
+                return True
+            for kind, count in _NPM_COUNTS.findall(text):
+                self.counts[kind] = int(count)
+        elif self.manager == "pnpm":
+            match = _PNPM_PROGRESS.search(text)
+            if match:
+                resolved, reused, downloaded, added, done = match.groups()
+                self.counts.update(
+                    resolved=int(resolved), reused=int(reused),
+                    downloaded=int(downloaded), added=int(added)
+                )
+                if done:
+                    self._mark("link", now)
+            elif _PNPM_PACKAGES.search(text):
+                self._mark("fetch", now)
+        elif self.manager == "yarn":
+            match = _YARN_STEP.match(text) or _YARN_BERRY_STEP.search(text)
+            if match:
+                self._mark(_STEP_PHASES[match.group(1)], now)
+        elif self.manager == "bun":
+            match = _BUN_EXTRACTED.search(text)
+            if match:
+                self.counts["downloaded"] = int(match.group(1))
+                self._mark("link", now)
+            match = _BUN_INSTALLED.match(text)
+            if match:
+                self.counts["added"] = int(match.group(1))
+        return False
+
+    def finish(self, now=None) -> dict:
+        """
+        Phase times once the process has exited
+
+        Returns:
+            dict: ``total`` seconds, ``phases`` (seconds per phase, only
+            those that were seen) and ``counts``
+        """
+        now = time.monotonic() if now is None else now
+        if self.exact:
+            phases = dict(self.exact)
+        else:
+            phases = {}
+            ends = [start for _, start in self.marks[1:]] + [now]
+            for (phase, start), end in zip(self.marks, ends):
+                phases[phase] = phases.get(phase, 0.0) + end - start
+            if len(self.marks) == 1:
+                phases = {}  # No markers: the split is unknown
+        return {"total": now - self.started, "phases": phases, "counts": dict(self.counts)}
+
+
+def _non_empty_dir(path):
+    try:
+        with os.scandir(path) as entries:
+            return next(entries, None) is not None
+    except OSError:
+        return False
+
+
+class InstallService:
+    """Choose install commands and keep a history of install timings"""
+
+    @staticmethod
+    def lockfile_in_sync(project_path, lockfile):
+        """
+        Whether the lockfile still matches package.json
+
+        package-lock.json v2+ records the dependency ranges of each
+        workspace, which are compared exactly. Other lockfiles count as in
+        sync unless package.json was modified after them; a wrong guess
+        only costs the plain-install fallback.
+
+        Returns:
+            bool: True if a frozen install should succeed
+        """
+        package_json = os.path.join(project_path, "package.json")
+        if PackageManagerService.LOCK_FILES.get(os.path.basename(lockfile)) == "npm":
+            try:
+                with open(lockfile, "r", encoding="utf-8") as f:
+                    packages = json.load(f).get("packages")
+                with open(package_json, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError, AttributeError):
+                return False
+            if isinstance(packages, dict) and isinstance(manifest, dict):
+                key = os.path.relpath(project_path, os.path.dirname(lockfile)).replace(os.sep, "/")
+                entry = packages.get("" if key == "." else key)
+                if not isinstance(entry, dict):
+                    return False
+                return all(
+                    (manifest.get(name) or {}) == (entry.get(name) or {}) for name in NPM_LOCK_FIELDS
+                )
+        try:
+            return os.path.getmtime(package_json) <= os.path.getmtime(lockfile) + 1
+        except OSError:
+            return False
+
+    @staticmethod
+    def cache_dirs(manager):
+        """Where the package manager keeps downloaded packages"""
+        home = os.path.expanduser("~")
+        local = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+        data = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+        cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+        if manager == "npm":
+            root = os.environ.get("npm_config_cache") or (
+                os.path.join(local, "npm-cache") if os.name == "nt" else os.path.join(home, ".npm")
+            )
+            return [os.path.join(root, "_cacache")]
+        if manager == "pnpm":
+            return [
+                path for path in (
+                    os.environ.get("PNPM_STORE_DIR"),
+                    os.path.join(data, "pnpm", "store"),
+                    os.path.join(local, "pnpm", "store"),
+                    os.path.join(home, "Library", "pnpm", "store"),
+                ) if path
+            ]
+        if manager == "yarn":
+            return [
+                path for path in (
+                    os.environ.get("YARN_CACHE_FOLDER"),
+                    os.path.join(cache, "yarn"),
+                    os.path.join(local, "Yarn", "Cache"),
+                    os.path.join(home, "Library", "Caches", "Yarn"),
+                ) if path
+            ]
+        return []
+
+    @staticmethod
+    def is_yarn_berry(lockfile, version=None):
+        """Yarn 2+ (``--immutable``) rather than Yarn classic"""
+        if version:
+            return not version.startswith("1.")
+        if lockfile is None:
+            return False
+        if os.path.exists(os.path.join(os.path.dirname(lockfile), ".yarnrc.yml")):
+            return True
+        try:
+            with open(lockfile, "r", encoding="utf-8") as f:
+                return "__metadata:" in f.read(4096)
+        except OSError:
+            return False
+
+    @staticmethod
+    def plan(project_path, manager, version=None, strategy="auto"):
+        """
+        Pick the install command
+
+        Args:
+            project_path: Path to project directory
+            manager: Detected package manager
+            version: Version pinned by the packageManager field, if any
+            strategy: "auto", or "plain" for the bare install command
+
+        Returns:
+            InstallPlan: Command, strategy and the reasons for it
+        """
+        if strategy == "plain":
+            return InstallPlan(
+                manager, PackageManagerService.MANAGERS[manager]["install"], "install",
+                ["install_strategy is plain"]
+            )
+
+        lockfile = PackageManagerService.find_lockfile(project_path, manager)
+        berry = manager == "yarn" and InstallService.is_yarn_berry(lockfile, version)
+        reasons = []
+        if version:
+            reasons.append(f"packageManager pins {manager}@{version}")
+
+        if lockfile is None:
+            kind = "install"
+            reasons.append("no lockfile")
+        elif not InstallService.lockfile_in_sync(project_path, lockfile):
+            kind = "install"
+            reasons.append("package.json changed after the lockfile")
+        elif manager == "npm" and os.path.isdir(os.path.join(project_path, "node_modules")):
+            kind = "incremental"
+            reasons.append("lockfile in sync, node_modules present (npm ci would delete it)")
+        else:
+            kind = "ci" if manager == "npm" else "frozen"
+            reasons.append("lockfile in sync")
+
+        offline = not berry and manager != "bun" and any(
+            _non_empty_dir(path) for path in InstallService.cache_dirs(manager)
+        )
+        if offline:
+            reasons.append("package cache is warm")
+
+        def command(frozen):
+            if manager == "npm":
+                parts = ["npm", "ci" if kind == "ci" and frozen else "install",
+                         "--no-audit", "--no-fund", "--timing"]
+            elif manager == "yarn":
+                parts = ["yarn", "install"]
+                if berry:
+                    parts.append("--immutable" if frozen else "--no-immutable")
+                elif frozen:
+                    parts.append("--frozen-lockfile")
+            elif manager == "pnpm":
+                parts = ["pnpm", "install", "--frozen-lockfile" if frozen else "--no-frozen-lockfile"]
+            else:
+                parts = ["bun", "install"] + (["--frozen-lockfile"] if frozen else [])
+            if offline:
+                parts.append("--prefer-offline")
+            if version and manager != "npm" and shutil.which("corepack"):
+                parts.insert(0, "corepack")
+            return " ".join(parts)
+
+        frozen = kind in ("ci", "frozen")
+        return InstallPlan(
+            manager=manager,
+            command=command(frozen),
+            strategy=kind,
+            reasons=reasons,
+            fallback=command(False) if frozen else None,
+            lockfile=lockfile,
+        )
+
+    # ==================== History ====================
+
+    @staticmethod
+    def load_history(project_path=None):
+        """
+        Recorded installs
+
+        Args:
+            project_path: Only this project's installs (oldest first)
+
+        Returns:
+            dict or list: Every project's installs, or one project's
+        """
+        try:
+            with open(INSTALL_HISTORY_FILE, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            history = {}
+        if not isinstance(history, dict):
+            history = {}
+        if project_path is None:
+            return history
+        return history.get(os.path.normpath(project_path), [])
+
+    @staticmethod
+    def record(project_path, plan, exit_code, timings):
+        """
+        Append an install to the project's history
+
+        Args:
+            project_path: Path to project directory
+            plan: InstallPlan that was run
+            exit_code: Process exit code
+            timings: ``InstallTracker.finish()``
+
+        Returns:
+            dict: The recorded entry
+        """
+        entry = {
+            "time": time.time(),
+            "manager": plan.manager,
+            "strategy": plan.strategy,
+            "command": plan.command,
+            "exit_code": exit_code,
+            "total": round(timings["total"], 3),
+            "phases": {name: round(seconds, 3) for name, seconds in timings["phases"].items()},
+            "counts": timings["counts"],
+        }
+        history = InstallService.load_history()
+        key = os.path.normpath(project_path)
+        history[key] = (history.get(key, []) + [entry])[-HISTORY_LIMIT:]
+        try:
+            with open(INSTALL_HISTORY_FILE, "w", encoding="utf-8") as f:
+                json.dump(history, f)
+        except OSError as e:
+            print(f"Error saving install history: {e}")
+        return entry
+
+    @staticmethod
+    def regression(history, entry, window=10):
+        """
+        Compare an install with earlier successful ones of the same strategy
+
+        Args:
+            history: The project's installs, ``entry`` last
+            entry: The install to judge
+            window: How many earlier installs to compare with
+
+        Returns:
+            str or None: Description if it was much slower than their median
+        """
+        earlier = [
+            item for item in history[:-1]
+            if item.get("strategy") == entry["strategy"] and item.get("exit_code") == 0
+        ][-window:]
+        if len(earlier) < 3 or entry["exit_code"] != 0:
+            return None
+        median = statistics.median(item["total"] for item in earlier)
+        if entry["total"] <= max(median * 1.5, median + 2):
+            return None
+        slowest = None
+        for phase in PHASES:
+            times = [item["phases"][phase] for item in earlier if phase in item.get("phases", {})]
+            if phase in entry["phases"] and times:
+                growth = entry["phases"][phase] - statistics.median(times)
+                if slowest is None or growth > slowest[1]:
+                    slowest = (phase, growth)
+        detail = ""
+        if slowest and slowest[1] > 0:
+            detail = f", mostly {slowest[0]} (+{format_duration(slowest[1])})"
+        return (
+            f"{entry['total'] / median:.1f}× the median of the last {len(earlier)} "
+            f"{entry['strategy']} installs ({format_duration(median)}){detail}"
+        )
+
+    @staticmethod
+    def describe(entry):
+        """One-line summary: phases and package counts"""
+        phases = ", ".join(
+            f"{name} {format_duration(entry['phases'][name])}"
+            for name in PHASES if name in entry["phases"]
+        )
+        counts = ", ".join(f"{count} {kind}" for kind, count in entry["counts"].items())
+        return "; ".join(part for part in (phases, counts) if part)
@@ -0,0 +1,277 @@
+"""
+Install freshness: is node_modules up to date with the lockfile?
+
+After a successful install the app writes a fingerprint to
+``node_modules/.autorunner-install.json``: a hash of the lockfile bytes,
+a hash of the dependency fields of package.json, and the resolved
+version of every top-level package from the lockfile. Checking a project
+re-hashes the two inputs (a few ms even for large lockfiles) and never
+walks node_modules. The lockfile is only parsed when the fingerprint
+differs, to report which packages changed.
+
+Installs made outside the app leave no fingerprint; the package
+manager's own marker in node_modules (``.package-lock.json``,
+``.modules.yaml``, ``.yarn-state.yml``, ...) is then compared with the
+lockfile by mtime.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+
+from services.manifest_service import ManifestService
+from services.package_manager import PackageManagerService
+
+
+STATE_FILE = ".autorunner-install.json"
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "optionalDependencies",
+                     "peerDependencies", "overrides", "resolutions")
+INSTALL_MARKERS = (".package-lock.json", ".modules.yaml", ".yarn-state.yml", ".yarn-integrity")
+
+_YARN_HEADER = re.compile(r'^"?((?:@[^@/"]+/)?[^@"]+)@')
+_YARN_VERSION = re.compile(r'^\s+version:?\s+"?([^"\s]+)"?')
+_PNPM_KEY = re.compile(r"^  (?=\S)'?/?((?:@[^/@]+/)?[^/@(]+)[@/]([^(:'/]+)")
+
+
+class InstallStateService:
+    """Fingerprint installs and compare them with the current lockfile"""
+
+    @staticmethod
+    def declared_dependencies(project_path):
+        """Dependency fields of package.json"""
+        manifest = ManifestService.load(project_path)
+        if manifest is None:
+            return {}
+        data = manifest.data
+        declared = {key: data[key] for key in DEPENDENCY_FIELDS if key in data}
+        if isinstance(data.get("pnpm"), dict) and "overrides" in data["pnpm"]:
+            declared["pnpm.overrides"] = data["pnpm"]["overrides"]
+        return declared
+
+    @staticmethod
+    def fingerprint(project_path):
+        """
+        Current fingerprint of the install inputs
+
+        Returns:
+            dict: ``lockfile`` (path relative to the project, or None),
+            ``lock_hash`` and ``deps_hash``
+        """
+        lockfile = PackageManagerService.find_lockfile(project_path)
+        lock_hash = None
+        if lockfile:
+            digest = hashlib.blake2b(digest_size=16)
+            try:
+                with open(lockfile, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+                lock_hash = digest.hexdigest()
+            except OSError:
+                pass
+        declared = InstallStateService.declared_dependencies(project_path)
+        deps_hash = hashlib.blake2b(
+            json.dumps(declared, sort_keys=True).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return {
+            "lockfile": os.path.relpath(lockfile, project_path) if lockfile else None,
+            "lock_hash": lock_hash,
+            "deps_hash": deps_hash,
+        }
+
+    @staticmethod
+    def locked_versions(lockfile):
+        """
+        Resolved versions of top-level packages in a lockfile
+
+        Args:
+            lockfile: Path to package-lock.json, yarn.lock or pnpm-lock.yaml
+
+        Returns:
+            dict: Package name to version ("1.2.3", or "1.2.3, 2.0.1" when
+            several are locked); empty for formats that are not parsed (bun)
+        """
+        name = os.path.basename(lockfile)
+        versions = {}
+        try:
+            if name.endswith(".json"):
+                with open(lockfile, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                packages = data.get("packages")
+                if isinstance(packages, dict):
+                    for key, info in packages.items():
+                        parts = key.split("node_modules/")
+                        if len(parts) == 2 and not parts[0] and isinstance(info, dict):
+                            versions.setdefault(parts[1], set()).add(str(info.get("version")))
+                else:
+                    for dep, info in (data.get("dependencies") or {}).items():
+                        if isinstance(info, dict):
+                            versions.setdefault(dep, set()).add(str(info.get("version")))
+            elif name == "yarn.lock":
+                with open(lockfile, "r", encoding="utf-8") as f:
+                    current = None
+                    for line in f:
+                        if line and not line[0].isspace() and line.rstrip().endswith(":"):
+                            match = _YARN_HEADER.match(line)
+                            current = match.group(1) if match else None
+                        elif current:
+                            match = _YARN_VERSION.match(line)
+                            if match:
+                                versions.setdefault(current, set()).add(match.group(1))
+                                current = None
+            elif name == "pnpm-lock.yaml":
+                with open(lockfile, "r", encoding="utf-8") as f:
+                    in_packages = False
+                    for line in f:
+                        if line and not line[0].isspace():
+                            in_packages = line.startswith("packages:")
+                            continue
+                        if in_packages:
+                            match = _PNPM_KEY.match(line)
+                            if match:
+                                versions.setdefault(match.group(1), set()).add(match.group(2))
+        except (OSError, ValueError):
+            return {}
+        return {dep: ", ".join(sorted(found)) for dep, found in versions.items()}
+
+    @staticmethod
+    def record(project_path):
+        """
+        Save the fingerprint after a successful install
+
+        Returns:
+            bool: True if written (False without node_modules)
+        """
+        node_modules = os.path.join(project_path, "node_modules")
+        if not os.path.isdir(node_modules):
+            return False
+        state = InstallStateService.fingerprint(project_path)
+        lockfile = PackageManagerService.find_lockfile(project_path)
+        state["packages"] = InstallStateService.locked_versions(lockfile) if lockfile else {}
+        state["declared"] = InstallStateService.declared_dependencies(project_path)
+        state["installed"] = time.time()
+        try:
+            with open(os.path.join(node_modules, STATE_FILE), "w", encoding="utf-8") as f:
+                json.dump(state, f)
+        except OSError as e:
+            print(f"Error saving install state: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def diff(old, new):
+        """
+        Compare ``{name: version}`` maps
+
+        Returns:
+            dict: ``added`` and ``removed`` names, ``changed`` as
+            ``(name, old, new)``
+        """
+        return {
+            "added": sorted(new.keys() - old.keys()),
+            "removed": sorted(old.keys() - new.keys()),
+            "changed": sorted(
+                (name, old[name], new[name]) for name in old.keys() & new.keys()
+                if old[name] != new[name]
+            ),
+        }
+
+    @staticmethod
+    def check(project_path):
+        """
+        Decide whether an install is needed
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            dict: ``state`` ("missing", "fresh", "stale"), ``reason``,
+            ``changes`` (``diff()`` of locked versions, None if unknown),
+            ``declared`` (names whose package.json range changed) and
+            ``elapsed`` seconds
+        """
+        started = time.perf_counter()
+        node_modules = os.path.join(project_path, "node_modules")
+
+        def result(state, reason, changes=None, declared=()):
+            return {
+                "state": state,
+                "reason": reason,
+                "changes": changes,
+                "declared": list(declared),
+                "elapsed": time.perf_counter() - started,
+            }
+
+        if not os.path.isdir(node_modules):
+            return result("missing", "node_modules not found")
+
+        current = InstallStateService.fingerprint(project_path)
+        try:
+            with open(os.path.join(node_modules, STATE_FILE), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            saved = None
+
+        if saved is None:
+            # Installed outside the app: compare with the package manager's marker
+            lockfile = PackageManagerService.find_lockfile(project_path)
+            markers = [os.path.join(node_modules, name) for name in INSTALL_MARKERS]
+            marker_times = [os.path.getmtime(path) for path in markers if os.path.exists(path)]
+            if not lockfile or not marker_times:
+                return result("fresh", "no install record, lockfile not compared")
+            if os.path.getmtime(lockfile) > max(marker_times) + 1:
+                return result("stale", "lockfile is newer than the last install")
+            return result("fresh", "lockfile older than the last install")
+
+        if saved.get("lock_hash") == current["lock_hash"] and \
+                saved.get("deps_hash") == current["deps_hash"]:
+            return result("fresh", "lockfile and dependencies unchanged")
+
+        changes = None
+        if saved.get("lock_hash") != current["lock_hash"] and current["lockfile"]:
+            lockfile = os.path.join(project_path, current["lockfile"])
+            changes = InstallStateService.diff(
+                saved.get("packages") or {}, InstallStateService.locked_versions(lockfile)
+            )
+        declared = []
+        saved_declared = saved.get("declared") or {}
+        current_declared = InstallStateService.declared_dependencies(project_path)
+        for field in sorted(set(saved_declared) | set(current_declared)):
+            old = saved_declared.get(field) or {}
+            new = current_declared.get(field) or {}
+            if isinstance(old, dict) and isinstance(new, dict):
+                declared.extend(
+                    name for name in sorted(set(old) | set(new)) if old.get(name) != new.get(name)
+                )
+            elif old != new:
+                declared.append(field)
+
+        if saved.get("lock_hash") != current["lock_hash"]:
+            reason = "lockfile changed since the last install"
+        else:
+            reason = "package.json dependencies changed since the last install"
+        return result("stale", reason, changes, declared)
+
+    @staticmethod
+    def describe_changes(check, limit=5):
+        """
+        One-line summary of what changed, e.g. ``react 18.2.0 → 18.3.1, +zod``
+
+        Returns:
+            str: Empty if nothing is known
+        """
+        parts = []
+        listed = set()
+        changes = check.get("changes")
+        if changes:
+            parts += [f"{name} {old} → {new}" for name, old, new in changes["changed"]]
+            parts += [f"+{name}" for name in changes["added"]]
+            parts += [f"-{name}" for name in changes["removed"]]
+            listed = {change[0] for change in changes["changed"]}
+            listed.update(changes["added"], changes["removed"])
+        parts += [
+            f"{name} (package.json)" for name in check.get("declared", []) if name not in listed
+        ]
+        if len(parts) > limit:
+            return ", ".join(parts[:limit]) + f" and {len(parts) - limit} more"
+        return ", ".join(parts)
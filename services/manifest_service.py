@@ -0,0 +1,93 @@
+"""
+Parsed package.json, cached by file stamp
+
+Loading a project reads the manifest for the script list, the package
+manager field and the project info. ManifestService parses it once into a
+ProjectManifest and hands out the cached model until the file's mtime or
+size changes, so every reader after the first costs one ``stat``.
+"""
+import os
+import json
+import threading
+from dataclasses import dataclass, field
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class ProjectManifest:
+    """The parts of package.json the app uses, plus the raw data"""
+    path: str  # Project directory
+    data: dict = field(default_factory=dict)
+    stamp: tuple = None  # (mtime_ns, size) the model was parsed from
+    error: str = None  # Set when package.json is not valid JSON
+
+    @property
+    def name(self):
+        return str(self.data.get("name") or os.path.basename(self.path))
+
+    @property
+    def version(self):
+        return str(self.data.get("version", ""))
+
+    @property
+    def scripts(self):
+        scripts = self.data.get("scripts")
+        return scripts if isinstance(scripts, dict) else {}
+
+    @property
+    def package_manager(self):
+        value = self.data.get("packageManager")
+        return value if isinstance(value, str) else None
+
+
+class ManifestService:
+    """Load package.json into a cached ProjectManifest"""
+
+    @staticmethod
+    def load(project_path):
+        """
+        Manifest of a project directory
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            ProjectManifest or None: None if package.json does not exist
+        """
+        project_path = os.path.normpath(project_path)
+        package_json = os.path.join(project_path, "package.json")
+        try:
+            st = os.stat(package_json)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with _cache_lock:
+            cached = _cache.get(project_path)
+        if cached and cached.stamp == stamp:
+            return cached
+
+        manifest = ProjectManifest(project_path, stamp=stamp)
+        try:
+            with open(package_json, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                manifest.data = data
+            else:
+                manifest.error = "package.json is not an object"
+        except (OSError, json.JSONDecodeError) as e:
+            manifest.error = str(e)
+        with _cache_lock:
+            _cache[project_path] = manifest
+        return manifest
+
+    @staticmethod
+    def invalidate(project_path=None):
+        """Drop one cached manifest, or all of them"""
+        with _cache_lock:
+            if project_path is None:
+                _cache.clear()
+            else:
+                _cache.pop(os.path.normpath(project_path), None)
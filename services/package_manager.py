@@ -3,6 +3,8 @@ Package manager service for npm, yarn, pnpm, and bun
 """
 import os
 
+from services.manifest_service import ManifestService
+
 
 class PackageManagerService:
     """Handle package manager detection and command generation"""
@@ -26,19 +28,129 @@ class PackageManagerService:
         }
     }
     
+    # Lock files and their manager, in the order they are looked for
     LOCK_FILES = {
         "yarn.lock": "yarn",
         "pnpm-lock.yaml": "pnpm",
         "bun.lock": "bun",
-        "bun.lockb": "bun"
+        "bun.lockb": "bun",
+        "package-lock.json": "npm",
+        "npm-shrinkwrap.json": "npm"
     }
     
+    # Declares pnpm workspaces (npm, Yarn and Bun use package.json)
+    PNPM_WORKSPACE_FILE = "pnpm-workspace.yaml"
+    
     def __init__(self):
         self.package_manager = "npm"  # Default
+        self.package_manager_version = None  # Pinned by the packageManager field
+    
+    @staticmethod
+    def read_package_manager_field(directory):
+        """
+        Read the ``packageManager`` field (``"pnpm@9.1.0+sha512..."``)
+        
+        Args:
+            directory: Directory containing package.json
+            
+        Returns:
+            tuple or None: ``(manager, version)`` for a supported manager
+        """
+        manifest = ManifestService.load(directory)
+        value = manifest.package_manager if manifest else None
+        if value is None:
+            return None
+        name, _, version = value.partition("@")
+        if name not in PackageManagerService.MANAGERS:
+            return None
+        return name, version.split("+", 1)[0] or None
+    
+    @staticmethod
+    def declares_workspaces(directory):
+        """Whether a directory is a monorepo root (package.json workspaces or pnpm)"""
+        if os.path.exists(os.path.join(directory, PackageManagerService.PNPM_WORKSPACE_FILE)):
+            return True
+        manifest = ManifestService.load(directory)
+        return bool(manifest and manifest.data.get("workspaces"))
+    
+    @staticmethod
+    def search_dirs(project_path):
+        """
+        Directories whose lock file and packageManager field apply to a project
+        
+        The project itself and, for a workspace package, its parents up to
+        the monorepo root. A lock file above a project that is not inside a
+        monorepo (``~/yarn.lock``) belongs to something else.
+        
+        Args:
+            project_path: Path to project directory
+            
+        Returns:
+            list: Absolute paths, nearest first
+        """
+        current = os.path.abspath(project_path)
+        dirs = [current]
+        if PackageManagerService.declares_workspaces(current):
+            return dirs
+        while True:
+            parent = os.path.dirname(current)
+            if parent == current:
+                return dirs[:1]  # Not inside a monorepo
+            dirs.append(parent)
+            if PackageManagerService.declares_workspaces(parent):
+                return dirs
+            current = parent
+    
+    @staticmethod
+    def find_package_manager(project_path):
+        """
+        Find the package manager by the packageManager field or lock file
+        
+        Workspace packages usually have neither, so their parents up to the
+        monorepo root are searched too (see search_dirs()). Only reads the
+        filesystem, so it can run off the GUI thread.
+        
+        Args:
+            project_path: Path to project directory
+            
+        Returns:
+            tuple: ``(manager, pinned_version)``; the version is None
+            unless the packageManager field sets it
+        """
+        for directory in PackageManagerService.search_dirs(project_path):
+            pinned = PackageManagerService.read_package_manager_field(directory)
+            if pinned:
+                return pinned
+            for lock_file, manager in PackageManagerService.LOCK_FILES.items():
+                if os.path.exists(os.path.join(directory, lock_file)):
+                    return manager, None
+        return "npm", None
+    
+    @staticmethod
+    def find_lockfile(project_path, manager=None):
+        """
+        Lock file of the project, or of the monorepo root above it
+        
+        Searches the same directories as find_package_manager().
+        
+        Args:
+            project_path: Path to project directory
+            manager: Only this manager's lock files, any if None
+            
+        Returns:
+            str or None: Lock file path
+        """
+        for directory in PackageManagerService.search_dirs(project_path):
+            for lock_file, owner in PackageManagerService.LOCK_FILES.items():
+                if manager in (None, owner):
+                    path = os.path.join(directory, lock_file)
+                    if os.path.exists(path):
+                        return path
+        return None
     
     def detect_package_manager(self, project_path):
         """
-        Detect package manager by lock file
+        Detect and select the package manager of a project
         
         Args:
             project_path: Path to project directory
@@ -46,13 +158,8 @@ class PackageManagerService:
         Returns:
             str: Package manager name (npm, yarn, pnpm, bun)
         """
-        for lock_file, manager in self.LOCK_FILES.items():
-            if os.path.exists(os.path.join(project_path, lock_file)):
-                self.package_manager = manager
-                return manager
-        
-        self.package_manager = "npm"
-        return "npm"
+        self.package_manager, self.package_manager_version = self.find_package_manager(project_path)
+        return self.package_manager
     
     def get_install_command(self):
         """
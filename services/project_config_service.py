@@ -0,0 +1,115 @@
+"""
+Per-project configuration stored in the project root
+"""
+import os
+import json
+
+
+PROJECT_CONFIG_FILE = ".autorunner.json"
+
+
+class ProjectConfigService:
+    """
+    Read the optional ``.autorunner.json`` file of a project
+
+    Example:
+        {
+            "watch": {
+                "include": ["*.ts", "*.graphql"],
+                "exclude": ["src/generated/", "*.snap"],
+                "gitignore": true
+            },
+            "tasks": {
+                "build": ["codegen", "lint"]
+            },
+            "cache": {
+                "build": {
+                    "inputs": ["src/", "tsconfig.json"],
+                    "outputs": ["dist/"],
+                    "env": ["NODE_ENV"]
+                }
+            }
+        }
+    """
+
+    DEFAULT_WATCH = {
+        "include": None,
+        "exclude": [],
+        "gitignore": True
+    }
+
+    @staticmethod
+    def config_path(project_path):
+        """
+        Get path of the project config file
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            str: Path to .autorunner.json
+        """
+        return os.path.join(project_path, PROJECT_CONFIG_FILE)
+
+    @staticmethod
+    def load(project_path):
+        """
+        Load project config
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            dict: Config dictionary, empty if missing or invalid
+        """
+        try:
+            with open(ProjectConfigService.config_path(project_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        except OSError as e:
+            print(f"Error reading project config: {e}")
+            return {}
+
+    @staticmethod
+    def get_cache_config(project_path, script_name):
+        """
+        Get the task cache settings of a script
+
+        Args:
+            project_path: Path to project directory
+            script_name: Name of the package.json script
+
+        Returns:
+            dict or None: Keys ``inputs``, ``outputs`` and ``env`` (lists);
+            None if the script is not cached
+        """
+        cache = ProjectConfigService.load(project_path).get("cache", {})
+        entry = cache.get(script_name) if isinstance(cache, dict) else None
+        if not isinstance(entry, dict):
+            return None
+        config = {}
+        for key in ("inputs", "outputs", "env"):
+            value = entry.get(key, [])
+            config[key] = [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+        if not config["inputs"]:
+            config["inputs"] = ["**"]
+        return config
+
+    @staticmethod
+    def get_watch_config(project_path):
+        """
+        Get watcher include/exclude settings merged over defaults
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            dict: Keys ``include`` (list or None), ``exclude`` (list), ``gitignore`` (bool)
+        """
+        watch = ProjectConfigService.load(project_path).get("watch", {})
+        config = dict(ProjectConfigService.DEFAULT_WATCH)
+        if isinstance(watch, dict):
+            config.update({k: v for k, v in watch.items() if k in config})
+        return config
@@ -0,0 +1,239 @@
+"""
+Direct execution of package.json scripts, without ``npm run``
+
+``npm run dev`` starts a shell, then the package manager's own Node
+process (often 300-800 ms before it does anything), and only then the
+script. Direct mode does the package manager's part itself: it reads the
+script and its ``pre``/``post`` hooks from package.json, puts every
+``node_modules/.bin`` from the project up to the root first on PATH and
+sets the ``npm_*`` variables scripts commonly read. A script that is a
+single plain command is executed without a shell at all.
+
+Hooks run only where the detected package manager would run them: npm,
+Yarn classic and Bun do; pnpm 7+ only with ``enable-pre-post-scripts``
+in .npmrc, and Yarn 2+ never. Each step sees its own
+``npm_lifecycle_event``/``npm_lifecycle_script``, except on Windows:
+there the hooks see the script's ``npm_lifecycle_script``, passed in the
+environment rather than on a cmd.exe line.
+"""
+import os
+import re
+import shlex
+import shutil
+import subprocess
+
+from services.install_service import InstallService
+from services.manifest_service import ManifestService
+from services.package_manager import PackageManagerService
+
+# Anything a shell would interpret; such script bodies are run through one
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`\\\"'*?\[\]#~=%!{}\n]")
+# Characters cmd.exe interprets even inside set "name=value"
+_CMD_UNSAFE = re.compile(r'["%\n]')
+
+
+class ScriptExecService:
+    """Build direct commands for package.json scripts"""
+
+    @staticmethod
+    def load_package(project_path):
+        """
+        Read package.json (through the manifest cache)
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            dict: Parsed package.json, empty if missing or invalid
+        """
+        manifest = ManifestService.load(project_path)
+        return dict(manifest.data) if manifest else {}
+
+    @staticmethod
+    def runs_hooks(project_path, package_manager="npm", version=None):
+        """
+        Whether the package manager runs ``pre``/``post`` scripts
+
+        Args:
+            project_path: Path to project directory
+            package_manager: Detected package manager
+            version: Version pinned by the packageManager field, if any
+
+        Returns:
+            bool: False for Yarn 2+ and for pnpm 7+ unless .npmrc
+            sets ``enable-pre-post-scripts``
+        """
+        major = version.split(".", 1)[0] if version else ""
+        if package_manager == "yarn":
+            lockfile = PackageManagerService.find_lockfile(project_path, "yarn")
+            return not InstallService.is_yarn_berry(lockfile, version)
+        if package_manager == "pnpm":
+            if major.isdigit() and int(major) < 7:
+                return True
+            return ScriptExecService.npmrc_enabled(project_path, "enable-pre-post-scripts")
+        return True
+
+    @staticmethod
+    def npmrc_enabled(project_path, key):
+        """True if the nearest .npmrc from the project upwards sets ``key=true``"""
+        pattern = re.compile(rf"^\s*{re.escape(key)}\s*=\s*(\S+)", re.M)
+        current = os.path.abspath(project_path)
+        while True:
+            try:
+                with open(os.path.join(current, ".npmrc"), "r", encoding="utf-8") as f:
+                    match = pattern.search(f.read())
+                if match:
+                    return match.group(1).strip("\"'").lower() == "true"
+            except OSError:
+                pass
+            parent = os.path.dirname(current)
+            if parent == current:
+                return False
+            current = parent
+
+    @staticmethod
+    def resolve_steps(package, script_name, hooks=True):
+        """
+        Get the script and its hooks in run order
+
+        Args:
+            package: Parsed package.json
+            script_name: Script to run
+            hooks: Include ``pre``/``post`` scripts
+
+        Returns:
+            list: ``(name, body)`` for ``pre<name>``, ``<name>`` and
+            ``post<name>``, hooks only if defined; empty if the script is not
+        """
+        scripts = package.get("scripts") or {}
+        if not isinstance(scripts.get(script_name), str):
+            return []
+        if not hooks:
+            return [(script_name, scripts[script_name])]
+        steps = []
+        for name in (f"pre{script_name}", script_name, f"post{script_name}"):
+            body = scripts.get(name)
+            if isinstance(body, str) and body.strip():
+                steps.append((name, body))
+        return steps
+
+    @staticmethod
+    def bin_dirs(project_path):
+        """
+        ``node_modules/.bin`` directories from the project up to the root
+
+        Returns:
+            list: Existing directories, innermost first
+        """
+        dirs = []
+        current = os.path.abspath(project_path)
+        while True:
+            candidate = os.path.join(current, "node_modules", ".bin")
+            if os.path.isdir(candidate):
+                dirs.append(candidate)
+            parent = os.path.dirname(current)
+            if parent == current:
+                return dirs
+            current = parent
+
+    @staticmethod
+    def build_env(project_path, package, script_name, body, package_manager="npm"):
+        """
+        Environment the package manager would give the script
+
+        Args:
+            project_path: Path to project directory
+            package: Parsed package.json
+            script_name: Lifecycle event name
+            body: Script body
+            package_manager: Name reported in ``npm_config_user_agent``
+
+        Returns:
+            dict: Full environment for the child
+        """
+        env = dict(os.environ)
+        path = env.get("PATH", "")
+        env["PATH"] = os.pathsep.join(ScriptExecService.bin_dirs(project_path) + [path])
+        node = shutil.which("node", path=path) or "node"
+        env.update({
+            "npm_lifecycle_event": script_name,
+            "npm_lifecycle_script": body,
+            "npm_package_json": os.path.join(project_path, "package.json"),
+            "npm_package_name": str(package.get("name", "")),
+            "npm_package_version": str(package.get("version", "")),
+            "npm_command": "run-script",
+            "npm_node_execpath": node,
+            "NODE": node,
+            "INIT_CWD": project_path,
+            "npm_config_user_agent": f"{package_manager} (autorunner direct) node",
+        })
+        return env
+
+    @staticmethod
+    def step_command(name, body):
+        """
+        Shell command for one step of a chain, with its own lifecycle variables
+
+        POSIX runs the step in a subshell that exports them. cmd.exe has no
+        such scoping, so every step sets the event name again; a body would
+        not survive cmd.exe's quoting (``"``, ``%``), so npm_lifecycle_script
+        stays the one in the environment.
+        """
+        if os.name == "nt":
+            return f'(set "npm_lifecycle_event={name}" && {body})'
+        return (f"(export npm_lifecycle_event={shlex.quote(name)} "
+                f"npm_lifecycle_script={shlex.quote(body)}; {body})")
+
+    @staticmethod
+    def get_direct_command(project_path, script_name, package_manager="npm", version=None):
+        """
+        Build the direct command for a script
+
+        A single step without shell syntax becomes an argv list whose
+        program is resolved against the new PATH; otherwise the steps are
+        joined with ``&&`` (a failing hook stops the chain, as with npm)
+        and run through the shell.
+
+        Args:
+            project_path: Path to project directory
+            script_name: Name of the package.json script
+            package_manager: Detected package manager
+            version: Package manager version pinned by the packageManager field
+
+        Returns:
+            tuple: ``(cmd, env)``, cmd a str for the shell or an argv list;
+            None if the script cannot be run directly (missing, a Yarn
+            Plug'n'Play project without node_modules/.bin, or on Windows a
+            chain with a script name cmd.exe cannot set)
+        """
+        if os.path.exists(os.path.join(project_path, ".pnp.cjs")):
+            return None
+        package = ScriptExecService.load_package(project_path)
+        hooks = ScriptExecService.runs_hooks(project_path, package_manager, version)
+        steps = ScriptExecService.resolve_steps(package, script_name, hooks)
+        if not steps:
+            return None
+
+        body = dict(steps)[script_name]
+        env = ScriptExecService.build_env(project_path, package, script_name, body, package_manager)
+
+        if len(steps) == 1 and not _SHELL_SYNTAX.search(body):
+            argv = shlex.split(body, posix=os.name != "nt")
+            program = shutil.which(argv[0], path=env["PATH"]) if argv else None
+            if program:
+                return [program] + argv[1:], env
+
+        if len(steps) == 1:
+            return body, env
+        if os.name == "nt" and any(_CMD_UNSAFE.search(name) for name, _ in steps):
+            return None  # Cannot be set safely through cmd.exe
+        return " && ".join(
+            ScriptExecService.step_command(name, step) for name, step in steps
+        ), env
+
+    @staticmethod
+    def describe(cmd):
+        """Command line to show in the console"""
+        if isinstance(cmd, str):
+            return cmd
+        return subprocess.list2cmdline(cmd) if os.name == "nt" else shlex.join(cmd)
@@ -9,7 +9,24 @@ class SettingsService:
     """Handle application settings persistence"""
     
     DEFAULT_SETTINGS = {
-        "theme": "Miami Vice"
+        "theme": "Miami Vice",
+        "watch_mode": "auto",
+        "watch_quiet_ms": 300,
+        "watch_storm_threshold": 200,
+        "watch_verify_content": False,
+        "scrollback_lines": 100000,
+        "scrollback_mb": 64,
+        "log_archive": True,
+        "log_archive_mb": 1024,
+        "log_archive_days": 14,
+        "runner_pty": False,
+        "pty_columns": 120,
+        "pty_rows": 30,
+        "stop_grace_seconds": 5,
+        "direct_exec": False,
+        "task_parallelism": 0,
+        "task_cache_mb": 2048,
+        "install_strategy": "auto"
     }
     
     def load(self):
@@ -19,11 +36,13 @@ class SettingsService:
         Returns:
             dict: Settings dictionary
         """
+        settings = self.DEFAULT_SETTINGS.copy()
         try:
             with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+                settings.update(json.load(f))
         except (FileNotFoundError, json.JSONDecodeError):
-            return self.DEFAULT_SETTINGS.copy()
+            pass
+        return settings
     
     def save(self, settings):
         """
@@ -0,0 +1,260 @@
+"""
+Build a TaskGraph for a package.json script
+
+Dependencies come from two places:
+
+- ``.autorunner.json``: ``"tasks": {"build": ["codegen", "lint"]}`` makes
+  ``build`` wait for ``codegen`` and ``lint``, which may run in parallel
+- the scripts themselves: ``pre<name>``/``post<name>`` hooks run before
+  and after ``<name>`` (where the package manager runs hooks); steps of an
+  ``&&`` chain run in order; ``npm run x`` (``yarn x``, ``pnpm run x``)
+  steps become the task ``x``; ``run-p``/``npm-run-all -p`` start their
+  scripts in parallel, ``run-s`` in order
+
+A chain is only split around such script references: consecutive plain
+commands stay one shell command. A body with ``||``, ``;``, ``&`` or a
+newline outside quotes is one task, and so is a chain that changes shell
+state (``cd``, ``export``, ``VAR=...``) before a script reference, since
+the steps after it would not see the change.
+
+A script reached more than once runs once, after everything that reached
+it, unless that would need it to run before itself. Every task's command is run
+through the shell with the environment of direct mode, so hooks are not run
+a second time by the package manager.
+"""
+import re
+import shlex
+import fnmatch
+
+from core.task_graph import TaskGraph, TaskNode
+from services.project_config_service import ProjectConfigService
+from services.script_exec_service import ScriptExecService
+
+
+_RUN_SCRIPT = re.compile(r"^(?:npm run(?:-script)?|pnpm(?: run)?|yarn(?: run)?|bun run)\s+(\S+)$")
+_RUN_ALL = ("run-p", "run-s", "npm-run-all")
+# Steps whose effect (cwd, variables) the rest of the chain relies on
+_SHELL_STATE = re.compile(r"^(?:cd|pushd|export|set|source|\.)\s|^\w+=")
+
+
+class TaskGraphService:
+    """Turn scripts and project config into a task graph"""
+
+    @staticmethod
+    def get_task_deps(project_path):
+        """
+        Declared dependencies from ``.autorunner.json``
+
+        Args:
+            project_path: Path to project directory
+
+        Returns:
+            dict: Script name to list of script names
+        """
+        tasks = ProjectConfigService.load(project_path).get("tasks", {})
+        if not isinstance(tasks, dict):
+            return {}
+        return {
+            name: [dep for dep in deps if isinstance(dep, str)]
+            for name, deps in tasks.items()
+            if isinstance(deps, list)
+        }
+
+    @staticmethod
+    def split_chain(body):
+        """
+        Split a script body on ``&&`` outside quotes
+
+        Returns:
+            list: Stripped steps, empty steps dropped; the whole body as
+            one step if it has other control operators (``||``, ``;``,
+            ``&``, newline), whose flow a split would change
+        """
+        steps, current, quote = [], [], None
+        i = 0
+        while i < len(body):
+            char = body[i]
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in "\"'":
+                quote = char
+            elif body.startswith("&&", i):
+                steps.append("".join(current))
+                current = []
+                i += 2
+                continue
+            elif char in ";&\n" or body.startswith("||", i):
+                return [body.strip()] if body.strip() else []
+            current.append(char)
+            i += 1
+        steps.append("".join(current))
+        return [step.strip() for step in steps if step.strip()]
+
+    @staticmethod
+    def parse_step(step, scripts):
+        """
+        Scripts a step refers to
+
+        Args:
+            step: One command of an ``&&`` chain
+            scripts: All package.json scripts
+
+        Returns:
+            tuple: ``(mode, names)`` with mode "serial" or "parallel", or
+            None if the step is a plain command
+        """
+        match = _RUN_SCRIPT.match(step)
+        if match:
+            name = match.group(1)
+            return ("serial", [name]) if name in scripts else None
+
+        try:
+            argv = shlex.split(step)
+        except ValueError:
+            return None
+        if not argv or argv[0] not in _RUN_ALL:
+            return None
+        mode = "parallel" if argv[0] == "run-p" else "serial"
+        names = []
+        for arg in argv[1:]:
+            if arg in ("-p", "--parallel"):
+                mode = "parallel"
+            elif arg in ("-s", "--sequential", "--serial"):
+                mode = "serial"
+            elif arg.startswith("-"):
+                return None  # Options we do not model (--race, -c, ...)
+            else:
+                matched = [n for n in scripts if fnmatch.fnmatchcase(n, arg)]
+                if not matched:
+                    return None
+                names.extend(n for n in matched if n not in names)
+        return (mode, names) if names else None
+
+    @staticmethod
+    def build(project_path, script_name, package_manager="npm", version=None):
+        """
+        Task graph that runs a script
+
+        Args:
+            project_path: Path to project directory
+            script_name: Script to run
+            package_manager: Detected package manager
+            version: Package manager version pinned by the packageManager field
+
+        Returns:
+            TaskGraph: Validated graph; ``script_name`` is its last task
+
+        Raises:
+            ValueError: Unknown script or a dependency cycle
+        """
+        package = ScriptExecService.load_package(project_path)
+        scripts = {
+            name: body for name, body in (package.get("scripts") or {}).items()
+            if isinstance(body, str)
+        }
+        if script_name not in scripts:
+            raise ValueError(f"Unknown script: {script_name}")
+        declared = TaskGraphService.get_task_deps(project_path)
+        hooks = ScriptExecService.runs_hooks(project_path, package_manager, version)
+        graph = TaskGraph()
+        expanding = set()
+        # Script name to the tasks that wait for whatever reaches the script
+        entries = {}
+
+        def task(name, script, cmd):
+            env = ScriptExecService.build_env(
+                project_path, package, script, cmd or "", package_manager
+            )
+            return graph.add(TaskNode(name, cmd, env, script))
+
+        def depends_on(task_name, target):
+            """True if ``task_name`` already waits for ``target``"""
+            stack, seen = [task_name], set()
+            while stack:
+                current = stack.pop()
+                if current == target:
+                    return True
+                if current not in seen and current in graph:
+                    seen.add(current)
+                    stack.extend(graph.nodes[current].deps)
+            return False
+
+        def add_script(name, after):
+            """
+            Add a script (after the tasks in ``after``)
+
+            Returns:
+                set: Tasks to wait for to have the script done: its own,
+                plus those of ``after`` it already ran before
+            """
+            if name in expanding:
+                raise ValueError(f"Dependency cycle through {name}")
+            if name in graph:
+                # Runs once, but after everything that reaches it
+                later = {dep for dep in after if not depends_on(dep, name)}
+                for entry in entries[name]:
+                    graph.nodes[entry].deps.update(later)
+                return {name} | (set(after) - later)
+            expanding.add(name)
+            entries[name] = set()
+
+            first = set(after)
+            for dep in declared.get(name, []):
+                if dep not in scripts:
+                    raise ValueError(f"{name} depends on unknown script {dep}")
+                first |= add_script(dep, set())
+
+            # (parsed step, command); consecutive plain commands stay one
+            # shell command so cd/export carry over
+            steps = []
+            stateful = False
+            for step in TaskGraphService.split_chain(scripts[name]):
+                parsed = TaskGraphService.parse_step(step, scripts)
+                if parsed is not None and stateful:
+                    steps = [(None, scripts[name].strip())]
+                    break
+                stateful = stateful or bool(_SHELL_STATE.match(step))
+                if parsed is None and steps and steps[-1][0] is None:
+                    steps[-1] = (None, f"{steps[-1][1]} && {step}")
+                else:
+                    steps.append((parsed, step))
+            if hooks and f"pre{name}" in scripts:
+                steps.insert(0, (("serial", [f"pre{name}"]), None))
+            if hooks and f"post{name}" in scripts:
+                steps.append((("serial", [f"post{name}"]), None))
+
+            if len(steps) == 1 and steps[0][0] is None:
+                # A single plain command: the script is one task
+                task(name, name, steps[0][1]).deps.update(first)
+                entries[name].add(name)
+                expanding.discard(name)
+                return {name}
+
+            previous = first
+            for index, (parsed, step) in enumerate(steps, 1):
+                if parsed is None:
+                    step_name = f"{name}#{index}"
+                    task(step_name, name, step).deps.update(previous)
+                    reached = starts = {step_name}
+                elif parsed[0] == "parallel":
+                    reached = set().union(*(add_script(ref, previous) for ref in parsed[1]))
+                    starts = set().union(*(entries[ref] for ref in parsed[1]))
+                else:
+                    head, *rest = parsed[1]
+                    reached = add_script(head, previous)
+                    starts = entries[head]
+                    for ref in rest:
+                        reached = add_script(ref, reached)
+                if previous is first:
+                    entries[name] |= starts
+                previous = reached
+
+            # Join node: the script is done when its last step is
+            task(name, name, None).deps.update(previous)
+            expanding.discard(name)
+            return {name}
+
+        add_script(script_name, set())
+        graph.order()
+        return graph
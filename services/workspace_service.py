@@ -0,0 +1,393 @@
+"""
+Monorepo workspace discovery
+
+Workspaces are the packages matched by the ``workspaces`` globs of the
+root package.json (npm, Yarn, Bun) or the ``packages`` list of
+pnpm-workspace.yaml. Their manifests are read in parallel and the result
+is cached per root. While the mtimes of the root manifests and of every
+directory the globs listed are unchanged, a reload costs one ``stat`` per
+workspace manifest and re-reads only the manifests that changed.
+
+Running a script across workspaces becomes a TaskGraph: one task per
+workspace that has the script, after the tasks of the workspaces it
+depends on (through ``dependencies``, ``devDependencies``, ...).
+"""
+import os
+import fnmatch
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+from core.task_graph import TaskGraph, TaskNode
+from services.manifest_service import ManifestService
+from services.package_manager import PackageManagerService
+from services.script_exec_service import ScriptExecService
+
+
+PNPM_WORKSPACE_FILE = PackageManagerService.PNPM_WORKSPACE_FILE
+DEPENDENCY_FIELDS = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
+SKIP_DIRS = {"node_modules", ".git"}
+
+
+@dataclass
+class Workspace:
+    """One package of a monorepo"""
+    name: str  # package.json name, or the directory name if it has none
+    path: str
+    version: str = ""
+    scripts: dict = field(default_factory=dict)
+    deps: set = field(default_factory=set)  # Every declared dependency name
+    named: bool = True  # False if ``name`` is only the directory name
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _clean_pattern(pattern):
+    pattern = pattern.strip().strip("/")
+    while pattern.startswith("./"):
+        pattern = pattern[2:]
+    return pattern
+
+
+class WorkspaceService:
+    """Find the workspaces of a monorepo and how they depend on each other"""
+
+    @staticmethod
+    def parse_pnpm_workspace(text):
+        """
+        Read the ``packages`` list of pnpm-workspace.yaml
+
+        Only the subset pnpm documents for this key is understood: a
+        top-level ``packages:`` key followed by ``- glob`` items or a
+        ``[glob, ...]`` flow list, quoted or not, with comments.
+
+        Returns:
+            list: Glob patterns, ``!`` exclusions included
+        """
+        def unquote(item):
+            item = item.strip()
+            if len(item) >= 2 and item[0] == item[-1] and item[0] in "\"'":
+                return item[1:-1]
+            return item
+
+        patterns = []
+        in_packages = False
+        for line in text.splitlines():
+            stripped = line.split(" #", 1)[0].strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if not line[0].isspace() and not stripped.startswith("-"):
+                key, _, value = stripped.partition(":")
+                in_packages = key.strip() == "packages"
+                value = value.strip()
+                if in_packages and value.startswith("[") and value.endswith("]"):
+                    items = value[1:-1].split(",")
+                    patterns.extend(filter(None, (unquote(item) for item in items)))
+                continue
+            if in_packages and stripped.startswith("-"):
+                item = unquote(stripped[1:])
+                if item:
+                    patterns.append(item)
+        return patterns
+
+    @staticmethod
+    def workspace_patterns(root):
+        """
+        Workspace globs declared in ``root``
+
+        Returns:
+            list: Patterns from package.json and pnpm-workspace.yaml
+        """
+        manifest = ManifestService.load(root)
+        workspaces = manifest.data.get("workspaces") if manifest else None
+        if isinstance(workspaces, dict):
+            workspaces = workspaces.get("packages")
+        patterns = [p for p in workspaces or [] if isinstance(p, str)]
+        try:
+            with open(os.path.join(root, PNPM_WORKSPACE_FILE), "r", encoding="utf-8") as f:
+                patterns += WorkspaceService.parse_pnpm_workspace(f.read())
+        except OSError:
+            pass
+        return patterns
+
+    @staticmethod
+    def find_root(project_path):
+        """
+        Nearest directory, ``project_path`` or above, that declares workspaces
+
+        Returns:
+            str or None: Monorepo root
+        """
+        current = os.path.abspath(project_path)
+        while True:
+            if WorkspaceService.workspace_patterns(current):
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
+
+    @staticmethod
+    def expand_patterns(root, patterns):
+        """
+        Directories matched by workspace globs
+
+        ``*`` matches one path segment and ``**`` any number of them;
+        ``node_modules`` and hidden directories are never entered.
+
+        Returns:
+            tuple: ``(package_dirs, listed_dirs)``; the directories whose
+            listing the result depends on are reported for the cache
+        """
+        included = [_clean_pattern(p) for p in patterns if not p.startswith("!")]
+        excluded = [_clean_pattern(p[1:]) for p in patterns if p.startswith("!")]
+        listed = set()
+        found = set()
+
+        def subdirs(path):
+            listed.add(path)
+            try:
+                with os.scandir(path) as entries:
+                    return [
+                        entry.path for entry in entries
+                        if entry.is_dir() and entry.name not in SKIP_DIRS
+                        and not entry.name.startswith(".")
+                    ]
+            except OSError:
+                return []
+
+        def descendants(path):
+            result = [path]
+            pending = [path]
+            while pending:
+                children = subdirs(pending.pop())
+                result.extend(children)
+                pending.extend(children)
+            return result
+
+        for pattern in included:
+            dirs = [root]
+            for part in pattern.split("/"):
+                matched = []
+                for directory in dirs:
+                    if part == "**":
+                        matched.extend(descendants(directory))
+                    elif any(c in part for c in "*?["):
+                        matched.extend(
+                            path for path in subdirs(directory)
+                            if fnmatch.fnmatchcase(os.path.basename(path), part)
+                        )
+                    elif part not in ("", "."):
+                        listed.add(directory)
+                        candidate = os.path.join(directory, part)
+                        if os.path.isdir(candidate):
+                            matched.append(candidate)
+                    else:
+                        matched.append(directory)
+                dirs = matched
+            found.update(dirs)
+
+        package_dirs = []
+        for path in sorted(found):
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            if path == root or any(
+                fnmatch.fnmatchcase(rel, p) or fnmatch.fnmatchcase(rel + "/", p) for p in excluded
+            ):
+                continue
+            if os.path.isfile(os.path.join(path, "package.json")):
+                package_dirs.append(path)
+        return package_dirs, listed
+
+    @staticmethod
+    def read_workspace(path):
+        """Workspace from a package directory, None if its manifest is unreadable"""
+        manifest = ManifestService.load(path)
+        if manifest is None or not manifest.data:
+            return None
+        deps = set()
+        for key in DEPENDENCY_FIELDS:
+            if isinstance(manifest.data.get(key), dict):
+                deps.update(manifest.data[key])
+        return Workspace(
+            name=manifest.name,
+            path=path,
+            version=manifest.version,
+            scripts={k: v for k, v in manifest.scripts.items() if isinstance(v, str)},
+            deps=deps,
+            named=bool(manifest.data.get("name")),
+        )
+
+    @staticmethod
+    def discover(project_path, max_workers=16):
+        """
+        Workspaces of the monorepo ``project_path`` belongs to
+
+        Args:
+            project_path: Monorepo root or any directory inside it
+            max_workers: Threads reading manifests
+
+        Returns:
+            tuple: ``(root, [Workspace])``; ``(None, [])`` outside a monorepo
+        """
+        root = WorkspaceService.find_root(project_path)
+        if root is None:
+            return None, []
+
+        with _cache_lock:
+            cached = _cache.get(root)
+        if cached and all(_mtime(path) == stamp for path, stamp in cached["layout"].items()):
+            # Same workspace directories: re-read only the changed manifests
+            package_dirs = list(cached["manifests"])
+            layout = cached["layout"]
+        else:
+            cached = None
+            layout = {
+                path: _mtime(path)
+                for path in (os.path.join(root, "package.json"), os.path.join(root, PNPM_WORKSPACE_FILE))
+            }
+            package_dirs, listed = WorkspaceService.expand_patterns(
+                root, WorkspaceService.workspace_patterns(root)
+            )
+            layout.update((path, _mtime(path)) for path in listed)
+
+        manifests = {path: _mtime(os.path.join(path, "package.json")) for path in package_dirs}
+        known = cached["workspaces"] if cached else {}
+        stale = [
+            path for path in package_dirs
+            if path not in known or cached["manifests"][path] != manifests[path]
+        ]
+        if not stale and cached:
+            return root, [w for w in known.values() if w is not None]
+
+        if len(stale) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(stale))) as pool:
+                fresh = dict(zip(stale, pool.map(WorkspaceService.read_workspace, stale)))
+        else:
+            fresh = {path: WorkspaceService.read_workspace(path) for path in stale}
+        by_dir = {path: fresh[path] if path in fresh else known[path] for path in package_dirs}
+
+        with _cache_lock:
+            _cache[root] = {"layout": layout, "manifests": manifests, "workspaces": by_dir}
+        return root, [w for w in by_dir.values() if w is not None]
+
+    @staticmethod
+    def duplicate_names(workspaces):
+        """
+        Package names declared by more than one workspace
+
+        Returns:
+            dict: Name to the paths of the workspaces declaring it
+        """
+        paths = {}
+        for workspace in workspaces:
+            if workspace.named:
+                paths.setdefault(workspace.name, []).append(workspace.path)
+        return {name: found for name, found in paths.items() if len(found) > 1}
+
+    @staticmethod
+    def dependency_graph(workspaces):
+        """
+        Internal dependencies between workspaces
+
+        Workspaces are keyed by path. A dependency resolves to a workspace
+        only through a package.json name declared exactly once, see
+        duplicate_names().
+
+        Returns:
+            dict: Workspace path to the paths of the workspaces it depends on
+        """
+        by_name = {}
+        for workspace in workspaces:
+            if workspace.named:
+                by_name.setdefault(workspace.name, []).append(workspace.path)
+        return {
+            workspace.path: {
+                by_name[dep][0] for dep in workspace.deps if len(by_name.get(dep, ())) == 1
+            } - {workspace.path}
+            for workspace in workspaces
+        }
+
+    @staticmethod
+    def task_name(workspace, script_name, root=None):
+        """
+        Runner name of a workspace's task, e.g. ``build [@app/web]``
+
+        Args:
+            root: Add the workspace path relative to this directory (for
+                names that are ambiguous on their own)
+        """
+        label = workspace.name
+        if root is not None:
+            label = f"{label} ({os.path.relpath(workspace.path, root).replace(os.sep, '/')})"
+        return f"{script_name} [{label}]"
+
+    @staticmethod
+    def build_task_graph(workspaces, script_name, package_manager="npm", direct=False,
+                         version=None):
+        """
+        Task graph that runs a script in every workspace that has it
+
+        A workspace's task waits for the tasks of the workspaces it depends
+        on; dependencies without the script are looked through.
+
+        Args:
+            workspaces: Discovered workspaces
+            script_name: Script to run
+            package_manager: Detected package manager
+            direct: Use direct exec commands where possible
+            version: Package manager version pinned by the packageManager field
+
+        Returns:
+            TaskGraph: Validated graph, tasks named by task_name()
+
+        Raises:
+            ValueError: No workspace has the script, or dependency cycle
+        """
+        deps = WorkspaceService.dependency_graph(workspaces)
+        having = {w.path: w for w in workspaces if script_name in w.scripts}
+        if not having:
+            raise ValueError(f"No workspace has a {script_name} script")
+
+        def nearest(path, seen):
+            result = set()
+            for dep in deps[path]:
+                if dep in seen:
+                    continue
+                seen.add(dep)
+                if dep in having:
+                    result.add(names[dep])
+                else:
+                    result |= nearest(dep, seen)
+            return result
+
+        run_template = PackageManagerService.MANAGERS[package_manager]["run"]
+        counts = Counter(workspace.name for workspace in workspaces)
+        root = os.path.commonpath([workspace.path for workspace in workspaces])
+        names = {
+            path: WorkspaceService.task_name(
+                workspace, script_name, root if counts[workspace.name] > 1 else None
+            )
+            for path, workspace in having.items()
+        }
+        graph = TaskGraph()
+        for path, workspace in having.items():
+            cmd, env = run_template.format(script=script_name), None
+            if direct:
+                cmd, env = ScriptExecService.get_direct_command(
+                    workspace.path, script_name, package_manager, version
+                ) or (cmd, env)
+            node = TaskNode(names[path], cmd, env, script_name, cwd=workspace.path)
+            node.deps = nearest(path, {path})
+            graph.add(node)
+        graph.order()
+        return graph
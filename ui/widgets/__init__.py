@@ -5,5 +5,9 @@ UI widgets package
 from .terminal_tab import TerminalTab
 from .recent_widget import RecentWidget
 from .favorites_widget import FavoritesWidget
+from .console_view import ConsoleView
+from .log_viewer import LogViewerDialog
+from .runner_list import RunnerListWidget
 
-__all__ = ['TerminalTab', 'RecentWidget', 'FavoritesWidget']
+__all__ = ['TerminalTab', 'RecentWidget', 'FavoritesWidget', 'ConsoleView', 'LogViewerDialog',
+           'RunnerListWidget']
@@ -0,0 +1,404 @@
+"""
+Virtualized console view over a ScrollbackBuffer
+"""
+import re
+import html
+import time
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QUrl, QPointF, QRectF, QTimer, pyqtSignal
+from PyQt6.QtGui import (
+    QAbstractTextDocumentLayout, QColor, QDesktopServices, QFont, QFontMetricsF,
+    QGuiApplication, QKeySequence, QPainter, QTextDocument
+)
+from PyQt6.QtWidgets import QAbstractScrollArea, QMenu
+
+from core.scrollback import ScrollbackBuffer
+from core.search_index import SearchIndex
+
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+MATCH_COLOR = QColor(255, 204, 0, 90)
+MATCH_CURRENT_COLOR = QColor(255, 140, 0, 200)
+
+
+class ConsoleView(QAbstractScrollArea):
+    """
+    Read-only console that lays out only the lines on screen
+
+    Lines are kept in a ScrollbackBuffer and drawn one QTextDocument per
+    visible line (cached while the line stays near the viewport), so
+    append cost and memory do not grow with the length of the log. Lines
+    do not wrap; long lines scroll horizontally. Selection is by whole
+    lines and links open in the browser.
+
+    Appended lines are also fed to a SearchIndex; ``set_search()`` highlights
+    matches on screen and ``find_next()`` jumps between them. Match counts
+    are computed in time slices and reported through ``search_updated``.
+
+    ``set_live()`` shows lines that are still being rewritten (progress
+    bars, spinners) below the scrollback; each call replaces the previous
+    ones instead of appending.
+    """
+    search_updated = pyqtSignal()
+
+    CACHE_SCREENS = 3
+    COUNT_SLICE_MS = 30
+    INDEX_SLICE_MS = 8
+
+    def __init__(self, max_lines: int = 100000, max_bytes: int = 64 * 1024 * 1024,
+                 parent=None):
+        super().__init__(parent)
+        self.buffer = ScrollbackBuffer(max_lines, max_bytes)
+        self.index = SearchIndex()
+        self.search = None
+        self.current_hit = None  # (line, column)
+        self.hit_count = 0
+        self.count_complete = True
+        self._count_scheduled = False
+        self.follow = True
+        self.selection = None  # (anchor, current) absolute line numbers
+        self.max_columns = 0
+        self.live = []
+        self._live_docs = []
+        self._docs = OrderedDict()
+        self._press_pos = None
+
+        # Trigram sets of sealed chunks are built in short idle slices
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(50)
+        self._index_timer.timeout.connect(self._build_index)
+
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.TypeWriter)
+        self.setFont(font)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.viewport().setMouseTracking(True)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._show_menu)
+        self._update_metrics()
+
+    # ------------------------------------------------------------
+    # Content
+    # ------------------------------------------------------------
+    def append_lines(self, lines):
+        """Append rendered ``(text, html)`` pairs"""
+        if not lines:
+            return
+        evicted = self.buffer.extend(lines)
+        self.index.extend(text for text, _ in lines)
+        if evicted:
+            self.index.discard_before(self.buffer.start)
+        if self.index.pending and not self._index_timer.isActive():
+            self._index_timer.start()
+        widest = max(len(text) for text, _ in lines)
+        if widest > self.max_columns:
+            self.max_columns = widest
+        self._content_changed(evicted)
+        if self.search is not None:
+            self._count_matches()
+
+    def append_html(self, markup: str):
+        """Append one line of markup (app messages)"""
+        text = html.unescape(TAG_PATTERN.sub("", markup))
+        self.append_lines([(text, markup)])
+
+    def set_live(self, lines):
+        """Replace the live ``(text, html)`` lines shown after the scrollback"""
+        if not lines and not self.live:
+            return
+        self.live = lines
+        self._live_docs = [None] * len(lines)
+        if lines:
+            widest = max(len(text) for text, _ in lines)
+            if widest > self.max_columns:
+                self.max_columns = widest
+        self._content_changed(0)
+
+    def clear(self):
+        self.buffer.clear()
+        self.index.clear()
+        self.current_hit = None
+        self.selection = None
+        self.max_columns = 0
+        self._docs.clear()
+        self.follow = True
+        self._content_changed(0)
+
+    def set_limits(self, max_lines: int, max_bytes: int):
+        self.buffer.set_limits(max_lines, max_bytes)
+        self.index.discard_before(self.buffer.start)
+        self._docs.clear()
+        self._content_changed(0)
+
+    def scroll_to_end(self):
+        self.follow = True
+        bar = self.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def selected_text(self) -> str:
+        if self.selection is None:
+            return ""
+        buffer = self.buffer
+        first = max(min(self.selection), buffer.start)
+        last = min(max(self.selection), buffer.end - 1)
+        return "\n".join(buffer.text(i) for i in range(first, last + 1))
+
+    def copy(self):
+        text = self.selected_text()
+        if text:
+            QGuiApplication.clipboard().setText(text)
+
+    def select_all(self):
+        if len(self.buffer):
+            self.selection = (self.buffer.start, self.buffer.end - 1)
+            self.viewport().update()
+
+    # ------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------
+    def set_search(self, query):
+        """Highlight matches of a SearchQuery (None clears the search)"""
+        self.search = query
+        self.current_hit = None
+        self.hit_count = 0
+        self.count_complete = True
+        if query is not None:
+            self._count_matches()
+        else:
+            self.search_updated.emit()
+        self.viewport().update()
+
+    def _build_index(self):
+        deadline = time.monotonic() + self.INDEX_SLICE_MS / 1000
+        if self.index.build_pending(deadline):
+            self._index_timer.stop()
+
+    def _count_matches(self):
+        self._count_scheduled = False
+        if self.search is None:
+            return
+        deadline = time.monotonic() + self.COUNT_SLICE_MS / 1000
+        self.hit_count, self.count_complete = self.index.count(self.search, deadline)
+        if not self.count_complete and not self._count_scheduled:
+            # Continue after the event loop had a turn
+            self._count_scheduled = True
+            QTimer.singleShot(0, self._count_matches)
+        self.search_updated.emit()
+
+    def hit_rank(self):
+        """1-based number of the current match, None if unknown"""
+        if self.search is None or self.current_hit is None or not self.count_complete:
+            return None
+        if self.current_hit[0] < self.buffer.start:
+            return None
+        return self.index.rank(self.search, *self.current_hit)
+
+    def find_next(self, backwards=False):
+        """Move to the next (or previous) match and scroll it into view"""
+        if self.search is None or not len(self.buffer):
+            return None
+        if self.current_hit is not None and self.current_hit[0] >= self.buffer.start:
+            line, column = self.current_hit
+        elif backwards:
+            line, column = self._first_visible() + self._visible_rows(), 0
+        else:
+            line, column = self._first_visible(), -1
+        hit = self.index.find(self.search, line, column, backwards)
+        self.current_hit = hit
+        if hit is not None:
+            self.show_line(hit[0], hit[1])
+        self.search_updated.emit()
+        self.viewport().update()
+        return hit
+
+    def show_line(self, index, column=0):
+        """Scroll so that a line (and column) is on screen"""
+        rows = self._visible_rows()
+        first = self._first_visible()
+        if not first <= index < first + rows:
+            self.verticalScrollBar().setValue(index - self.buffer.start - rows // 2)
+        hbar = self.horizontalScrollBar()
+        x = column * self.char_width
+        if not hbar.value() <= x < hbar.value() + self.viewport().width() - self.char_width:
+            hbar.setValue(int(x - self.viewport().width() / 2))
+
+    # ------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------
+    def _update_metrics(self):
+        metrics = QFontMetricsF(self.font())
+        self.line_height = max(1.0, metrics.lineSpacing())
+        self.char_width = max(1.0, metrics.horizontalAdvance("M"))
+        self._docs.clear()
+        self._live_docs = [None] * len(self.live)
+
+    def _visible_rows(self) -> int:
+        return max(1, int(self.viewport().height() // self.line_height))
+
+    def _first_visible(self) -> int:
+        return self.buffer.start + self.verticalScrollBar().value()
+
+    def _content_changed(self, evicted):
+        bar = self.verticalScrollBar()
+        value = bar.value()
+        rows = self._visible_rows()
+        bar.blockSignals(True)
+        bar.setRange(0, max(0, len(self.buffer) + len(self.live) - rows))
+        bar.setPageStep(rows)
+        if self.follow:
+            bar.setValue(bar.maximum())
+        else:
+            # Keep the same lines on screen while old ones are evicted
+            bar.setValue(max(0, value - evicted))
+        bar.blockSignals(False)
+
+        hbar = self.horizontalScrollBar()
+        width = self.max_columns * self.char_width
+        hbar.setRange(0, max(0, int(width - self.viewport().width()) + 1))
+        hbar.setPageStep(self.viewport().width())
+        self.viewport().update()
+
+    def _on_scrolled(self, value):
+        self.follow = value >= self.verticalScrollBar().maximum()
+        self.viewport().update()
+
+    def _new_document(self, markup):
+        doc = QTextDocument()
+        doc.setDocumentMargin(0)
+        doc.setDefaultFont(self.font())
+        doc.setHtml(f"<span style='white-space:pre;'>{markup}</span>")
+        return doc
+
+    def _document(self, index):
+        if index >= self.buffer.end:
+            row = index - self.buffer.end
+            if self._live_docs[row] is None:
+                self._live_docs[row] = self._new_document(self.live[row][1])
+            return self._live_docs[row]
+        doc = self._docs.get(index)
+        if doc is not None:
+            self._docs.move_to_end(index)
+            return doc
+        doc = self._new_document(self.buffer.line(index)[1])
+        self._docs[index] = doc
+        while len(self._docs) > self._visible_rows() * self.CACHE_SCREENS:
+            self._docs.popitem(last=False)
+        return doc
+
+    def _line_at(self, pos):
+        """Absolute line number under a viewport position, or None"""
+        index = self._first_visible() + int(pos.y() // self.line_height)
+        return index if self.buffer.start <= index < self.buffer.end else None
+
+    def _anchor_at(self, pos):
+        index = self._line_at(pos)
+        if index is None:
+            return ""
+        top = (index - self._first_visible()) * self.line_height
+        point = QPointF(pos.x() + self.horizontalScrollBar().value(), pos.y() - top)
+        return self._document(index).documentLayout().anchorAt(point)
+
+    # ------------------------------------------------------------
+    # Qt events
+    # ------------------------------------------------------------
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        buffer = self.buffer
+        first = self._first_visible()
+        last = min(buffer.end + len(self.live), first + self._visible_rows() + 1)
+        x = -self.horizontalScrollBar().value()
+        width = self.viewport().width()
+
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette = self.palette()
+        highlight = self.palette().highlight().color()
+        highlight.setAlpha(90)
+        selection = (min(self.selection), max(self.selection)) if self.selection else None
+
+        for row, index in enumerate(range(first, last)):
+            top = row * self.line_height
+            if selection and selection[0] <= index <= selection[1]:
+                painter.fillRect(QRectF(0, top, width, self.line_height), highlight)
+            doc = self._document(index)
+            if self.search is not None and index < buffer.end:
+                self._paint_matches(painter, doc, index, x, top)
+            painter.save()
+            painter.translate(x, top)
+            doc.documentLayout().draw(painter, context)
+            painter.restore()
+
+    def _paint_matches(self, painter, doc, index, x, top):
+        spans = self.search.spans(self.buffer.text(index))
+        if not spans:
+            return
+        layout = doc.firstBlock().layout()
+        if layout is None or layout.lineCount() == 0:
+            return
+        line = layout.lineAt(0)
+        for start, end in spans:
+            current = self.current_hit == (index, start)
+            left = line.cursorToX(start)[0]
+            right = line.cursorToX(end)[0]
+            color = MATCH_CURRENT_COLOR if current else MATCH_COLOR
+            painter.fillRect(QRectF(x + left, top, right - left, self.line_height), color)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._content_changed(0)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() in (event.Type.FontChange, event.Type.StyleChange,
+                            event.Type.PaletteChange):
+            self._update_metrics()
+            self._content_changed(0)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+        self._press_pos = event.position()
+        index = self._line_at(event.position())
+        self.selection = (index, index) if index is not None else None
+        self.viewport().update()
+
+    def mouseMoveEvent(self, event):
+        pos = event.position()
+        if self._press_pos is not None and event.buttons() & Qt.MouseButton.LeftButton:
+            index = self._line_at(pos)
+            if index is not None and self.selection:
+                self.selection = (self.selection[0], index)
+                self.viewport().update()
+            return
+        cursor = Qt.CursorShape.PointingHandCursor if self._anchor_at(pos) else Qt.CursorShape.IBeamCursor
+        self.viewport().setCursor(cursor)
+
+    def mouseReleaseEvent(self, event):
+        press, self._press_pos = self._press_pos, None
+        if press is None or (event.position() - press).manhattanLength() > 4:
+            return
+        url = self._anchor_at(event.position())
+        if url:
+            QDesktopServices.openUrl(QUrl(url))
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            self.copy()
+        elif event.matches(QKeySequence.StandardKey.SelectAll):
+            self.select_all()
+        elif event.key() == Qt.Key.Key_End:
+            self.scroll_to_end()
+        elif event.key() == Qt.Key.Key_F3:
+            self.find_next(bool(event.modifiers() & Qt.KeyboardModifier.ShiftModifier))
+        else:
+            super().keyPressEvent(event)
+
+    def _show_menu(self, pos):
+        menu = QMenu(self)
+        copy_action = menu.addAction("Copy")
+        copy_action.setEnabled(self.selection is not None)
+        copy_action.triggered.connect(self.copy)
+        menu.addAction("Select All").triggered.connect(self.select_all)
+        menu.exec(self.mapToGlobal(pos))
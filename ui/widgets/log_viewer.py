@@ -0,0 +1,263 @@
+"""
+Viewer for archived run logs
+"""
+import os
+import time
+from datetime import datetime
+
+import qtawesome as qta
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QFontMetricsF, QPainter
+from PyQt6.QtWidgets import (
+    QAbstractScrollArea, QDialog, QFileDialog, QHBoxLayout, QLabel,
+    QListWidget, QListWidgetItem, QMessageBox, QPushButton, QSplitter,
+    QVBoxLayout, QWidget
+)
+
+from core.log_archive import RunLog
+from core.utils import format_duration
+
+
+TIME_COLOR = QColor("#66ccff")
+
+
+class ArchiveView(QAbstractScrollArea):
+    """
+    Read-only view over a RunLog
+
+    Only the lines on screen are read, so scrolling a multi-GB log
+    decompresses just the chunks under the viewport.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.run_log = None
+        self.max_columns = 0
+
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.TypeWriter)
+        self.setFont(font)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+        self._update_metrics()
+
+    def set_log(self, run_log):
+        self.run_log = run_log
+        self.max_columns = 0
+        self.verticalScrollBar().setValue(0)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def _update_metrics(self):
+        metrics = QFontMetricsF(self.font())
+        self.line_height = metrics.height()
+        self.char_width = metrics.horizontalAdvance("0")
+        self.gutter = self.char_width * 14
+
+    def _visible_rows(self) -> int:
+        return max(1, int(self.viewport().height() // self.line_height))
+
+    def _update_scrollbars(self):
+        lines = self.run_log.lines if self.run_log else 0
+        rows = self._visible_rows()
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, lines - rows))
+        bar.setPageStep(rows)
+        width = self.gutter + self.max_columns * self.char_width
+        self.horizontalScrollBar().setRange(0, max(0, int(width - self.viewport().width())))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+
+    def paintEvent(self, event):
+        if self.run_log is None:
+            return
+        painter = QPainter(self.viewport())
+        first = self.verticalScrollBar().value()
+        lines = self.run_log.read(first, self._visible_rows() + 1)
+        x = -self.horizontalScrollBar().value()
+        ascent = QFontMetricsF(self.font()).ascent()
+        text_color = self.palette().text().color()
+
+        widest = self.max_columns
+        for row, (timestamp, _, text) in enumerate(lines):
+            baseline = row * self.line_height + ascent
+            stamp = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:12]
+            painter.setPen(TIME_COLOR)
+            painter.drawText(int(x), int(baseline), stamp)
+            painter.setPen(text_color)
+            painter.drawText(int(x + self.gutter), int(baseline), text)
+            widest = max(widest, len(text))
+        if widest > self.max_columns:
+            self.max_columns = widest
+            self._update_scrollbars()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.FontChange:
+            self._update_metrics()
+            self._update_scrollbars()
+
+
+class ExportThread(QThread):
+    """Export a run as JSON lines without blocking the viewer"""
+    done_signal = pyqtSignal(int, str)
+
+    def __init__(self, log_path: str, out_path: str):
+        super().__init__()
+        self.log_path = log_path
+        self.out_path = out_path
+
+    def run(self):
+        try:
+            with RunLog(self.log_path) as run_log:
+                count = run_log.export_jsonl(self.out_path)
+            self.done_signal.emit(count, "")
+        except (OSError, ValueError) as e:
+            self.done_signal.emit(-1, str(e))
+
+
+class LogViewerDialog(QDialog):
+    """
+    Browse archived runs, newest first, and export them as JSON lines
+
+    Args:
+        archive: core.log_archive.LogArchive to browse
+        project_path: Only list runs of this project if given
+    """
+
+    def __init__(self, archive, project_path=None, parent=None):
+        super().__init__(parent)
+        self.archive = archive
+        self.project_path = project_path
+        self.run_log = None
+        self.export_thread = None
+        self.export_started = None  # perf_counter() when the running export began
+
+        self.setWindowTitle("Run Logs")
+        self.resize(1100, 650)
+        self._init_ui()
+        self.refresh()
+
+    def _init_ui(self):
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.run_list = QListWidget()
+        self.run_list.currentItemChanged.connect(self.open_run)
+        splitter.addWidget(self.run_list)
+
+        right = QWidget()
+        right_layout = QVBoxLayout(right)
+        right_layout.setContentsMargins(0, 0, 0, 0)
+        self.view = ArchiveView()
+        self.view.setObjectName("console")
+        right_layout.addWidget(self.view)
+        splitter.addWidget(right)
+        splitter.setSizes([300, 800])
+        layout.addWidget(splitter)
+
+        row = QHBoxLayout()
+        self.info_label = QLabel("")
+        self.info_label.setStyleSheet("color: #99ffcc; font-size: 12px;")
+
+        refresh_btn = QPushButton(" Refresh")
+        refresh_btn.setIcon(qta.icon("fa5s.sync"))
+        refresh_btn.clicked.connect(self.refresh)
+
+        self.export_btn = QPushButton(" Export JSON lines")
+        self.export_btn.setIcon(qta.icon("fa5s.file-export"))
+        self.export_btn.clicked.connect(self.export_run)
+        self.export_btn.setEnabled(False)
+
+        for btn in (refresh_btn, self.export_btn):
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        row.addWidget(self.info_label, 1)
+        row.addWidget(refresh_btn)
+        row.addWidget(self.export_btn)
+        layout.addLayout(row)
+
+    def refresh(self):
+        """Reload the list of archived runs"""
+        self.run_list.clear()
+        for path, size, meta in self.archive.runs():
+            if self.project_path and os.path.normpath(meta.get("project", "")) != self.project_path:
+                continue
+            started = datetime.fromtimestamp(meta.get("started", 0)).strftime("%Y-%m-%d %H:%M:%S")
+            name = meta.get("script") or "install"
+            item = QListWidgetItem(f"{started}  {name}  ({size / 1024 / 1024:.1f} MB)")
+            item.setData(Qt.ItemDataRole.UserRole, path)
+            item.setToolTip(f"{meta.get('project', '')}\n{meta.get('command', '')}")
+            self.run_list.addItem(item)
+
+    def open_run(self, item, previous=None):
+        """Show the selected run"""
+        if self.run_log is not None:
+            self.view.set_log(None)
+            self.run_log.close()
+            self.run_log = None
+        self.export_btn.setEnabled(False)
+        if item is None:
+            self.info_label.setText("")
+            return
+
+        started = time.perf_counter()
+        try:
+            self.run_log = RunLog(item.data(Qt.ItemDataRole.UserRole))
+        except (OSError, ValueError) as e:
+            self.info_label.setText(f"Cannot open log: {e}")
+            return
+        self.view.set_log(self.run_log)
+        self.view.viewport().repaint()
+        elapsed = time.perf_counter() - started
+
+        state = "" if self.run_log.ended else " | still running or incomplete"
+        self.info_label.setText(
+            f"{self.run_log.lines:,} lines in {self.run_log.chunks} chunks | "
+            f"{self.run_log.size / 1024 / 1024:.1f} MB compressed | "
+            f"opened in {format_duration(elapsed)}{state}"
+        )
+        self.export_btn.setEnabled(self.export_thread is None or not self.export_thread.isRunning())
+
+    def export_run(self):
+        """Export the selected run as JSON lines"""
+        if self.run_log is None:
+            return
+        default = os.path.splitext(os.path.basename(self.run_log.path))[0] + ".jsonl"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Run Log", default, "JSON Lines (*.jsonl)"
+        )
+        if not path:
+            return
+        self.export_btn.setEnabled(False)
+        self.info_label.setText(f"Exporting to {path}...")
+        self.export_started = time.perf_counter()
+        self.export_thread = ExportThread(self.run_log.path, path)
+        self.export_thread.done_signal.connect(
+            lambda count, error: self.on_export_done(path, count, error)
+        )
+        self.export_thread.start()
+
+    def on_export_done(self, path, count, error):
+        """Report the result of a background export"""
+        self.export_btn.setEnabled(self.run_log is not None)
+        if error:
+            QMessageBox.critical(self, "Error", f"Export failed: {error}")
+            return
+        text = f"Exported {count:,} lines to {path}"
+        if self.export_started is not None:
+            text += f" in {format_duration(time.perf_counter() - self.export_started)}"
+        self.info_label.setText(text)
+
+    def done(self, result):
+        if self.export_thread is not None:
+            self.export_thread.wait()
+        if self.run_log is not None:
+            self.view.set_log(None)
+            self.run_log.close()
+            self.run_log = None
+        super().done(result)
@@ -3,6 +3,7 @@ Recent projects widget
 """
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QListWidget
 
 from core.constants import RECENT_FILE
@@ -14,6 +15,9 @@ class RecentWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_app = parent
+        # One writer thread keeps saves in order and off the GUI thread
+        self.writer = ThreadPoolExecutor(max_workers=1)
+        self.paths = []
         
         layout = QVBoxLayout(self)
         
@@ -23,22 +27,28 @@ class RecentWidget(QWidget):
     
     def load_recent(self):
         """Load and display recent projects"""
-        paths = self.read_recent()
+        self.show_recent([path for path in self.read_recent() if os.path.isdir(path)])
+    
+    def show_recent(self, paths):
+        """Display recent project paths"""
+        self.paths = paths
         self.recent_list.clear()
         
         for path in paths:
-            if os.path.isdir(path):
-                project_name = os.path.basename(path)
-                self.recent_list.addItem(f"📁 {project_name}\n   {path}")
+            project_name = os.path.basename(path)
+            self.recent_list.addItem(f"📁 {project_name}\n   {path}")
     
     def save_recent(self, path):
         """
         Save project to recent list
         
+        The list is updated at once; the file is written on the writer
+        thread, so a slow disk does not hold up loading the project.
+        
         Args:
             path: Project path to save
         """
-        paths = self.read_recent()
+        paths = list(self.paths)
         
         # Remove if already exists (to move to top)
         if path in paths:
@@ -50,13 +60,16 @@ class RecentWidget(QWidget):
         # Keep only last 10
         paths = paths[:10]
         
+        self.writer.submit(self.write_recent, paths)
+        self.show_recent(paths)
+    
+    def write_recent(self, paths):
+        """Write the recent list to file (writer thread)"""
         try:
             with open(RECENT_FILE, "w", encoding="utf-8") as f:
                 json.dump(paths, f, indent=2)
         except Exception as e:
             print(f"Error saving recent: {e}")
-        
-        self.load_recent()
     
     def read_recent(self):
         """
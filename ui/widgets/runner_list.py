@@ -0,0 +1,169 @@
+"""
+Concurrent script runs of a terminal tab
+"""
+import html
+
+import qtawesome as qta
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton, QWidget
+)
+
+from core.utils import format_duration
+
+
+RUN_COLORS = [
+    "#ff77ff", "#66ccff", "#99ffcc", "#ffcc66",
+    "#ff9966", "#cc99ff", "#66ffcc", "#ff6699"
+]
+
+
+class ScriptRun:
+    """
+    One named runner of a terminal tab
+
+    A run keeps its console and state across restarts; ``handle`` is the
+    ProcessHandle of the current process, if any.
+
+    Args:
+        name: Label shown in prefixes and the runner list
+        script: package.json script, None for an install
+        color: Prefix color
+        console: ConsoleView with this run's output only
+    """
+
+    def __init__(self, name, script, color, console):
+        self.name = name
+        self.script = script
+        self.color = color
+        self.console = console
+        self.handle = None
+        # (cmd, env, cwd) of a task graph task; restarts rerun it instead of the script
+        self.command = None
+        # Task cache: key and captured output of a run to store on success
+        self.cache_key = None
+        self.cache_outputs = []
+        self.captured = None
+        self.cache_store = None  # store_async() thread still reading the outputs
+        self.store_wait = False  # A start is waiting for cache_store
+        self.cache_lookup = None  # CacheLookup hashing the inputs before a start
+        # Install runs: InstallPlan being run and its InstallTracker
+        self.install_plan = None
+        self.install_tracker = None
+        self.state = "idle"
+        self.exit_code = None
+        self.started_at = None
+        self.finished_at = None
+        self.live = []
+        # Auto-run / restart bookkeeping
+        self.restart_pending = False
+        self.restart_change = None
+        self.restart_change_time = None
+        self.restart_latency = 0.0
+        self.awaiting_first_output = False
+
+        label = html.escape(name)
+        self.text_prefix = f"[{name}] "
+        self.html_prefix = f"<span style='color:{color};'>[{label}]</span> "
+
+    def is_running(self) -> bool:
+        return self.handle is not None and self.handle.is_running()
+
+    def prefixed(self, lines) -> list:
+        """``(text, html)`` lines with this run's ``[name]`` prefix"""
+        text_prefix = self.text_prefix
+        html_prefix = self.html_prefix
+        return [(text_prefix + text, html_prefix + markup) for text, markup in lines]
+
+    def status_text(self) -> str:
+        """Short state for the runner list"""
+        if self.state in ("running", "stopping", "restarting", "checking cache"):
+            return self.state
+        elapsed = ""
+        if self.started_at is not None and self.finished_at is not None:
+            elapsed = f" after {format_duration(self.finished_at - self.started_at)}"
+        if self.state == "exited":
+            if self.exit_code:
+                return f"failed (exit {self.exit_code}){elapsed}"
+            return f"exited{elapsed}"
+        return f"{self.state}{elapsed}"
+
+
+class RunnerListWidget(QListWidget):
+    """
+    Rows of ScriptRuns with their status and stop/restart/remove buttons
+
+    Signals carry the run name.
+    """
+    restart_requested = pyqtSignal(str)
+    stop_requested = pyqtSignal(str)
+    remove_requested = pyqtSignal(str)
+
+    STATE_COLORS = {
+        "running": "#99ffcc",
+        "cached": "#66ccff",
+        "checking cache": "#66ccff",
+        "restarting": "#ffcc66",
+        "stopping": "#ffcc66",
+        "stopped": "#ff6666",
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = {}
+
+    def add_run(self, run):
+        item = QListWidgetItem()
+        item.setData(Qt.ItemDataRole.UserRole, run.name)
+        row = QWidget()
+        layout = QHBoxLayout(row)
+        layout.setContentsMargins(6, 2, 6, 2)
+
+        name = QLabel(f"<span style='color:{run.color};'>●</span> {html.escape(run.name)}")
+        status = QLabel("")
+        status.setStyleSheet("font-size: 12px;")
+        layout.addWidget(name)
+        layout.addWidget(status, 1)
+
+        buttons = {}
+        for key, icon, tip, signal in (
+            ("restart", "fa5s.redo", "Restart", self.restart_requested),
+            ("stop", "fa5s.stop", "Stop", self.stop_requested),
+            ("remove", "fa5s.times", "Remove from the list", self.remove_requested),
+        ):
+            btn = QPushButton()
+            btn.setIcon(qta.icon(icon))
+            btn.setToolTip(tip)
+            btn.setFixedSize(26, 22)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.clicked.connect(lambda _, s=signal, n=run.name: s.emit(n))
+            layout.addWidget(btn)
+            buttons[key] = btn
+
+        item.setSizeHint(row.sizeHint())
+        self.addItem(item)
+        self.setItemWidget(item, row)
+        self._rows[run.name] = (item, status, buttons)
+        self.update_run(run)
+
+    def update_run(self, run):
+        """Refresh a run's status and buttons"""
+        if run.name not in self._rows:
+            return
+        _, status, buttons = self._rows[run.name]
+        state = run.status_text()
+        color = self.STATE_COLORS.get(run.state, "#ff6666" if run.exit_code else "#cccccc")
+        status.setText(f"<span style='color:{color};'>{html.escape(state)}</span>")
+        running = run.is_running() or run.cache_lookup is not None
+        buttons["stop"].setEnabled(running and run.state != "stopping")
+        buttons["remove"].setEnabled(not running)
+
+    def remove_run(self, name):
+        if name not in self._rows:
+            return
+        item, _, _ = self._rows.pop(name)
+        self.takeItem(self.row(item))
+
+    def selected_name(self):
+        item = self.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
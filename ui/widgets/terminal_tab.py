@@ -3,22 +3,49 @@ Terminal tab widget for running scripts
 """
 import os
 import re
+import time
 import subprocess
 from datetime import datetime
 
 import qtawesome as qta
-from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QIcon, QTextCursor
+from PyQt6.QtCore import Qt, QSize, QTimer
+from PyQt6.QtGui import QIcon, QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QPushButton, QLineEdit, QListWidget, QTextBrowser, QMessageBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+    QPushButton, QLineEdit, QListWidget, QMessageBox, QCheckBox, QStackedWidget
 )
 
-from core.utils import resource_path
-from core.watcher import FileWatcherThread
-from core.runner import RunnerThread
+from core.utils import resource_path, format_duration
+from core.tree_remover import TreeRemover
+from core.project_loader import ProjectLoader
+from core.watch_hub import WatchHub
+from core.supervisor import ProcessSupervisor
+from core.stream import PTY_SUPPORTED
+from core.log_archive import LogArchive
+from core.search_index import SearchQuery
+from core.task_graph import TaskScheduler
+from core.task_cache import TaskCache
+from core.cache_lookup import CacheLookup
+from ui.widgets.console_view import ConsoleView
+from ui.widgets.log_viewer import LogViewerDialog
+from ui.widgets.runner_list import RUN_COLORS, RunnerListWidget, ScriptRun
 from services.package_manager import PackageManagerService
 from services.file_service import FileService
+from services.settings_service import SettingsService
+from services.project_config_service import ProjectConfigService
+from services.script_exec_service import ScriptExecService
+from services.task_graph_service import TaskGraphService
+from services.workspace_service import WorkspaceService
+from services.install_state_service import InstallStateService
+from services.install_service import InstallService, InstallPlan, InstallTracker
+from services.manifest_service import ManifestService
+
+
+URL_PATTERN = re.compile(r"((http|https)://[^\s<]+)")
+URL_LINK = r'<a href="\1" style="color:#66ccff;">\1</a>'
+
+# Runs printing more than this are not stored in the task cache
+CACHE_CAPTURE_LINES = 200000
 
 
 class TerminalTab(QWidget):
@@ -28,9 +55,19 @@ class TerminalTab(QWidget):
         super().__init__(parent)
         
         self.project_path = None
-        self.runner = None
+        self.runs = {}
+        self.next_color = 0
+        self.task_scheduler = None
+        self.project_loader = None
+        self.workspace_root = None
+        self.install_inputs = None
+        self.removers = []
+        self.removal_live = {}
+        self.install_after_removal = False
+        self.workspaces = []
+        self.current_script = None
         self.scripts = {}
-        self.file_watcher = None
+        self.watch_subscription = None
         self.parent_app = parent
         
         self.package_service = PackageManagerService()
@@ -70,13 +107,26 @@ class TerminalTab(QWidget):
         # Run/Stop buttons
         layout.addLayout(self._create_control_buttons())
         
-        # Console
-        self.console = QTextBrowser()
-        self.console.setOpenExternalLinks(True)
-        self.console.setOpenLinks(True)
-        self.console.setReadOnly(True)
-        self.console.setObjectName("console")
-        layout.addWidget(self.console)
+        # Concurrent runners
+        self.runner_list = RunnerListWidget()
+        self.runner_list.setMaximumHeight(110)
+        self.runner_list.setVisible(False)
+        self.runner_list.restart_requested.connect(self.restart_run)
+        self.runner_list.stop_requested.connect(self.stop_run)
+        self.runner_list.remove_requested.connect(self.remove_run)
+        self.runner_list.itemClicked.connect(
+            lambda item: self.show_output(item.data(Qt.ItemDataRole.UserRole))
+        )
+        layout.addWidget(self.runner_list)
+        
+        # Console search
+        layout.addLayout(self._create_console_search())
+        
+        # Console: all runners multiplexed, plus one console per runner
+        self.console = self.new_console()
+        self.console_stack = QStackedWidget()
+        self.console_stack.addWidget(self.console)
+        layout.addWidget(self.console_stack)
         
         # Status bar
         self.status_label = QLabel("Ready")
@@ -191,6 +241,25 @@ class TerminalTab(QWidget):
         self.run_btn.clicked.connect(self.run_script)
         self.run_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         
+        self.graph_btn = QPushButton(" Run Graph")
+        self.graph_btn.setIcon(qta.icon("fa5s.project-diagram"))
+        self.graph_btn.setToolTip(
+            "Run the selected script as a task graph: its npm run / run-p steps, "
+            "hooks and .autorunner.json dependencies, independent ones in parallel"
+        )
+        self.graph_btn.clicked.connect(self.run_task_graph)
+        self.graph_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        
+        self.workspaces_btn = QPushButton(" Workspaces")
+        self.workspaces_btn.setIcon(qta.icon("fa5s.sitemap"))
+        self.workspaces_btn.setToolTip(
+            "Run the selected script in every workspace that has it, "
+            "dependencies first and independent packages in parallel"
+        )
+        self.workspaces_btn.clicked.connect(self.run_in_workspaces)
+        self.workspaces_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.workspaces_btn.setVisible(False)
+        
         self.stop_btn = QPushButton(" Stop")
         self.stop_btn.setIcon(qta.icon("fa5s.stop"))
         self.stop_btn.clicked.connect(self.stop_script)
@@ -201,12 +270,138 @@ class TerminalTab(QWidget):
         self.clear_btn.clicked.connect(self.clear_console)
         self.clear_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         
+        self.logs_btn = QPushButton(" Logs")
+        self.logs_btn.setIcon(qta.icon("fa5s.history"))
+        self.logs_btn.setToolTip("Browse and export archived run logs")
+        self.logs_btn.clicked.connect(self.show_run_logs)
+        self.logs_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        
+        self.stop_btn.setToolTip("Stop every script running in this tab")
+        
+        self.auto_run_check = QCheckBox("Auto-run on change")
+        self.auto_run_check.setToolTip(
+            "Restart the running scripts (or the selected one) when project files change"
+        )
+        self.auto_run_check.setCursor(Qt.CursorShape.PointingHandCursor)
+        
         row.addWidget(self.run_btn)
+        row.addWidget(self.graph_btn)
+        row.addWidget(self.workspaces_btn)
         row.addWidget(self.stop_btn)
         row.addWidget(self.clear_btn)
+        row.addWidget(self.logs_btn)
+        row.addWidget(self.auto_run_check)
+        
+        return row
+    
+    def _create_console_search(self):
+        """Create the console output search bar"""
+        row = QHBoxLayout()
+        
+        self.output_filter = QComboBox()
+        self.output_filter.setToolTip("Output to show")
+        self.output_filter.addItem("All output", None)
+        self.output_filter.currentIndexChanged.connect(self.on_output_filter_changed)
+        
+        self.console_search = QLineEdit()
+        self.console_search.setPlaceholderText("Search output...")
+        self.console_search.addAction(qta.icon("fa5s.search"), QLineEdit.ActionPosition.LeadingPosition)
+        self.console_search.textChanged.connect(self.search_console)
+        self.console_search.returnPressed.connect(lambda: self.shown_console().find_next())
+        QShortcut(QKeySequence("Shift+Return"), self.console_search,
+                  lambda: self.shown_console().find_next(backwards=True),
+                  context=Qt.ShortcutContext.WidgetShortcut)
+        QShortcut(QKeySequence.StandardKey.Find, self, self.focus_console_search)
+        
+        self.regex_check = QCheckBox(".*")
+        self.regex_check.setToolTip("Regular expression")
+        self.regex_check.toggled.connect(lambda: self.search_console(self.console_search.text()))
+        
+        self.search_prev_btn = QPushButton()
+        self.search_prev_btn.setIcon(qta.icon("fa5s.chevron-up"))
+        self.search_prev_btn.setToolTip("Previous match (Shift+Enter)")
+        self.search_prev_btn.clicked.connect(lambda: self.shown_console().find_next(backwards=True))
+        
+        self.search_next_btn = QPushButton()
+        self.search_next_btn.setIcon(qta.icon("fa5s.chevron-down"))
+        self.search_next_btn.setToolTip("Next match (Enter)")
+        self.search_next_btn.clicked.connect(lambda: self.shown_console().find_next())
         
+        self.search_label = QLabel("")
+        self.search_label.setStyleSheet("font-size: 12px;")
+        
+        row.addWidget(self.output_filter)
+        row.addWidget(self.console_search)
+        row.addWidget(self.regex_check)
+        row.addWidget(self.search_prev_btn)
+        row.addWidget(self.search_next_btn)
+        row.addWidget(self.search_label)
         return row
     
+    def focus_console_search(self):
+        self.console_search.setFocus()
+        self.console_search.selectAll()
+    
+    def new_console(self):
+        """Create a console with the scrollback limits from the settings"""
+        console = ConsoleView(
+            max_lines=self.get_setting("scrollback_lines"),
+            max_bytes=self.get_setting("scrollback_mb") * 1024 * 1024
+        )
+        console.setObjectName("console")
+        console.search_updated.connect(lambda: self.update_search_label(console))
+        return console
+    
+    def shown_console(self):
+        """Console currently on screen (all output or one runner's)"""
+        return self.console_stack.currentWidget()
+    
+    def show_output(self, name):
+        """Show all output (None) or one runner's output"""
+        index = self.output_filter.findData(name) if name else 0
+        self.output_filter.setCurrentIndex(max(index, 0))
+    
+    def on_output_filter_changed(self, index):
+        """Switch the console to the output picked in the filter"""
+        run = self.runs.get(self.output_filter.itemData(index))
+        console = run.console if run else self.console
+        if console is self.shown_console():
+            return
+        self.shown_console().set_search(None)
+        self.console_stack.setCurrentWidget(console)
+        self.search_console(self.console_search.text())
+    
+    def search_console(self, text):
+        """Search console output as the query is typed"""
+        console = self.shown_console()
+        if not text:
+            console.set_search(None)
+            return
+        try:
+            query = SearchQuery(text, regex=self.regex_check.isChecked())
+        except re.error:
+            console.set_search(None)
+            self.search_label.setText("<span style='color:#ff6666;'>Invalid pattern</span>")
+            return
+        console.set_search(query)
+        console.find_next()
+    
+    def update_search_label(self, console=None):
+        """Show the match count and the position of the current match"""
+        if console is None:
+            console = self.shown_console()
+        if console is not self.shown_console():
+            return
+        if console.search is None:
+            self.search_label.setText("")
+            return
+        total = f"{console.hit_count}" if console.count_complete else f"{console.hit_count}+"
+        if console.hit_count == 0 and console.count_complete:
+            self.search_label.setText("No matches")
+            return
+        rank = console.hit_rank()
+        self.search_label.setText(f"{rank if rank else '?'} / {total}")
+    
     def filter_scripts(self, text):
         """Filter script list by search text"""
         for i in range(self.script_list.count()):
@@ -231,36 +426,127 @@ class TerminalTab(QWidget):
             os.startfile(self.project_path)
     
     def clear_console(self):
-        """Clear console output"""
-        self.console.clear()
+        """Clear the console on screen"""
+        console = self.shown_console()
+        console.clear()
+        if console is not self.console:
+            return
         timestamp = datetime.now().strftime('%H:%M:%S')
         self.log(f"<span style='color:#99ffcc;'>Console cleared at {timestamp}</span>")
     
-    def check_node_modules(self):
-        """Check if node_modules exists"""
-        has_modules = self.file_service.has_node_modules(self.project_path)
+    def check_node_modules(self, check=None):
+        """
+        Check that node_modules exists and matches the lockfile and package.json
+        
+        Args:
+            check: ``InstallStateService.check()`` already run off the GUI thread
+        """
+        self.install_inputs = self.install_inputs_stamp()
+        if check is None:
+            check = InstallStateService.check(self.project_path)
+        took = format_duration(check["elapsed"])
         
-        if not has_modules:
+        if check["state"] == "missing":
             self.log("<span style='color:#ffcc00;'>⚠️ node_modules not found. Install needed.</span>")
             self.install_btn.setEnabled(True)
             self.reinstall_btn.setEnabled(False)
+        elif check["state"] == "stale":
+            changes = InstallStateService.describe_changes(check)
+            self.log(
+                f"<span style='color:#ffcc00;'>⚠️ Install needed: {check['reason']}"
+                f"{': ' + changes if changes else ''} (checked in {took})</span>"
+            )
+            self.install_btn.setEnabled(True)
+            self.reinstall_btn.setEnabled(True)
         else:
-            self.log("<span style='color:#99ffcc;'>✅ node_modules detected.</span>")
+            self.log(
+                f"<span style='color:#99ffcc;'>✅ node_modules up to date: "
+                f"{check['reason']} (checked in {took}).</span>"
+            )
             self.install_btn.setEnabled(False)
             self.reinstall_btn.setEnabled(True)
     
+    def install_inputs_stamp(self):
+        """mtimes of package.json and the lockfile, to notice when they change"""
+        paths = [os.path.join(self.project_path, "package.json")]
+        lockfile = PackageManagerService.find_lockfile(self.project_path)
+        if lockfile:
+            paths.append(lockfile)
+        stamp = []
+        for path in paths:
+            try:
+                stamp.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                stamp.append((path, None))
+        return stamp
+    
     def install_dependencies(self):
         """Install project dependencies"""
-        cmd = self.package_service.get_install_command()
-        self.log(f"<b>Installing:</b> {cmd}")
+        manager = self.package_service.package_manager
+        run = self.get_run(f"{manager} install", None)
+        if run.is_running():
+            return
+        plan = InstallService.plan(
+            self.project_path, manager,
+            version=self.package_service.package_manager_version,
+            strategy=self.get_setting("install_strategy")
+        )
+        self.log_run(
+            run,
+            f"<b>Installing:</b> {plan.command} "
+            f"<span style='color:#aaaaaa;'>({plan.strategy}: {'; '.join(plan.reasons)})</span>"
+        )
+        self.launch_install(run, plan)
         self.status_label.setText("Installing dependencies...")
+    
+    def launch_install(self, run, plan):
+        """Start an install run and track its phases"""
+        self.launch(run, plan.command, None, self.new_log_writer(None, plan.command))
+        run.install_plan = plan
+        run.install_tracker = InstallTracker(plan.manager, run.started_at)
+    
+    def finish_install(self, run):
+        """
+        Record an install's phase timings in the project's history
+        
+        Returns:
+            bool: True if a frozen install failed on a stale lockfile and
+            the plain install was started in its place
+        """
+        plan, tracker = run.install_plan, run.install_tracker
+        run.install_tracker = None
+        if run.state != "running":
+            return False  # Stopped by the user: not a representative timing
         
-        self.runner = RunnerThread(cmd, self.project_path)
-        self.runner.log_signal.connect(self.log)
-        self.runner.finished_signal.connect(
-            lambda: self.status_label.setText("Installation complete")
+        if run.exit_code != 0 and tracker.out_of_sync and plan.fallback:
+            self.log_run(
+                run,
+                f"<span style='color:#ffcc00;'>🔁 The lockfile is out of date for a "
+                f"{plan.strategy} install; retrying with: {plan.fallback}</span>"
+            )
+            self.launch_install(run, InstallPlan(
+                plan.manager, plan.fallback, "install",
+                ["lockfile out of date"], lockfile=plan.lockfile
+            ))
+            return True
+        
+        entry = InstallService.record(
+            self.project_path, plan, run.exit_code, tracker.finish(run.finished_at)
+        )
+        if run.exit_code != 0:
+            return False
+        summary = InstallService.describe(entry)
+        self.log_run(
+            run,
+            f"<span style='color:#99ffcc;'>⏱️ {plan.strategy} install took "
+            f"{format_duration(entry['total'])}{': ' + summary if summary else ''}</span>"
         )
-        self.runner.start()
+        regression = InstallService.regression(InstallService.load_history(self.project_path), entry)
+        if regression:
+            self.log_run(
+                run, f"<span style='color:#ffcc00;'>🐢 Install slower than usual: {regression}</span>"
+            )
+        return False
     
     def reinstall_dependencies(self):
         """Reinstall dependencies (remove and install)"""
@@ -276,110 +562,919 @@ class TerminalTab(QWidget):
             self.log("<span style='color:#ffaa00;'>Reinstall canceled.</span>")
             return
         
-        self.log("<span style='color:#ff6666;'>🗑️ Removing node_modules...</span>")
-        self.file_service.remove_node_modules(self.project_path)
+        node_modules = os.path.join(self.project_path, "node_modules")
+        if os.path.exists(node_modules):
+            trash = self.file_service.remove_node_modules(self.project_path)
+            if trash is None:
+                # Usually a file held open by a running script (Windows)
+                self.log(
+                    "<span style='color:#ff6666;'>🗑️ Could not move node_modules aside; "
+                    "deleting it before installing...</span>"
+                )
+                self.install_after_removal = True
+                self.remove_trees([node_modules], "node_modules")
+                return
+            self.log(
+                "<span style='color:#ff6666;'>🗑️ Moved node_modules aside, "
+                "deleting it in the background</span>"
+            )
+            self.remove_trees([trash], "old node_modules")
         
         self.log("<span style='color:#ffaa00;'>Reinstalling dependencies...</span>")
         self.install_dependencies()
     
+    def remove_trees(self, paths, label):
+        """Delete directory trees on a background thread, with progress under the output"""
+        remover = TreeRemover()
+        remover.progress_signal.connect(self.on_removal_progress)
+        remover.finished_signal.connect(self.on_removal_finished)
+        self.removers.append(remover)
+        self.removal_live[label] = []
+        remover.start(paths, label)
+    
+    def on_removal_progress(self, label, removed, elapsed):
+        if label not in self.removal_live:
+            return
+        text = f"🗑️ Deleting {label}: {removed:,} entries ({format_duration(elapsed)})"
+        self.removal_live[label] = [(text, f"<span style='color:#ff9999;'>{text}</span>")]
+        self.refresh_live()
+    
+    def on_removal_finished(self, label, removed, errors, elapsed):
+        self.removers = [remover for remover in self.removers if remover.is_running()]
+        self.removal_live.pop(label, None)
+        self.refresh_live()
+        failed = f", {errors} could not be deleted" if errors else ""
+        self.log(
+            f"<span style='color:{'#ffcc00' if errors else '#99ffcc'};'>🗑️ Deleted {label}: "
+            f"{removed:,} entries in {format_duration(elapsed)}{failed}</span>"
+        )
+        if label == "node_modules" and self.install_after_removal:
+            self.install_after_removal = False
+            self.log("<span style='color:#ffaa00;'>Reinstalling dependencies...</span>")
+            self.install_dependencies()
+    
     def load_project(self, project_path):
-        """Load a project"""
+        """
+        Load a project
+        
+        The filesystem work runs on a ProjectLoader thread, one stage at a
+        time, and the tab fills in as each stage finishes: scripts, package
+        manager, workspaces, then the install check.
+        """
         normalized_path = os.path.normpath(project_path)
         
-        # Validate package.json
-        if not self.file_service.has_package_json(normalized_path):
-            QMessageBox.critical(self, "Error", "package.json not found!")
-            return
+        if self.project_loader:
+            self.project_loader.cancel()
         
-        # Set project
-        self.project_path = normalized_path
+        def read_manifest(results):
+            manifest = ManifestService.load(normalized_path)
+            if manifest is None:
+                raise FileNotFoundError("package.json not found!")
+            return manifest
         
-        # Detect package manager
-        self.package_service.detect_package_manager(self.project_path)
+        self.project_loader = ProjectLoader(normalized_path, [
+            ("manifest", read_manifest),
+            ("package manager", lambda results: PackageManagerService.find_package_manager(normalized_path)),
+            ("workspaces", lambda results: WorkspaceService.discover(normalized_path)),
+            ("install state", lambda results: InstallStateService.check(normalized_path)),
+            ("leftover trash", lambda results: FileService.find_trash(normalized_path)),
+        ], parent=self)
+        self.project_loader.stage_done.connect(self.on_load_stage)
+        self.project_loader.stage_failed.connect(self.on_load_failed)
+        self.project_loader.loaded.connect(self.on_project_loaded)
+        self.project_loader.finished.connect(self.project_loader.deleteLater)
+        self.status_label.setText(f"Loading {os.path.basename(normalized_path)}...")
+        self.project_loader.start()
+    
+    def on_load_stage(self, stage, result, elapsed):
+        """Apply one finished loading stage"""
+        if self.sender() is not self.project_loader:
+            return  # A newer load replaced this one
         
-        # Update UI
-        project_name = os.path.basename(self.project_path)
-        pm_name = self.package_service.package_manager
-        self.info.setText(f"📦 {project_name} | Package Manager: {pm_name}")
+        if stage == "manifest":
+            self.show_manifest(self.project_loader.project_path, result)
+        elif stage == "package manager":
+            manager, version = result
+            self.package_service.package_manager = manager
+            self.package_service.package_manager_version = version
+            self.info.setText(f"📦 {os.path.basename(self.project_path)} | Package Manager: {manager}")
+        elif stage == "workspaces":
+            self.workspace_root, self.workspaces = result
+            self.show_workspaces(elapsed)
+        elif stage == "install state":
+            self.check_node_modules(result)
+        elif stage == "leftover trash":
+            # Finish deleting trash left by an interrupted Reinstall
+            if result and not self.removers:
+                self.log(
+                    f"<span style='color:#ffcc99;'>🗑️ Deleting {len(result)} leftover "
+                    f"node_modules cop{'y' if len(result) == 1 else 'ies'} from an earlier session</span>"
+                )
+                self.remove_trees(result, "leftover trash")
+    
+    def on_load_failed(self, stage, message):
+        if self.sender() is not self.project_loader:
+            return
+        self.project_loader = None
+        self.status_label.setText("Ready")
+        if stage == "manifest":
+            QMessageBox.critical(self, "Error", message)
+        else:
+            self.log(f"<span style='color:#ff6666;'>❌ Loading failed at {stage}: {message}</span>")
+    
+    def on_project_loaded(self, timings):
+        """Report how long each loading stage took"""
+        if self.sender() is not self.project_loader:
+            return
+        total = time.perf_counter() - self.project_loader.started_at
+        self.project_loader = None
+        if not self.update_run_status():
+            self.status_label.setText("Ready")
+        stages = ", ".join(f"{name} {format_duration(seconds)}" for name, seconds in timings)
+        self.log(
+            f"<span style='color:#99ffcc;'>📂 Project loaded in {format_duration(total)} "
+            f"({stages})</span>"
+        )
+    
+    def show_manifest(self, project_path, manifest):
+        """Set the project and show its scripts as soon as package.json is parsed"""
+        self.project_path = project_path
+        self.info.setText(f"📦 {os.path.basename(project_path)} | Package Manager: ...")
+        if manifest.error:
+            self.log(f"<span style='color:#ff6666;'>❌ Could not read package.json: {manifest.error}</span>")
         
         # Save to recent
         if self.parent_app:
             self.parent_app.recent_widget.save_recent(self.project_path)
         
         # Load scripts
-        scripts = self.file_service.load_scripts(self.project_path)
-        self.scripts = scripts
+        self.scripts = manifest.scripts
+        self.workspace_root, self.workspaces = None, []
+        self.workspaces_btn.setVisible(False)
         
         self.script_list.clear()
-        for script_name in scripts:
+        for script_name in self.scripts:
             self.script_list.addItem(f"▶️ {script_name}")
         
-        # Check dependencies
-        self.check_node_modules()
-        
         # Enable buttons
         self.open_vscode_btn.setEnabled(True)
         self.open_explorer_btn.setEnabled(True)
         
-        # Start file watcher
-        if self.file_watcher:
-            self.file_watcher.stop()
+        # Subscribe to file changes (shared with other tabs on the same tree)
+        self.stop_watching()
         
-        self.file_watcher = FileWatcherThread(self.project_path)
-        self.file_watcher.file_changed.connect(self.on_file_changed)
-        self.file_watcher.start()
+        watch_config = ProjectConfigService.get_watch_config(self.project_path)
+        self.watch_subscription = WatchHub.instance().subscribe(
+            self.project_path,
+            self.on_files_changed,
+            self.on_watch_mode_changed,
+            mode=self.get_setting("watch_mode"),
+            quiet_ms=self.get_setting("watch_quiet_ms"),
+            storm_threshold=self.get_setting("watch_storm_threshold"),
+            include=watch_config["include"],
+            exclude=watch_config["exclude"],
+            use_gitignore=watch_config["gitignore"],
+            verify_content=self.get_setting("watch_verify_content")
+        )
     
-    def on_file_changed(self, filename):
-        """Handle file change event"""
-        self.log(f"<span style='color:#ffcc99;'>📝 File changed: {filename}</span>")
+    def show_workspaces(self, elapsed):
+        """Show the discovered workspaces of the project's monorepo, if any"""
+        self.workspaces_btn.setVisible(bool(self.workspaces))
+        if not self.workspaces:
+            return
+        
+        self.info.setText(f"{self.info.text()} | {len(self.workspaces)} workspaces")
+        self.log(
+            f"<span style='color:#99ffcc;'>📦 {len(self.workspaces)} workspaces found "
+            f"in {format_duration(elapsed)}</span>"
+        )
+        for name, paths in WorkspaceService.duplicate_names(self.workspaces).items():
+            where = ", ".join(os.path.relpath(path, self.workspace_root) for path in paths)
+            self.log(
+                f"<span style='color:#ffaa00;'>⚠️ Workspace name {name} is "
+                f"declared {len(paths)} times ({where}); "
+                f"dependencies on it are ignored</span>"
+            )
+        counts = {}
+        for workspace in self.workspaces:
+            for script_name in workspace.scripts:
+                counts[script_name] = counts.get(script_name, 0) + 1
+        for index in range(self.script_list.count()):
+            item = self.script_list.item(index)
+            name = item.text().replace("▶️ ", "")
+            if name in counts:
+                item.setToolTip(f"Also in {counts[name]} workspaces")
+        for script_name in sorted(set(counts) - set(self.scripts)):
+            self.script_list.addItem(f"▶️ {script_name}")
+            item = self.script_list.item(self.script_list.count() - 1)
+            item.setToolTip(f"Workspaces only ({counts[script_name]}): runs in each of them")
     
-    def run_script(self):
-        """Run selected script"""
-        if self.runner and self.runner.isRunning():
-            QMessageBox.warning(self, "Warning", "Script already running!")
+    def stop_watching(self):
+        """Release this tab's file watch subscription"""
+        if self.watch_subscription:
+            WatchHub.instance().unsubscribe(self.watch_subscription)
+            self.watch_subscription = None
+    
+    def get_setting(self, key):
+        """Get a value from application settings"""
+        default = SettingsService.DEFAULT_SETTINGS.get(key)
+        if self.parent_app:
+            return self.parent_app.settings.get(key, default)
+        return default
+    
+    def on_watch_mode_changed(self, mode):
+        """Handle watcher backend selection"""
+        if mode.startswith("failed"):
+            self.log(
+                f"<span style='color:#ff6666;'>❌ File watching stopped ({mode[len('failed: '):]}). "
+                f"Set the watch mode to auto or poll to keep watching.</span>"
+            )
             return
+        label = "file system events" if mode == "events" else "polling"
+        self.log(f"<span style='color:#99ffcc;'>👀 Watching files ({label})</span>")
+    
+    def on_files_changed(self, change_set):
+        """Handle a coalesced batch of file changes"""
+        if change_set.storm:
+            self.log(
+                f"<span style='color:#ffcc99;'>🌪️ Change storm: {change_set.summary()}</span>"
+            )
+        else:
+            summary = change_set.summary()
+            if change_set.unchanged:
+                summary += f" ({change_set.unchanged} saved without edits ignored)"
+            self.log(f"<span style='color:#ffcc99;'>📝 Changed: {summary}</span>")
         
+        if self.install_inputs != self.install_inputs_stamp():
+            self.check_node_modules()
+        
+        if self.auto_run_check.isChecked():
+            self.schedule_restart(change_set.first_event)
+    
+    def selected_script(self):
+        """Get the script name of the selected list item"""
         item = self.script_list.currentItem()
         if not item:
+            return None
+        return item.text().replace("▶️ ", "")
+    
+    def schedule_restart(self, change_time):
+        """
+        Restart the running scripts after a file change
+        
+        Every running script is restarted; with none running, the current
+        (or selected) script is started. Restarts requested while a runner
+        is still stopping collapse into its pending restart.
+        
+        Args:
+            change_time: time.monotonic() of the earliest triggering change
+        """
+        if any(run.script is None and run.is_running() for run in self.runs.values()):
+            self.log("<span style='color:#ffaa00;'>Auto-run skipped: install in progress.</span>")
+            return
+        
+        # Task graph tasks are left to their scheduler
+        runs = [
+            run for run in self.runs.values()
+            if run.script and run.command is None and (run.is_running() or run.restart_pending)
+        ]
+        if runs:
+            for run in runs:
+                self.restart_run(run.name, change_time)
+            return
+        
+        script_name = self.current_script or self.selected_script()
+        if not script_name:
+            return
+        self.log(f"<span style='color:#99ffcc;'>🔁 Auto-run: {script_name}</span>")
+        self.start_script(script_name, change_time)
+    
+    def restart_run(self, name, change_time=None):
+        """
+        Restart one runner once its current process has stopped
+        
+        Args:
+            name: Runner name
+            change_time: Triggering change time for auto-run latency metrics
+        """
+        run = self.runs.get(name)
+        if run is None or run.restart_pending:
+            # Already waiting for the old process to exit
+            return
+        run.restart_pending = True
+        run.restart_change = change_time
+        
+        if run.is_running():
+            run.state = "restarting"
+            self.runner_list.update_run(run)
+            self.status_label.setText(f"Restarting: {name}")
+            run.handle.stop()
+        else:
+            self._start_pending_restart(run)
+    
+    def _start_pending_restart(self, run):
+        """Start a runner's queued restart, if any"""
+        if not run.restart_pending:
+            return
+        change_time = run.restart_change
+        run.restart_pending = False
+        run.restart_change = None
+        
+        if run.script is None:
+            self.install_dependencies()
+            return
+        if run.command is not None:
+            cmd, env, cwd = run.command
+            shown = ScriptExecService.describe(cmd)
+            self.log_run(run, f"<b>Task:</b> {shown}")
+            self.launch(run, cmd, env, self.new_log_writer(run.script, shown), change_time, cwd)
             return
+        label = "Auto-run" if change_time is not None else "Restart"
+        self.log(f"<span style='color:#99ffcc;'>🔁 {label}: {run.name}</span>")
+        self.start_script(run.script, change_time)
+    
+    def run_script(self):
+        """Run selected script next to the ones already running"""
+        script_name = self.selected_script()
+        if not script_name:
+            return
+        
+        if script_name not in self.scripts and self.workspaces:
+            self.run_in_workspaces()
+            return
+        
+        run = self.runs.get(script_name)
+        if run and run.is_running():
+            QMessageBox.warning(self, "Warning", f"{script_name} is already running!")
+            return
+        
+        self.start_script(script_name)
+    
+    def start_script(self, script_name, change_time=None):
+        """
+        Start a script runner
+        
+        Args:
+            script_name: Name of the package.json script
+            change_time: Triggering change time for auto-run latency metrics
+        """
+        run = self.get_run(script_name, script_name)
+        if run.cache_store is not None and run.cache_store.is_alive():
+            # The last run's outputs are still being archived; rewriting
+            # them now would put a mix of two runs in the cache
+            if not run.store_wait:
+                run.store_wait = True
+                QTimer.singleShot(25, lambda: self._start_after_store(run, change_time))
+            return
+        if run.cache_lookup is not None:
+            # Files may have changed since the lookup hashed them: start
+            # again once it has reported
+            run.restart_pending = True
+            run.restart_change = change_time
+            return
+        run.command = None
+        self.current_script = script_name
+        if not self.lookup_cached(run, change_time):
+            self.launch_script(run, change_time)
+    
+    def _start_after_store(self, run, change_time):
+        if not run.store_wait:
+            return  # Cancelled by shutdown()
+        run.store_wait = False
+        if run.is_running() or self.runs.get(run.name) is not run:
+            return
+        self.start_script(run.script, change_time)
+    
+    def launch_script(self, run, change_time=None):
+        """Run a script's command"""
+        cmd, env = self.script_command(run.script)
+        shown = ScriptExecService.describe(cmd)
+        self.log_run(run, f"<b>Running{' (direct)' if env else ''}:</b> {shown}")
+        self.launch(run, cmd, env, self.new_log_writer(run.script, shown), change_time)
+    
+    def lookup_cached(self, run, change_time=None):
+        """
+        Look for a cached run of the script before running it
+        
+        Only scripts with a ``cache`` entry in ``.autorunner.json`` are
+        cached. The inputs are hashed and a hit restored on a CacheLookup
+        thread; ``on_cache_hit`` replays the output, ``on_cache_miss``
+        starts the script and sets it up to capture its output for
+        ``on_runner_finished`` to store.
         
-        script_name = item.text().replace("▶️ ", "")
-        cmd = self.package_service.get_run_command(script_name)
+        Returns:
+            bool: True if a lookup was started
+        """
+        run.cache_key = None
+        run.captured = None
+        config = ProjectConfigService.get_cache_config(self.project_path, run.script)
+        if config is None:
+            return False
         
-        self.log(f"<b>Running:</b> {cmd}")
-        self.status_label.setText(f"Running: {script_name}")
+        cache = TaskCache.instance()
+        cache.max_bytes = self.get_setting("task_cache_mb") * 1024 * 1024
+        manager = self.package_service.package_manager
+        lookup = CacheLookup(
+            cache, self.project_path, run.script, self.scripts.get(run.script, ""),
+            manager, config, PackageManagerService.find_lockfile(self.project_path, manager)
+        )
+        lookup.hit_signal.connect(
+            lambda meta, lines, elapsed: self.on_cache_hit(run, lookup, meta, lines, elapsed)
+        )
+        lookup.miss_signal.connect(
+            lambda key, inputs, hashed, restore_failed: self.on_cache_miss(
+                run, lookup, change_time, key, inputs, hashed, restore_failed
+            )
+        )
+        run.cache_lookup = lookup
+        run.cache_outputs = config["outputs"]
+        run.state = "checking cache"
+        self.runner_list.update_run(run)
+        self.status_label.setText(f"Checking cache: {run.name}")
+        lookup.start()
+        return True
+    
+    def _finish_lookup(self, run, lookup):
+        """
+        Clear a run's finished lookup
         
-        self.runner = RunnerThread(cmd, self.project_path)
-        self.runner.log_signal.connect(self.log)
-        self.runner.finished_signal.connect(
-            lambda: self.status_label.setText("Script finished")
+        Returns:
+            bool: False if the result is stale (stopped, or a newer start
+            was requested meanwhile, which is started now instead)
+        """
+        if run.cache_lookup is not lookup:
+            return False
+        run.cache_lookup = None
+        if run.restart_pending:
+            run.state = "idle"
+            self._start_pending_restart(run)
+            return False
+        return True
+    
+    def on_cache_hit(self, run, lookup, meta, lines, elapsed):
+        """Replay a cached run whose outputs were restored"""
+        if not self._finish_lookup(run, lookup):
+            return
+        cache = TaskCache.instance()
+        saved = max(0.0, meta.get("duration", 0.0) - elapsed)
+        cache.record(True, saved)
+        run.state = "cached"
+        run.exit_code = 0
+        run.started_at = time.monotonic() - elapsed
+        run.finished_at = time.monotonic()
+        self.runner_list.update_run(run)
+        restored = ", ".join(meta.get("outputs") or []) or "no outputs"
+        self.log_run(
+            run,
+            f"<span style='color:#66ccff;'>♻️ Cache hit: {len(lines)} lines replayed, "
+            f"{restored} restored in {format_duration(elapsed)} | saved "
+            f"{format_duration(saved)} | {cache.summary()}</span>"
         )
-        self.runner.start()
+        run.console.append_lines(lines)
+        self.log_lines(run.prefixed(lines))
+        if not self.update_run_status():
+            self.status_label.setText(f"♻️ {run.name}: cached, saved {format_duration(saved)}")
+    
+    def on_cache_miss(self, run, lookup, change_time, key, inputs, hashed, restore_failed):
+        """Run the script and capture its output for the cache"""
+        if not self._finish_lookup(run, lookup):
+            return
+        if restore_failed:
+            self.log_run(run, "<span style='color:#ffaa00;'>Cached outputs could not be restored.</span>")
+        cache = TaskCache.instance()
+        cache.record(False)
+        self.log_run(
+            run,
+            f"<span style='color:#66ccff;'>💾 Cache miss: {inputs} inputs hashed in "
+            f"{format_duration(hashed)} | {cache.summary()}</span>"
+        )
+        run.cache_key = key
+        run.captured = []
+        self.launch_script(run, change_time)
+    
+    def store_cached(self, run):
+        """Store a successful run's output and outputs in the task cache"""
+        run.cache_store = TaskCache.instance().store_async(
+            run.cache_key, self.project_path, run.script,
+            run.finished_at - run.started_at, run.captured, run.cache_outputs
+        )
+        self.log_run(run, "<span style='color:#66ccff;'>💾 Result cached for the next run</span>")
+    
+    def run_task_graph(self):
+        """Run the selected script's task graph with independent tasks in parallel"""
+        script_name = self.selected_script()
+        if not script_name:
+            return
+        if self.task_scheduler and self.task_scheduler.is_running():
+            QMessageBox.warning(self, "Warning", "A task graph is already running!")
+            return
+        
+        try:
+            graph = TaskGraphService.build(
+                self.project_path, script_name, self.package_service.package_manager,
+                self.package_service.package_manager_version
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Task Graph", str(e))
+            return
+        self.start_task_graph(script_name, graph)
+    
+    def run_in_workspaces(self):
+        """Run the selected script in every workspace, in dependency order"""
+        script_name = self.selected_script()
+        if not script_name or not self.workspaces:
+            return
+        if self.task_scheduler and self.task_scheduler.is_running():
+            QMessageBox.warning(self, "Warning", "A task graph is already running!")
+            return
+        
+        self.workspace_root, self.workspaces = WorkspaceService.discover(self.project_path)
+        try:
+            graph = WorkspaceService.build_task_graph(
+                self.workspaces, script_name,
+                self.package_service.package_manager,
+                direct=self.get_setting("direct_exec"),
+                version=self.package_service.package_manager_version
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Workspaces", str(e))
+            return
+        self.start_task_graph(f"{script_name} (workspaces)", graph)
+    
+    def start_task_graph(self, label, graph):
+        """Run a task graph, one runner per task"""
+        tasks = [node.name for node in graph.nodes.values() if node.cmd is not None]
+        busy = [name for name in tasks if name in self.runs and self.runs[name].is_running()]
+        if busy:
+            QMessageBox.warning(self, "Warning", f"{', '.join(busy)} already running!")
+            return
+        
+        scheduler = TaskScheduler(graph, self.start_task, self.get_setting("task_parallelism"))
+        scheduler.node_finished.connect(self.on_task_finished)
+        scheduler.finished_signal.connect(
+            lambda report: self.on_task_graph_finished(label, report)
+        )
+        self.log(
+            f"<b>🕸️ Task graph:</b> {label} | {len(tasks)} tasks, "
+            f"up to {scheduler.max_parallel} at once"
+        )
+        self.task_scheduler = scheduler
+        scheduler.start()
+    
+    def start_task(self, node):
+        """Start one task of the running graph; returns its ProcessHandle"""
+        run = self.get_run(node.name, node.script)
+        run.command = (node.cmd, node.env, node.cwd)
+        run.restart_pending = False
+        shown = ScriptExecService.describe(node.cmd)
+        self.log_run(run, f"<b>Task:</b> {shown}")
+        self.launch(run, node.cmd, node.env, self.new_log_writer(node.script, shown), cwd=node.cwd)
+        return run.handle
+    
+    def on_task_finished(self, name, state):
+        """Report failed and skipped graph tasks"""
+        if self.task_scheduler.graph.nodes[name].cmd is None:
+            return  # Join node
+        if state == "skipped":
+            self.log(f"<span style='color:#ffaa00;'>⏭️ Skipped: {name}</span>")
+        elif state == "failed" and name in self.runs:
+            run = self.runs[name]
+            self.log_run(run, f"<span style='color:#ff6666;'>❌ Task failed (exit {run.exit_code})</span>")
+    
+    def on_task_graph_finished(self, label, report):
+        """Report wall time against the critical path and serial time"""
+        nodes = self.task_scheduler.graph.nodes
+        states = {
+            name: state for name, state in report["states"].items()
+            if nodes[name].cmd is not None
+        }
+        failed = [name for name, state in states.items() if state == "failed"]
+        skipped = [name for name, state in states.items() if state == "skipped"]
+        text = (
+            f"🕸️ {label}: {format_duration(report['wall'])} | critical path "
+            f"{format_duration(report['critical'])} | serial {format_duration(report['serial'])}"
+        )
+        color = "#ff6666" if failed or skipped else "#99ffcc"
+        self.log(f"<span style='color:{color};'>{text}</span>")
+        if report["path"]:
+            self.log(
+                f"<span style='color:#99ffcc;'>Critical path: {' → '.join(report['path'])}</span>"
+            )
+        if failed or skipped:
+            self.log(
+                f"<span style='color:#ff6666;'>Failed: {', '.join(failed) or 'none'} | "
+                f"skipped: {len(skipped)}</span>"
+            )
+        if not self.update_run_status():
+            self.status_label.setText(text)
+    
+    def get_run(self, name, script):
+        """
+        Get a runner by name, adding it (console, filter entry, list row) if new
+        
+        Args:
+            name: Runner name
+            script: package.json script, None for an install
+        """
+        run = self.runs.get(name)
+        if run is not None:
+            return run
+        color = RUN_COLORS[self.next_color % len(RUN_COLORS)]
+        self.next_color += 1
+        run = ScriptRun(name, script, color, self.new_console())
+        self.runs[name] = run
+        self.console_stack.addWidget(run.console)
+        self.output_filter.addItem(name, name)
+        self.runner_list.add_run(run)
+        self.runner_list.setVisible(True)
+        return run
+    
+    def launch(self, run, cmd, env, log_writer, change_time=None, cwd=None):
+        """Start a runner's process through the supervisor (in the project by default)"""
+        handle = ProcessSupervisor.instance().start(
+            cmd, cwd or self.project_path,
+            pty_size=self.pty_size(),
+            log_writer=log_writer,
+            stop_grace=self.get_setting("stop_grace_seconds"),
+            env=env
+        )
+        handle.lines_signal.connect(lambda lines: self.on_runner_output(run, handle, lines))
+        handle.live_signal.connect(lambda lines: self.on_runner_live(run, handle, lines))
+        handle.first_output_signal.connect(lambda t: self.on_runner_first_output(run, handle, t))
+        handle.started_signal.connect(lambda t: self.on_runner_started(run, handle, t))
+        handle.finished_signal.connect(lambda: self.on_runner_finished(run, handle))
+        handle.stopped_signal.connect(lambda report: self.on_runner_stopped(run, handle, report))
+        
+        run.handle = handle
+        run.state = "running"
+        run.exit_code = None
+        run.started_at = time.monotonic()
+        run.finished_at = None
+        run.restart_change_time = change_time
+        run.awaiting_first_output = change_time is not None
+        self.runner_list.update_run(run)
+        self.update_run_status()
+    
+    def script_command(self, script_name):
+        """
+        Command for a script: direct exec if enabled, else the package manager
+        
+        Returns:
+            tuple: (cmd, env); env is None for the package manager command
+        """
+        if self.get_setting("direct_exec"):
+            direct = ScriptExecService.get_direct_command(
+                self.project_path, script_name, self.package_service.package_manager,
+                self.package_service.package_manager_version
+            )
+            if direct is not None:
+                return direct
+        return self.package_service.get_run_command(script_name), None
+    
+    def pty_size(self):
+        """Terminal size for PTY mode, None to run with pipes"""
+        if not self.get_setting("runner_pty") or not PTY_SUPPORTED:
+            return None
+        return self.get_setting("pty_columns"), self.get_setting("pty_rows")
+    
+    def new_log_writer(self, script_name, cmd):
+        """
+        Open the archive file for a run that is starting
+        
+        Args:
+            script_name: Script being run, None for an install
+            cmd: Command line
+            
+        Returns:
+            RunLogWriter or None if archiving is off or the file cannot be created
+        """
+        if not self.get_setting("log_archive"):
+            return None
+        archive = LogArchive.instance()
+        archive.max_bytes = self.get_setting("log_archive_mb") * 1024 * 1024
+        archive.max_age_days = self.get_setting("log_archive_days")
+        try:
+            return archive.new_run(self.project_path, script_name, cmd)
+        except OSError as e:
+            print(f"Error creating run log: {e}")
+            return None
+    
+    def show_run_logs(self):
+        """Open the archived run log viewer for this project"""
+        dialog = LogViewerDialog(LogArchive.instance(), self.project_path, self)
+        dialog.exec()
+    
+    def on_runner_started(self, run, handle, started_at):
+        """Report change-to-restart latency for auto-runs"""
+        if handle is not run.handle or run.restart_change_time is None:
+            return
+        run.restart_latency = started_at - run.restart_change_time
+        self.status_label.setText(
+            f"⚡ Auto-run: {run.name} | "
+            f"restart {format_duration(run.restart_latency)}"
+        )
+    
+    def on_runner_output(self, run, handle, lines):
+        """Forward a batch of runner output to its console and the combined one"""
+        if run.install_tracker is not None and handle is run.handle:
+            lines = [line for line in lines if not run.install_tracker.feed(line[0])]
+        run.console.append_lines(lines)
+        self.log_lines(run.prefixed(lines))
+        if run.captured is not None and handle is run.handle:
+            run.captured.extend(lines)
+            if len(run.captured) > CACHE_CAPTURE_LINES:
+                run.captured = None  # Too much output to be worth replaying
+        handle.batch_done()
+    
+    def on_runner_live(self, run, handle, lines):
+        """Show a runner's in-place lines (progress bars, spinners)"""
+        if run.install_tracker is not None and handle is run.handle:
+            for text, _ in lines:
+                run.install_tracker.feed(text)
+        run.console.set_live(lines)
+        run.live = run.prefixed(lines)
+        self.refresh_live()
+    
+    def refresh_live(self):
+        """Show every runner's live lines under the combined output"""
+        lines = [line for run in self.runs.values() for line in run.live]
+        lines += [line for live in self.removal_live.values() for line in live]
+        self.console.set_live(lines)
+    
+    def on_runner_first_output(self, run, handle, first_output_at):
+        """Report spawn-to-first-output (or change-to-first-output) latency"""
+        if handle is not run.handle:
+            return
+        mode = "pty" if handle.pty_size else "pipe"
+        if not run.awaiting_first_output:
+            latency = first_output_at - handle.started_at
+            self.status_label.setText(
+                f"{self.status_label.text()} | first output {format_duration(latency)} ({mode})"
+            )
+            return
+        run.awaiting_first_output = False
+        latency = first_output_at - run.restart_change_time
+        self.status_label.setText(
+            f"{self.status_label.text()} | first output {format_duration(latency)} ({mode})"
+        )
+        self.log_run(
+            run,
+            f"<span style='color:#99ffcc;'>⏱️ Change to restart: "
+            f"{format_duration(run.restart_latency)}, to first output: "
+            f"{format_duration(latency)}</span>"
+        )
+    
+    def on_runner_finished(self, run, handle):
+        """Handle script runner exit"""
+        if handle is not run.handle:
+            return
+        run.exit_code = handle.process.returncode if handle.process else None
+        run.finished_at = time.monotonic()
+        run.live = []
+        self.refresh_live()
+        if run.cache_key and run.captured is not None and run.exit_code == 0 \
+                and run.state == "running":
+            self.store_cached(run)
+        run.cache_key = None
+        run.captured = None
+        if run.install_tracker is not None and self.finish_install(run):
+            return
+        if run.script is None and run.exit_code == 0 and run.state == "running":
+            InstallStateService.record(self.project_path)
+            self.check_node_modules()
+        if run.restart_pending:
+            self._start_pending_restart(run)
+            return
+        run.state = "stopped" if run.state == "stopping" else "exited"
+        self.runner_list.update_run(run)
+        if not self.update_run_status():
+            self.status_label.setText(
+                "Installation complete" if run.script is None else "Script finished"
+            )
+    
+    def update_run_status(self):
+        """
+        Show the running scripts in the status line
+        
+        Returns:
+            bool: True if anything is running
+        """
+        running = [run.name for run in self.runs.values() if run.is_running()]
+        if running:
+            self.status_label.setText(f"Running: {', '.join(running)}")
+        return bool(running)
     
     def stop_script(self):
-        """Stop running script"""
-        if self.runner and self.runner.isRunning():
-            self.log("<span style='color:#ff3333;'>⏹️ Process stopped.</span>")
-            self.status_label.setText("Stopped")
-            self.runner.stop()
+        """Stop every running script (and the task graph)"""
+        if self.task_scheduler:
+            self.task_scheduler.cancel()
+        running = [
+            run for run in self.runs.values()
+            if run.is_running() or run.cache_lookup is not None
+        ]
+        for run in running:
+            self.stop_run(run.name)
+        if running:
+            self.status_label.setText("Stopping...")
+    
+    def stop_run(self, name):
+        """Stop one runner"""
+        run = self.runs.get(name)
+        if run is None:
+            return
+        run.restart_pending = False
+        if run.cache_lookup is not None:
+            run.cache_lookup.detach()
+            run.cache_lookup = None
+            run.state = "stopped"
+            run.started_at = run.finished_at = None
+            self.runner_list.update_run(run)
+            self.log_run(run, "<span style='color:#ff3333;'>⏹️ Cache lookup cancelled</span>")
+        if not run.is_running():
+            return
+        self.log_run(run, "<span style='color:#ff3333;'>⏹️ Stopping process...</span>")
+        run.state = "stopping"
+        self.runner_list.update_run(run)
+        run.handle.stop()
+    
+    def remove_run(self, name):
+        """Drop a finished runner with its console"""
+        run = self.runs.get(name)
+        if run is None or run.is_running() or run.cache_lookup is not None:
+            return
+        if self.shown_console() is run.console:
+            self.show_output(None)
+        del self.runs[name]
+        self.runner_list.remove_run(name)
+        self.runner_list.setVisible(bool(self.runs))
+        self.output_filter.removeItem(self.output_filter.findData(name))
+        self.console_stack.removeWidget(run.console)
+        run.console.deleteLater()
+        if self.current_script == name:
+            self.current_script = None
+        self.refresh_live()
+    
+    def on_runner_stopped(self, run, handle, report):
+        """Report how long a stop took and when the script's ports were free"""
+        text = f"⏹️ Process stopped in {format_duration(report['stop'])}"
+        if report["signal"]:
+            text += f" ({report['signal']})"
+        if report["ports"]:
+            ports = ", ".join(str(port) for port in report["ports"])
+            if report["port_free"] is None:
+                text += f" | port {ports} still in use"
+            else:
+                text += f" | port {ports} free after {format_duration(report['port_free'])}"
+        self.log_run(run, f"<span style='color:#ff3333;'>{text}</span>")
+        if handle is run.handle and not run.restart_pending and not self.update_run_status():
+            self.status_label.setText(text)
     
     def log(self, text):
         """Log message to console"""
         # Convert URLs to clickable links
-        url_pattern = r"((http|https)://[^\s]+)"
-        text = re.sub(url_pattern, r'<a href="\1" style="color:#66ccff;">\1</a>', text)
-        
-        self.console.append(text)
+        text = URL_PATTERN.sub(URL_LINK, text)
         
-        # Auto-scroll to bottom
-        cursor = self.console.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.console.setTextCursor(cursor)
+        self.console.append_html(text)
+    
+    def log_run(self, run, text):
+        """Log message to a runner's console and, prefixed, the combined one"""
+        text = URL_PATTERN.sub(URL_LINK, text)
+        run.console.append_html(text)
+        self.console.append_html(run.html_prefix + text)
+    
+    def log_lines(self, lines):
+        """Log a batch of rendered ``(text, html)`` output lines"""
+        self.console.append_lines(lines)
+    
+    def shutdown(self):
+        """Stop the runners and release the watcher (tab close / app exit)"""
+        if self.project_loader:
+            self.project_loader.blockSignals(True)
+            self.project_loader.cancel()
+            self.project_loader.wait(2000)
+        if self.task_scheduler:
+            self.task_scheduler.blockSignals(True)
+            self.task_scheduler.cancel()
+        # Deletions finish on their own threads, without reporting to this tab
+        for remover in self.removers:
+            remover.detach()
+        self.removers = []
+        self.removal_live.clear()
+        self.install_after_removal = False
+        for run in self.runs.values():
+            run.restart_pending = False
+            run.store_wait = False
+            if run.cache_lookup is not None:
+                run.cache_lookup.detach()
+                run.cache_lookup = None
+            if run.handle:
+                # The supervisor still terminates and reaps the tree; the tab
+                # may be gone by then
+                run.handle.blockSignals(True)
+                run.handle.stop()
+        self.stop_watching()
     
     def closeEvent(self, event):
         """Handle close event"""
-        if self.runner:
-            self.runner.stop()
-        if self.file_watcher:
-            self.file_watcher.stop()
+        self.shutdown()
         event.accept()
\ No newline at end of file